@@ -1,10 +1,26 @@
+import asyncio
+import json
 import sys
 import uvicorn
 
 
+async def _rollup():
+    from app.database import init_db
+    from app.services.rollup import run_rollup
+
+    await init_db()
+    print(json.dumps(await run_rollup()))
+
+
 def main():
     port = 48293
     args = sys.argv[1:]
+
+    # mcp-pm-api rollup: fold new telemetry into the daily stats tables once
+    if args and args[0] == "rollup":
+        asyncio.run(_rollup())
+        return
+
     for i, arg in enumerate(args):
         if arg == "--port" and i + 1 < len(args):
             port = int(args[i + 1])
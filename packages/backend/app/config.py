@@ -9,6 +9,48 @@ class Settings(BaseSettings):
     database_url: str = ""
     data_dir: str = ""
 
+    # Write-behind ingest queue for single-row telemetry POSTs (off by default)
+    ingest_queue_enabled: bool = False
+    ingest_queue_max_size: int = 10000
+    ingest_batch_size: int = 500
+    ingest_flush_interval_ms: int = 20
+    ingest_queue_overflow: str = "reject"  # reject (HTTP 429) or block
+
+    # WebSocket channels whose updates are merged per entity id within a window
+    ws_coalesce_channels: list[str] = ["task", "event", "job"]
+    ws_coalesce_window_ms: int = 100
+
+    # Incremental DailyStats/AgentUsageStats rollup; 0 disables the background loop
+    rollup_interval_seconds: int = 300
+
+    # Retention cleanup: days to keep each kind of telemetry (0 keeps forever),
+    # deleted in small transactions with a pause between them
+    retention_interval_seconds: int = 3600  # 0 disables the background job
+    retention_events_days: int = 90
+    retention_tool_calls_days: int = 60
+    retention_errors_days: int = 180
+    retention_sessions_days: int = 365
+    # How long a re-sent import record is still recognised as a duplicate
+    retention_import_keys_days: int = 30
+    retention_chunk_size: int = 2000
+    retention_chunk_pause_ms: int = 50
+    # "delete" applies the policies above; "archive" moves sessions older than
+    # archive_after_days, with all their rows, to <data_dir>/archive/YYYY-MM.db
+    retention_mode: str = "delete"
+    archive_after_days: int = 90
+
+    # How often project_stats counters are checked against the source tables
+    project_stats_reconcile_interval_seconds: int = 3600  # 0 disables
+
+    # Background jobs (seed, git import, retention) allowed to run at once
+    job_max_concurrent: int = 2
+
+    # Telemetry window read by the bottleneck rules (errors, agent durations)
+    bottleneck_window_days: int = 7
+
+    # TTL for cached dashboard/analytics responses; writes invalidate early
+    analytics_cache_ttl_seconds: int = 30
+
     model_config = {"env_prefix": "MCP_PM_"}
 
     def __init__(self, **kwargs):
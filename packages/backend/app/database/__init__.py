@@ -1,5 +1,9 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.config import settings
+from app.services.latency import latency_bin
 
 engine = create_async_engine(
     settings.database_url,
@@ -13,27 +17,58 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # These pragmas are per-connection, so they must be applied to every pooled
+    # connection. Relationship deletes rely on ON DELETE rules (passive_deletes),
+    # which SQLite only enforces with foreign_keys=ON.
+    if not settings.database_url.startswith("sqlite"):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+    # Lets the rollup group tool-call durations by sketch bin in SQL
+    dbapi_connection.create_function("latency_bin", 1, latency_bin, deterministic=True)
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """A query parameter as stored timestamps are kept: naive UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _run_migrations(connection):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).resolve().parent.parent / "migrations"))
+    config.attributes["connection"] = connection
+    # Batch migrations rebuild a table by dropping the old copy, which with
+    # foreign keys on would run its ON DELETE actions on the referencing rows.
+    # The pragma is ignored inside a transaction, hence the commit in between.
+    connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    command.upgrade(config, "head")
+    connection.commit()
+    connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
 async def init_db():
     from app.models import Base
 
     async with engine.begin() as conn:
-        # SQLite optimizations
+        # SQLite optimizations (journal_mode is persistent, so once is enough)
         await conn.execute(
             __import__("sqlalchemy").text("PRAGMA journal_mode=WAL")
         )
-        await conn.execute(
-            __import__("sqlalchemy").text("PRAGMA foreign_keys=ON")
-        )
-        await conn.execute(
-            __import__("sqlalchemy").text("PRAGMA busy_timeout=5000")
-        )
-        await conn.execute(
-            __import__("sqlalchemy").text("PRAGMA synchronous=NORMAL")
-        )
-        await conn.execute(
-            __import__("sqlalchemy").text("PRAGMA cache_size=-65536")
-        )
         await conn.run_sync(Base.metadata.create_all)
+    async with engine.connect() as conn:
+        # Bring databases created by older versions up to date (indexes etc.)
+        await conn.run_sync(_run_migrations)
 
 
 async def get_db():
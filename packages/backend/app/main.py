@@ -1,14 +1,37 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import settings
 from app.database import init_db
-from app.routes import projects, tasks, milestones, labels, sessions, events, analytics, ai, ws, seed
+from app.routes import projects, tasks, milestones, labels, sessions, events, analytics, ai, ws, seed, export, jobs
+from app.services.write_behind import ingest_queue
+from app.services.rollup import run_rollup_periodically
+from app.services.cleanup import run_retention_periodically
+from app.services.project_stats import run_reconcile_periodically
+from app.services.jobs import job_runner
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    if settings.ingest_queue_enabled:
+        await ingest_queue.start()
+    background = []
+    if settings.rollup_interval_seconds > 0:
+        background.append(asyncio.create_task(run_rollup_periodically(settings.rollup_interval_seconds)))
+    if settings.retention_interval_seconds > 0:
+        background.append(asyncio.create_task(run_retention_periodically(settings.retention_interval_seconds)))
+    if settings.project_stats_reconcile_interval_seconds > 0:
+        background.append(asyncio.create_task(
+            run_reconcile_periodically(settings.project_stats_reconcile_interval_seconds)
+        ))
     yield
+    for task in background:
+        task.cancel()
+    await job_runner.shutdown()
+    # Commit anything still queued before the process exits
+    await ingest_queue.stop()
 
 
 app = FastAPI(
@@ -32,7 +55,9 @@ app.include_router(labels.router, prefix="/api/labels", tags=["labels"])
 app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
 app.include_router(events.router, prefix="/api/events", tags=["events"])
 app.include_router(analytics.router, prefix="/api/dashboard", tags=["analytics"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(ai.router, prefix="/api/ai", tags=["ai"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 app.include_router(ws.router, tags=["websocket"])
 app.include_router(seed.router, prefix="/api/seed", tags=["seed"])
 
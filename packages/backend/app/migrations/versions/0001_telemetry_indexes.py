@@ -0,0 +1,45 @@
+"""Secondary indexes for the event/telemetry tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns). Databases created by init_db() already have
+# these from Base.metadata.create_all, hence if_not_exists.
+INDEXES = [
+    ("ix_sessions_project_id_start_time", "sessions", ["project_id", "start_time"]),
+    ("ix_sessions_start_time", "sessions", ["start_time"]),
+    ("ix_events_session_id_timestamp", "events", ["session_id", "timestamp"]),
+    ("ix_events_event_type_timestamp", "events", ["event_type", "timestamp"]),
+    ("ix_events_timestamp", "events", ["timestamp"]),
+    ("ix_agent_executions_session_id", "agent_executions", ["session_id"]),
+    ("ix_agent_executions_agent_type_start_time", "agent_executions", ["agent_type", "start_time"]),
+    ("ix_agent_executions_start_time", "agent_executions", ["start_time"]),
+    ("ix_tool_calls_session_id", "tool_calls", ["session_id"]),
+    ("ix_tool_calls_agent_execution_id", "tool_calls", ["agent_execution_id"]),
+    ("ix_file_changes_session_id_timestamp", "file_changes", ["session_id", "timestamp"]),
+    ("ix_file_changes_timestamp", "file_changes", ["timestamp"]),
+    ("ix_errors_session_id", "errors", ["session_id"]),
+    ("ix_errors_timestamp_error_type", "errors", ["timestamp", "error_type"]),
+    ("ix_task_executions_task_id_status", "task_executions", ["task_id", "status"]),
+    ("ix_task_executions_session_id_status", "task_executions", ["session_id", "status"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,30 @@
+"""Indexes used by the incremental stats rollup
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_task_executions_status_stopped_at", "task_executions", ["status", "stopped_at"]),
+    ("ix_daily_stats_date_project_id", "daily_stats", ["date", "project_id"]),
+    ("ix_agent_usage_stats_date_agent_type_model", "agent_usage_stats", ["date", "agent_type", "model"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,25 @@
+"""Index for neighbour lookups when moving tasks within a column
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tasks_project_id_status_sort_order", "tasks", ["project_id", "status", "sort_order"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_project_id_status_sort_order", table_name="tasks", if_exists=True)
@@ -0,0 +1,30 @@
+"""Time-bounded per-session lookups of agent executions
+
+Replaces ix_agent_executions_session_id, whose lookups the new index's
+leading column still serves.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_agent_executions_session_id_start_time", "agent_executions", ["session_id", "start_time"],
+        if_not_exists=True,
+    )
+    op.drop_index("ix_agent_executions_session_id", table_name="agent_executions", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_agent_executions_session_id", "agent_executions", ["session_id"], if_not_exists=True)
+    op.drop_index("ix_agent_executions_session_id_start_time", table_name="agent_executions", if_exists=True)
@@ -0,0 +1,122 @@
+"""Triggers that keep project_stats in step with tasks, sessions and errors
+
+The project_stats table itself comes from Base.metadata.create_all. This
+revision adds the triggers and fills the table for existing projects.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+_STATUSES = ("todo", "in_progress", "done", "archived")
+
+
+def _tasks(row: str, sign: str) -> str:
+    counts = ", ".join(
+        f"{status}_count = {status}_count {sign} ({row}.status = '{status}')" for status in _STATUSES
+    )
+    return (
+        f"UPDATE project_stats SET task_count = task_count {sign} 1, {counts} "
+        f"WHERE project_id = {row}.project_id;"
+    )
+
+
+def _session(row: str, sign: str) -> str:
+    return (
+        f"UPDATE project_stats SET active_session_count = active_session_count {sign} ({row}.end_time IS NULL) "
+        f"WHERE project_id = {row}.project_id;"
+    )
+
+
+def _session_errors(row: str, sign: str) -> str:
+    # A session's open errors follow it between projects and out of the table
+    return (
+        f"UPDATE project_stats SET open_error_count = open_error_count {sign} "
+        f"(SELECT COUNT(*) FROM errors WHERE session_id = {row}.id AND NOT resolved) "
+        f"WHERE project_id = {row}.project_id;"
+    )
+
+
+def _error(row: str, sign: str) -> str:
+    # No-op when the session is already gone, i.e. while a session delete
+    # cascades; the sessions trigger accounts for those errors.
+    return (
+        f"UPDATE project_stats SET open_error_count = open_error_count {sign} (NOT {row}.resolved) "
+        f"WHERE project_id = (SELECT project_id FROM sessions WHERE id = {row}.session_id);"
+    )
+
+
+# Project rows are created with their project; the other triggers only
+# UPDATE, since inserting a row for a project that is being deleted would
+# violate the foreign key.
+TRIGGERS = {
+    "trg_project_stats_project_insert": (
+        "AFTER INSERT ON projects",
+        "INSERT OR IGNORE INTO project_stats (project_id) VALUES (NEW.id);",
+    ),
+    "trg_project_stats_task_insert": ("AFTER INSERT ON tasks", _tasks("NEW", "+")),
+    "trg_project_stats_task_delete": ("AFTER DELETE ON tasks", _tasks("OLD", "-")),
+    "trg_project_stats_task_update": (
+        "AFTER UPDATE OF status, project_id ON tasks "
+        "WHEN OLD.status IS NOT NEW.status OR OLD.project_id IS NOT NEW.project_id",
+        _tasks("OLD", "-") + "\n" + _tasks("NEW", "+"),
+    ),
+    "trg_project_stats_session_insert": ("AFTER INSERT ON sessions", _session("NEW", "+")),
+    "trg_project_stats_session_delete": (
+        "BEFORE DELETE ON sessions",
+        _session("OLD", "-") + "\n" + _session_errors("OLD", "-"),
+    ),
+    "trg_project_stats_session_update": (
+        "AFTER UPDATE OF end_time, project_id ON sessions "
+        "WHEN (OLD.end_time IS NULL) != (NEW.end_time IS NULL) OR OLD.project_id IS NOT NEW.project_id",
+        _session("OLD", "-") + "\n" + _session("NEW", "+"),
+    ),
+    "trg_project_stats_session_move": (
+        "AFTER UPDATE OF project_id ON sessions WHEN OLD.project_id IS NOT NEW.project_id",
+        _session_errors("OLD", "-") + "\n" + _session_errors("NEW", "+"),
+    ),
+    "trg_project_stats_error_insert": ("AFTER INSERT ON errors", _error("NEW", "+")),
+    "trg_project_stats_error_delete": ("AFTER DELETE ON errors", _error("OLD", "-")),
+    "trg_project_stats_error_update": (
+        "AFTER UPDATE OF resolved, session_id ON errors "
+        "WHEN OLD.resolved IS NOT NEW.resolved OR OLD.session_id IS NOT NEW.session_id",
+        _error("OLD", "-") + "\n" + _error("NEW", "+"),
+    ),
+}
+
+BACKFILL = """
+INSERT OR REPLACE INTO project_stats (
+    project_id, task_count, todo_count, in_progress_count, done_count, archived_count,
+    open_error_count, active_session_count
+)
+SELECT
+    p.id,
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'todo'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'in_progress'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'done'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'archived'),
+    (SELECT COUNT(*) FROM errors JOIN sessions ON sessions.id = errors.session_id
+     WHERE sessions.project_id = p.id AND NOT errors.resolved),
+    (SELECT COUNT(*) FROM sessions WHERE project_id = p.id AND end_time IS NULL)
+FROM projects p
+"""
+
+
+def upgrade() -> None:
+    for name, (when, body) in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {when} BEGIN\n{body}\nEND")
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    for name in reversed(list(TRIGGERS)):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
@@ -0,0 +1,37 @@
+"""Latency sketch columns on agent_usage_stats
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("duration_sketch", "tool_duration_sketch")
+
+
+def _existing() -> set[str]:
+    # create_all already adds them to databases created by this version
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns("agent_usage_stats")}
+
+
+def upgrade() -> None:
+    existing = _existing()
+    for name in COLUMNS:
+        if name not in existing:
+            op.add_column("agent_usage_stats", sa.Column(name, sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    existing = _existing()
+    with op.batch_alter_table("agent_usage_stats") as batch:
+        for name in COLUMNS:
+            if name in existing:
+                batch.drop_column(name)
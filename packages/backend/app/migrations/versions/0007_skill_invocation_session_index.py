@@ -0,0 +1,25 @@
+"""Per-session lookups of skill invocations
+
+Retention, archiving and session cascades select skill invocations by
+session_id, which scanned the whole table without this index.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_skill_invocations_session_id", "skill_invocations", ["session_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skill_invocations_session_id", table_name="skill_invocations", if_exists=True)
@@ -0,0 +1,43 @@
+"""AUTOINCREMENT ids on the tables the rollup reads by id
+
+The rollup remembers the highest id it has folded in. Without AUTOINCREMENT
+SQLite hands the id of a deleted newest row to the next insert, which then
+sits at or below the mark and is never counted.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TABLES = ("events", "agent_executions", "tool_calls")
+
+
+def _autoincrement(table: str) -> bool:
+    # create_all already builds them this way in databases created by this version
+    sql = op.get_bind().execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+    ).scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        if not _autoincrement(table):
+            with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+                pass
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if _autoincrement(table):
+            with op.batch_alter_table(table, recreate="always"):
+                pass
@@ -0,0 +1,25 @@
+"""Age lookups of telemetry import keys
+
+Retention prunes import keys by created_at, which scanned the whole table
+without this index.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_import_keys_created_at", "import_keys", ["created_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_keys_created_at", table_name="import_keys", if_exists=True)
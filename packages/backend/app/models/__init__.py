@@ -6,7 +6,7 @@ class Base(DeclarativeBase):
 
 
 # Import all models so they register with Base.metadata
-from app.models.project import Project, Milestone, Label, TaskLabel  # noqa: E402, F401
+from app.models.project import Project, ProjectStats, Milestone, Label, TaskLabel  # noqa: E402, F401
 from app.models.task import Task, TaskDependency  # noqa: E402, F401
 from app.models.event import (  # noqa: E402, F401
     Session,
@@ -17,5 +17,7 @@ from app.models.event import (  # noqa: E402, F401
     FileChange,
     Error,
     TaskExecution,
+    ImportKey,
+    ArchivedMonth,
 )
-from app.models.analytics import DailyStats, AgentUsageStats  # noqa: E402, F401
+from app.models.analytics import DailyStats, AgentUsageStats, RollupState  # noqa: E402, F401
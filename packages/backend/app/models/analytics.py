@@ -1,11 +1,14 @@
 from datetime import date, datetime
-from sqlalchemy import String, Date, DateTime, Integer, Float, ForeignKey, func
+from sqlalchemy import String, Date, DateTime, Integer, Float, ForeignKey, Index, JSON, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models import Base
 
 
 class DailyStats(Base):
     __tablename__ = "daily_stats"
+    __table_args__ = (
+        Index("ix_daily_stats_date_project_id", "date", "project_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     project_id: Mapped[int | None] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
@@ -18,6 +21,9 @@ class DailyStats(Base):
 
 class AgentUsageStats(Base):
     __tablename__ = "agent_usage_stats"
+    __table_args__ = (
+        Index("ix_agent_usage_stats_date_agent_type_model", "date", "agent_type", "model"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     agent_type: Mapped[str] = mapped_column(String(100))
@@ -27,3 +33,17 @@ class AgentUsageStats(Base):
     avg_duration_ms: Mapped[float] = mapped_column(Float, default=0.0)
     success_count: Mapped[int] = mapped_column(Integer, default=0)
     failure_count: Mapped[int] = mapped_column(Integer, default=0)
+    # LatencySketch JSON of the agent runs and of the tool calls they made
+    duration_sketch: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    tool_duration_sketch: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+
+class RollupState(Base):
+    """High-water mark of the rows each rollup source has already folded in."""
+
+    __tablename__ = "rollup_state"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, default=0)
+    last_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Text, DateTime, Integer, Boolean, ForeignKey, JSON, func
+from sqlalchemy import String, Text, DateTime, Integer, Boolean, ForeignKey, JSON, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models import Base
 
@@ -12,6 +12,10 @@ if TYPE_CHECKING:
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_project_id_start_time", "project_id", "start_time"),
+        Index("ix_sessions_start_time", "start_time"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)  # UUID
     project_id: Mapped[int | None] = mapped_column(ForeignKey("projects.id", ondelete="SET NULL"), nullable=True)
@@ -23,12 +27,21 @@ class Session(Base):
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     project: Mapped[Project | None] = relationship(back_populates="sessions")
-    events: Mapped[list[Event]] = relationship(back_populates="session", lazy="selectin", cascade="all, delete-orphan")
-    task_executions: Mapped[list[TaskExecution]] = relationship(back_populates="session", cascade="all, delete-orphan")
+    # A long-running session can own a very large number of events, so the
+    # collections must be requested explicitly (e.g. selectinload(Session.events)).
+    events: Mapped[list[Event]] = relationship(back_populates="session", lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
+    task_executions: Mapped[list[TaskExecution]] = relationship(back_populates="session", lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_session_id_timestamp", "session_id", "timestamp"),
+        Index("ix_events_event_type_timestamp", "event_type", "timestamp"),
+        Index("ix_events_timestamp", "timestamp"),
+        # The rollup's high-water marks rely on ids never being reused
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -41,6 +54,12 @@ class Event(Base):
 
 class AgentExecution(Base):
     __tablename__ = "agent_executions"
+    __table_args__ = (
+        Index("ix_agent_executions_session_id_start_time", "session_id", "start_time"),
+        Index("ix_agent_executions_agent_type_start_time", "agent_type", "start_time"),
+        Index("ix_agent_executions_start_time", "start_time"),
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -55,6 +74,9 @@ class AgentExecution(Base):
 
 class SkillInvocation(Base):
     __tablename__ = "skill_invocations"
+    __table_args__ = (
+        Index("ix_skill_invocations_session_id", "session_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -67,6 +89,11 @@ class SkillInvocation(Base):
 
 class ToolCall(Base):
     __tablename__ = "tool_calls"
+    __table_args__ = (
+        Index("ix_tool_calls_session_id", "session_id"),
+        Index("ix_tool_calls_agent_execution_id", "agent_execution_id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -79,6 +106,10 @@ class ToolCall(Base):
 
 class FileChange(Base):
     __tablename__ = "file_changes"
+    __table_args__ = (
+        Index("ix_file_changes_session_id_timestamp", "session_id", "timestamp"),
+        Index("ix_file_changes_timestamp", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -91,6 +122,10 @@ class FileChange(Base):
 
 class Error(Base):
     __tablename__ = "errors"
+    __table_args__ = (
+        Index("ix_errors_session_id", "session_id"),
+        Index("ix_errors_timestamp_error_type", "timestamp", "error_type"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"))
@@ -103,6 +138,11 @@ class Error(Base):
 
 class TaskExecution(Base):
     __tablename__ = "task_executions"
+    __table_args__ = (
+        Index("ix_task_executions_task_id_status", "task_id", "status"),
+        Index("ix_task_executions_session_id_status", "session_id", "status"),
+        Index("ix_task_executions_status_stopped_at", "status", "stopped_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
@@ -115,3 +155,27 @@ class TaskExecution(Base):
 
     task: Mapped["Task"] = relationship(back_populates="task_executions")
     session: Mapped[Session] = relationship(back_populates="task_executions")
+
+
+class ImportKey(Base):
+    """Idempotency keys of records replayed through /api/events/import."""
+    __tablename__ = "import_keys"
+    __table_args__ = (
+        Index("ix_import_keys_created_at", "created_at"),
+    )
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class ArchivedMonth(Base):
+    """Summary of the sessions moved into one monthly archive file."""
+    __tablename__ = "archive_months"
+
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)  # YYYY-MM of session start
+    path: Mapped[str] = mapped_column(String(500))
+    session_count: Mapped[int] = mapped_column(Integer, default=0)
+    event_count: Mapped[int] = mapped_column(Integer, default=0)
+    first_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
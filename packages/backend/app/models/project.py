@@ -21,9 +21,32 @@ class Project(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
-    tasks: Mapped[list["Task"]] = relationship(back_populates="project", lazy="selectin", cascade="all, delete-orphan")
-    milestones: Mapped[list["Milestone"]] = relationship(back_populates="project", lazy="selectin", cascade="all, delete-orphan")
-    sessions: Mapped[list["Session"]] = relationship(back_populates="project", lazy="selectin", passive_deletes=True)
+    # Collections are never loaded implicitly; routes that need them opt in with
+    # loader options such as selectinload(Project.tasks). Deletes rely on the
+    # database's ON DELETE rules instead of loading children first.
+    tasks: Mapped[list["Task"]] = relationship(back_populates="project", lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
+    milestones: Mapped[list["Milestone"]] = relationship(back_populates="project", lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
+    sessions: Mapped[list["Session"]] = relationship(back_populates="project", lazy="raise", passive_deletes=True)
+
+
+class ProjectStats(Base):
+    """Counters per project, kept current by SQLite triggers on every write.
+
+    The triggers (migration 0005) also see Core bulk inserts and set-based
+    updates, which ORM events would miss. The reconciliation job in
+    app.services.project_stats repairs any drift.
+    """
+
+    __tablename__ = "project_stats"
+
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    task_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    todo_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    in_progress_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    done_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    archived_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    open_error_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # unresolved
+    active_session_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # no end_time
 
 
 class Milestone(Base):
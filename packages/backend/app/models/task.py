@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Text, DateTime, Integer, Float, ForeignKey, func
+from sqlalchemy import String, Text, DateTime, Integer, Float, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models import Base
 
@@ -12,6 +12,9 @@ if TYPE_CHECKING:
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_id_status_sort_order", "project_id", "status", "sort_order"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
@@ -28,7 +31,7 @@ class Task(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
     project: Mapped[Project] = relationship(back_populates="tasks")
-    task_executions: Mapped[list[TaskExecution]] = relationship(back_populates="task", cascade="all, delete-orphan")
+    task_executions: Mapped[list[TaskExecution]] = relationship(back_populates="task", lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class TaskDependency(Base):
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.services.ai_analysis import analyze_bottlenecks, suggest_next_tasks, generate_report
+from app.services.cache import analytics_cache
 
 router = APIRouter()
 
@@ -11,7 +12,9 @@ async def api_analyze_bottlenecks(
     project_id: int | None = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    bottlenecks = await analyze_bottlenecks(db, project_id)
+    bottlenecks = await analytics_cache.get_or_compute(
+        f"bottlenecks:{project_id or 'all'}", lambda: analyze_bottlenecks(db, project_id),
+    )
     return {"bottlenecks": bottlenecks, "count": len(bottlenecks)}
 
 
@@ -27,7 +30,8 @@ async def api_analyze_recommendations(
 @router.get("/suggestions/next-tasks")
 async def api_suggest_next_tasks(
     project_id: int | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
 ):
-    suggestions = await suggest_next_tasks(db, project_id)
+    suggestions = await suggest_next_tasks(db, project_id, limit)
     return {"suggestions": suggestions, "count": len(suggestions)}
@@ -1,41 +1,49 @@
-from datetime import date, timedelta
-from fastapi import APIRouter, Depends, Query
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sa_func
-from app.database import get_db
-from app.models.project import Project
-from app.models.task import Task
-from app.models.event import Session, Event
-from app.models.analytics import DailyStats, AgentUsageStats
+from sqlalchemy import String, Table, select, tuple_, type_coerce, func as sa_func
+from app.database import engine, get_db, naive_utc
+from app.models.project import Project, ProjectStats
+from app.models.event import Session, Event, ArchivedMonth
+from app.models.analytics import AgentUsageStats
 from app.schemas.analytics import DashboardOverview, TrendData, AgentStatsResponse, ActivityListResponse, ActivityItem
+from app.services.archive import attach_month
+from app.services.cache import analytics_cache
+from app.services.cleanup import retention_job
+from app.services.jobs import job_runner
+from app.services.latency import LatencySketch
+from app.services.trends import compute_trends
 
 router = APIRouter()
 
 
-@router.get("/overview", response_model=DashboardOverview)
-async def dashboard_overview(db: AsyncSession = Depends(get_db)):
-    # Total projects
-    total_projects = (await db.execute(select(sa_func.count(Project.id)))).scalar() or 0
-
-    # Active tasks
-    active_tasks = (await db.execute(
-        select(sa_func.count(Task.id)).where(Task.status.in_(["todo", "in_progress"]))
-    )).scalar() or 0
-
-    # Completion rate
-    total_tasks = (await db.execute(select(sa_func.count(Task.id)))).scalar() or 0
-    done_tasks = (await db.execute(
-        select(sa_func.count(Task.id)).where(Task.status == "done")
-    )).scalar() or 0
-    completion_rate = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
-
-    # Today's sessions
-    today = date.today()
-    today_sessions = (await db.execute(
-        select(sa_func.count(Session.id)).where(
-            sa_func.date(Session.start_time) == today
+async def _compute_overview(db: AsyncSession) -> DashboardOverview:
+    # All counts in one round trip: task totals summed from the per-project
+    # counters, project and today's-session counts as scalar subqueries.
+    today_start = datetime.combine(date.today(), time.min)
+    task_counts = select(
+        sa_func.sum(ProjectStats.task_count).label("total_tasks"),
+        sa_func.sum(ProjectStats.todo_count + ProjectStats.in_progress_count).label("active_tasks"),
+        sa_func.sum(ProjectStats.done_count).label("done_tasks"),
+    ).subquery()
+    counts = (await db.execute(
+        select(
+            select(sa_func.count(Project.id)).scalar_subquery().label("total_projects"),
+            select(sa_func.count(Session.id)).where(
+                Session.start_time >= today_start,
+                Session.start_time < today_start + timedelta(days=1),
+            ).scalar_subquery().label("today_sessions"),
+            task_counts.c.total_tasks,
+            task_counts.c.active_tasks,
+            task_counts.c.done_tasks,
         )
-    )).scalar() or 0
+    )).one()
+
+    total_tasks = counts.total_tasks or 0
+    done_tasks = counts.done_tasks or 0
+    completion_rate = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
 
     # Recent events
     recent = await db.execute(
@@ -52,36 +60,76 @@ async def dashboard_overview(db: AsyncSession = Depends(get_db)):
     ]
 
     return DashboardOverview(
-        total_projects=total_projects,
-        active_tasks=active_tasks,
+        total_projects=counts.total_projects or 0,
+        active_tasks=counts.active_tasks or 0,
         completion_rate=round(completion_rate, 1),
-        today_sessions=today_sessions,
+        today_sessions=counts.today_sessions or 0,
         total_tokens_used=0,
         recent_activity=recent_activity,
     )
 
 
+@router.get("/overview", response_model=DashboardOverview)
+async def dashboard_overview(db: AsyncSession = Depends(get_db)):
+    return await analytics_cache.get_or_compute("overview", lambda: _compute_overview(db))
+
+
+@router.get("/cache-stats")
+async def cache_stats():
+    """Hit/miss counters of the analytics response cache."""
+    return analytics_cache.stats()
+
+
+@router.get("/retention")
+async def retention_stats():
+    """Progress and totals of the background retention cleanup."""
+    return retention_job.stats()
+
+
+@router.post("/retention/run")
+async def run_retention(
+    response: Response,
+    background: bool = Query(False, description="Run as a job and return its id (202)"),
+):
+    """Apply the retention policies now and return what was deleted."""
+    if background:
+        response.status_code = 202
+        return job_runner.submit("retention", lambda job: retention_job.run()).to_dict()
+    return await retention_job.run()
+
+
+@router.get("/archive")
+async def list_archive(db: AsyncSession = Depends(get_db)):
+    """Monthly archive files and the sessions/events each one holds."""
+    result = await db.execute(select(ArchivedMonth).order_by(ArchivedMonth.month))
+    return [
+        {
+            "month": m.month,
+            "session_count": m.session_count,
+            "event_count": m.event_count,
+            "first_time": m.first_time,
+            "last_time": m.last_time,
+            "archived_at": m.archived_at,
+        }
+        for m in result.scalars().all()
+    ]
+
+
 @router.get("/trends", response_model=TrendData)
 async def dashboard_trends(
-    days: int = Query(30, ge=1, le=365),
+    days: int = Query(30, ge=1, le=3650),
+    since: datetime | None = Query(None, description="Range start (UTC); overrides days"),
+    until: datetime | None = Query(None, description="Range end (UTC), exclusive; defaults to now"),
+    bucket: str = Query("auto", pattern="^(auto|hour|day|week|4week)$"),
+    max_points: int = Query(400, ge=10, le=2000, description="Wider buckets are used past this many"),
     project_id: int | None = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    start_date = date.today() - timedelta(days=days)
-    query = select(DailyStats).where(DailyStats.date >= start_date)
-    if project_id:
-        query = query.where(DailyStats.project_id == project_id)
-    query = query.order_by(DailyStats.date)
-
-    result = await db.execute(query)
-    stats = result.scalars().all()
-
-    return TrendData(
-        dates=[s.date.isoformat() for s in stats],
-        tasks_completed=[s.tasks_completed for s in stats],
-        tokens_used=[s.tokens_used for s in stats],
-        session_counts=[s.session_count for s in stats],
-    )
+    until = naive_utc(until) or datetime.utcnow()
+    since = naive_utc(since) or until - timedelta(days=days)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return await compute_trends(db, since, until, bucket, max_points, project_id)
 
 
 @router.get("/agent-stats", response_model=list[AgentStatsResponse])
@@ -95,7 +143,8 @@ async def agent_stats(
     )
     stats = result.scalars().all()
 
-    # Aggregate by agent_type + model
+    # Aggregate by agent_type + model; the daily latency sketches merge into
+    # one per agent, so percentiles span the whole range
     aggregated: dict[str, dict] = {}
     for s in stats:
         key = f"{s.agent_type}:{s.model}"
@@ -104,13 +153,26 @@ async def agent_stats(
                 "agent_type": s.agent_type,
                 "model": s.model,
                 "total_calls": 0,
-                "total_duration": 0.0,
+                "duration_sum": 0.0,
+                "duration_count": 0,
                 "success_count": 0,
                 "failure_count": 0,
+                "durations": LatencySketch(),
+                "tool_durations": LatencySketch(),
             }
         agg = aggregated[key]
         agg["total_calls"] += s.total_calls
-        agg["total_duration"] += s.avg_duration_ms * s.total_calls
+        if s.duration_sketch:
+            sketch = LatencySketch(s.duration_sketch)
+            agg["durations"].merge(sketch)
+            agg["duration_sum"] += sketch.sum
+            agg["duration_count"] += sketch.count
+        else:
+            # Rows rolled up before sketches existed only have the mean
+            agg["duration_sum"] += s.avg_duration_ms * s.total_calls
+            agg["duration_count"] += s.total_calls
+        if s.tool_duration_sketch:
+            agg["tool_durations"].merge(LatencySketch(s.tool_duration_sketch))
         agg["success_count"] += s.success_count
         agg["failure_count"] += s.failure_count
 
@@ -119,53 +181,124 @@ async def agent_stats(
             agent_type=v["agent_type"],
             model=v["model"],
             total_calls=v["total_calls"],
-            avg_duration_ms=v["total_duration"] / v["total_calls"] if v["total_calls"] > 0 else 0,
+            avg_duration_ms=v["duration_sum"] / v["duration_count"] if v["duration_count"] > 0 else 0,
             success_rate=v["success_count"] / (v["success_count"] + v["failure_count"]) * 100
             if (v["success_count"] + v["failure_count"]) > 0
             else 0,
+            p50_duration_ms=v["durations"].quantile(0.5),
+            p95_duration_ms=v["durations"].quantile(0.95),
+            p99_duration_ms=v["durations"].quantile(0.99),
+            tool_p50_duration_ms=v["tool_durations"].quantile(0.5),
+            tool_p95_duration_ms=v["tool_durations"].quantile(0.95),
+            tool_p99_duration_ms=v["tool_durations"].quantile(0.99),
         )
         for v in aggregated.values()
     ]
 
 
+def _encode_cursor(timestamp: str, event_id: int) -> str:
+    raw = json.dumps([timestamp, event_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(timestamp), int(event_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _activity_query(events: Table, sessions: Table, event_type: str | None, project_id: int | None):
+    # Timestamps are compared as the stored text: rows written with the server
+    # default have no fractional seconds, so a re-bound datetime would not
+    # compare equal to them.
+    ts_text = type_coerce(events.c.timestamp, String)
+    query = select(
+        events.c.id, events.c.event_type, events.c.timestamp, events.c.payload, events.c.session_id,
+        sessions.c.name.label("session_name"), ts_text.label("ts_text"),
+    ).outerjoin(sessions, events.c.session_id == sessions.c.id)
+    if event_type:
+        query = query.where(events.c.event_type == event_type)
+    if project_id:
+        query = query.where(sessions.c.project_id == project_id)
+    return query, ts_text
+
+
+def _activity_page(query, ts_text, events: Table, cursor: tuple[str, int] | None, count: int):
+    # Keyset pagination on (timestamp, id): each page is an index range scan
+    # no matter how deep it is.
+    query = query.order_by(events.c.timestamp.desc(), events.c.id.desc()).limit(count)
+    if cursor:
+        # Row-value comparison so SQLite seeks the index instead of scanning
+        query = query.where(tuple_(ts_text, events.c.id) < tuple_(*cursor))
+    return query
+
+
 @router.get("/activities", response_model=ActivityListResponse)
 async def list_activities(
     project_id: int | None = Query(None),
     event_type: str | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated; ignored when cursor is given"),
+    include_total: bool = Query(False, description="Also count all matching events (full scan)"),
     db: AsyncSession = Depends(get_db),
 ):
-    # Base query with optional session join for session_name
-    base_query = select(Event, Session.name.label("session_name")).outerjoin(
-        Session, Event.session_id == Session.id
-    )
+    """Newest events first, archived months included.
 
-    # Apply filters
-    if event_type:
-        base_query = base_query.where(Event.event_type == event_type)
-    if project_id:
-        base_query = base_query.where(Session.project_id == project_id)
+    Each source (the live DB, then archive months newest first) returns its
+    own first page and the pages are merged; a month is only opened while
+    the page can still reach back into it. One extra row tells whether a
+    next page exists.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    skip = 0 if after else offset
+    wanted = skip + limit + 1
 
-    # Count total
-    count_query = select(sa_func.count()).select_from(base_query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    query, ts_text = _activity_query(Event.__table__, Session.__table__, event_type, project_id)
+    total = None
+    if include_total:
+        total = (await db.execute(select(sa_func.count()).select_from(query.subquery()))).scalar() or 0
+    rows = list((await db.execute(_activity_page(query, ts_text, Event.__table__, after, wanted))).all())
 
-    # Fetch paginated results
-    query = base_query.order_by(Event.timestamp.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    rows = result.all()
+    months = select(ArchivedMonth.month, ArchivedMonth.last_time).order_by(ArchivedMonth.month.desc())
+    if after:
+        months = months.where(ArchivedMonth.first_time <= datetime.fromisoformat(after[0]))
+    months = (await db.execute(months)).all()
+    if months:
+        async with engine.connect() as conn:
+            for month, last_time in months:
+                # Months are newest first: once a full page is newer than this one, it is done
+                if not include_total and len(rows) >= wanted and rows[wanted - 1].timestamp > last_time:
+                    break
+                async with attach_month(conn, month) as archive:
+                    query, ts_text = _activity_query(archive["events"], archive["sessions"], event_type, project_id)
+                    if include_total:
+                        total += (await conn.execute(select(sa_func.count()).select_from(query.subquery()))).scalar() or 0
+                    rows += (await conn.execute(_activity_page(query, ts_text, archive["events"], after, wanted))).all()
+                rows.sort(key=lambda row: (row.ts_text, row.id), reverse=True)
+                rows = rows[:wanted]
+    rows = rows[skip:]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].ts_text, rows[-1].id)
 
     items = [
         ActivityItem(
-            id=row.Event.id,
-            type=row.Event.event_type,
-            timestamp=row.Event.timestamp,
-            payload=row.Event.payload,
-            session_id=row.Event.session_id,
+            id=row.id,
+            type=row.event_type,
+            timestamp=row.timestamp,
+            payload=row.payload,
+            session_id=row.session_id,
             session_name=row.session_name,
         )
         for row in rows
     ]
 
-    return ActivityListResponse(items=items, total=total, limit=limit, offset=offset)
+    return ActivityListResponse(
+        items=items, total=total, limit=limit, offset=0 if cursor else offset, next_cursor=next_cursor,
+    )
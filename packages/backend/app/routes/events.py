@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import Table
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.event import Event, AgentExecution, ToolCall, FileChange, Error
@@ -6,13 +7,25 @@ from app.schemas.event import (
     EventCreate, BatchEventCreate, EventResponse,
     AgentExecutionCreate, ToolCallBatchCreate, FileChangeBatchCreate, ErrorCreate,
 )
+from app.services.ingest import bulk_insert
+from app.services.telemetry_import import import_telemetry, ImportFormatError
 from app.services.websocket import manager
+from app.services.write_behind import ingest_queue, IngestQueueFull
 
 router = APIRouter()
 
 
+async def _enqueue(table: Table, values: dict) -> dict:
+    try:
+        return await ingest_queue.submit(table, values)
+    except IngestQueueFull:
+        raise HTTPException(status_code=429, detail="Ingest queue is full, retry later")
+
+
 @router.post("", response_model=EventResponse, status_code=201)
 async def create_event(data: EventCreate, db: AsyncSession = Depends(get_db)):
+    if ingest_queue.running:
+        return await _enqueue(Event.__table__, data.model_dump())
     event = Event(**data.model_dump())
     db.add(event)
     await db.commit()
@@ -22,18 +35,36 @@ async def create_event(data: EventCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/batch")
 async def create_events_batch(data: BatchEventCreate, db: AsyncSession = Depends(get_db)):
-    events = [Event(**e.model_dump()) for e in data.events]
-    db.add_all(events)
+    inserted = await bulk_insert(db, Event.__table__, [e.model_dump() for e in data.events])
     await db.commit()
 
     # Broadcast batch event creation
-    await manager.broadcast("event", "batch_created", {"count": len(events)})
+    await manager.broadcast("event", "batch_created", {"count": inserted})
+
+    return {"inserted": inserted, "failed": 0}
+
+
+@router.post("/import")
+async def import_events(request: Request):
+    """Replay spooled telemetry from a gzip (or plain) NDJSON request body.
 
-    return {"inserted": len(events), "failed": 0}
+    Safe to re-send: records whose key was already imported are counted as
+    duplicates.
+    """
+    try:
+        result = await import_telemetry(request.stream())
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if result["inserted"]:
+        await manager.broadcast("event", "batch_created", {"count": sum(result["inserted"].values())})
+    return result
 
 
 @router.post("/agent-executions", status_code=201)
 async def create_agent_execution(data: AgentExecutionCreate, db: AsyncSession = Depends(get_db)):
+    if ingest_queue.running:
+        row = await _enqueue(AgentExecution.__table__, data.model_dump())
+        return {"id": row["id"]}
     agent = AgentExecution(**data.model_dump())
     db.add(agent)
     await db.commit()
@@ -43,22 +74,23 @@ async def create_agent_execution(data: AgentExecutionCreate, db: AsyncSession =
 
 @router.post("/tool-calls/batch")
 async def create_tool_calls_batch(data: ToolCallBatchCreate, db: AsyncSession = Depends(get_db)):
-    tool_calls = [ToolCall(**tc) for tc in data.tool_calls]
-    db.add_all(tool_calls)
+    inserted = await bulk_insert(db, ToolCall.__table__, data.tool_calls)
     await db.commit()
-    return {"inserted": len(tool_calls)}
+    return {"inserted": inserted}
 
 
 @router.post("/file-changes/batch")
 async def create_file_changes_batch(data: FileChangeBatchCreate, db: AsyncSession = Depends(get_db)):
-    changes = [FileChange(**fc) for fc in data.file_changes]
-    db.add_all(changes)
+    inserted = await bulk_insert(db, FileChange.__table__, data.file_changes)
     await db.commit()
-    return {"inserted": len(changes)}
+    return {"inserted": inserted}
 
 
 @router.post("/errors", status_code=201)
 async def create_error(data: ErrorCreate, db: AsyncSession = Depends(get_db)):
+    if ingest_queue.running:
+        row = await _enqueue(Error.__table__, data.model_dump())
+        return {"id": row["id"]}
     error = Error(**data.model_dump())
     db.add(error)
     await db.commit()
@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import JSON, Table, select
+from app.database import engine, naive_utc
+from app.models.event import Session, Event, ToolCall, FileChange, Error
+from app.services.archive import archived_months, attach_month
+
+router = APIRouter()
+
+# Rows fetched from the server-side cursor per round trip; also the number of
+# rows serialized into one response chunk.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_TABLES: dict[str, Table] = {
+    "events": Event.__table__,
+    "tool-calls": ToolCall.__table__,
+    "file-changes": FileChange.__table__,
+    "errors": Error.__table__,
+}
+
+# Source name of the live database in export rows and resume cursors; it
+# sorts after every YYYY-MM archive month, matching the streaming order.
+LIVE_SOURCE = "live"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _export_query(
+    table: Table,
+    sessions: Table,
+    project_id: int | None,
+    session_id: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    after_id: int | None = None,
+):
+    query = select(*table.columns).order_by(table.c.id)
+    if session_id:
+        query = query.where(table.c.session_id == session_id)
+    if project_id is not None:
+        query = query.where(table.c.session_id.in_(
+            select(sessions.c.id).where(sessions.c.project_id == project_id)
+        ))
+    if since or until:
+        if "timestamp" in table.c:
+            if since:
+                query = query.where(table.c.timestamp >= since)
+            if until:
+                query = query.where(table.c.timestamp < until)
+        else:
+            # Tool calls carry no timestamp; select those of sessions started in range
+            in_range = select(sessions.c.id)
+            if since:
+                in_range = in_range.where(sessions.c.start_time >= since)
+            if until:
+                in_range = in_range.where(sessions.c.start_time < until)
+            query = query.where(table.c.session_id.in_(in_range))
+    if after_id is not None:
+        query = query.where(table.c.id > after_id)
+    return query
+
+
+def _parse_after(after: str) -> tuple[str, int]:
+    """``<source>:<id>`` of the last row received, e.g. ``2026-03:1234`` or ``live:99``."""
+    source, _, row_id = after.rpartition(":")
+    if not (source == LIVE_SOURCE or re.fullmatch(r"\d{4}-\d{2}", source)) or not row_id.isdigit():
+        raise HTTPException(status_code=400, detail="after must be '<YYYY-MM or live>:<id>'")
+    return source, int(row_id)
+
+
+def _ndjson_chunk(names: list[str], source: str, rows) -> str:
+    return "".join(
+        json.dumps({**dict(zip(names, row)), "source": source}, default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(names: list[str], json_columns: set[str], source: str | None, rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, default=_json_default, ensure_ascii=False)
+            if name in json_columns and value is not None
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for name, value in zip(names, row)
+        ] + ([source] if source else []))
+    return buffer.getvalue()
+
+
+async def _stream_rows(table: Table, filters: dict, fmt: str, after: tuple[str, int] | None) -> AsyncIterator[str]:
+    names = [c.name for c in table.columns]
+    json_columns = {c.name for c in table.columns if isinstance(c.type, JSON)}
+    if fmt == "csv":
+        # Send the header straight away so the client sees bytes before the first fetch
+        yield _csv_chunk([*names, "source"], set(), None, [[*names, "source"]])
+
+    async def rows(source: str, source_table: Table, sessions: Table):
+        after_id = after[1] if after and source == after[0] else None
+        query = _export_query(source_table, sessions, **filters, after_id=after_id)
+        result = await conn.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            if fmt == "csv":
+                yield _csv_chunk(names, json_columns, source, partition)
+            else:
+                yield _ndjson_chunk(names, source, partition)
+
+    # The connection is opened here rather than through get_db: the generator
+    # runs after the endpoint has returned, and must own it until the end.
+    async with engine.connect() as conn:
+        # Archived months first (they hold the oldest sessions), then the live DB
+        for month in await archived_months(conn, filters["since"], filters["until"]):
+            if after and month < after[0]:
+                # Sources stream in order, so those before the cursor's are done
+                continue
+            async with attach_month(conn, month) as archive:
+                async for chunk in rows(month, archive[table.name], archive["sessions"]):
+                    yield chunk
+        async for chunk in rows(LIVE_SOURCE, table, Session.__table__):
+            yield chunk
+
+
+@router.get("/{kind}")
+async def export_rows(
+    kind: str,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    project_id: int | None = None,
+    session_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after: str | None = Query(
+        None, description="Resume an interrupted export after this '<source>:<id>' of the last row received",
+    ),
+):
+    """Stream raw telemetry rows as NDJSON or CSV, archived months included.
+
+    Rows are read through a server-side cursor and written out batch by batch,
+    so memory use does not depend on the size of the export. Each source
+    (archive months oldest first, then the live DB) is streamed in id order,
+    and every row names its ``source`` (``YYYY-MM`` or ``live``): ids are
+    only unique within one source, so a resume cursor needs both.
+    """
+    table = EXPORT_TABLES.get(kind)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{kind}'")
+
+    filters = {
+        "project_id": project_id, "session_id": session_id, "since": naive_utc(since), "until": naive_utc(until),
+    }
+    filename = f"{table.name}.{fmt}"
+    return StreamingResponse(
+        _stream_rows(table, filters, fmt, _parse_after(after) if after else None),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
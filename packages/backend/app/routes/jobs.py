@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.services.jobs import job_runner
+
+router = APIRouter()
+
+
+@router.get("")
+async def list_jobs(status: str | None = Query(None)):
+    """Running and recently finished background jobs, newest first."""
+    jobs = job_runner.list()
+    if status:
+        jobs = [job for job in jobs if job.status == status]
+    return [job.to_dict() for job in jobs]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = job_runner.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
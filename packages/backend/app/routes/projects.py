@@ -1,35 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sa_func
+from sqlalchemy import select
 from app.database import get_db
-from app.models.project import Project
-from app.models.task import Task
+from app.models.project import Project, ProjectStats
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.services.dependencies import dependency_graphs
 from app.services.websocket import manager
 
 router = APIRouter()
 
 
+def _response(project, stats) -> ProjectResponse:
+    return ProjectResponse(
+        id=project.id, name=project.name, description=project.description,
+        status=project.status, path=project.path,
+        created_at=project.created_at, updated_at=project.updated_at,
+        task_count=stats.task_count if stats else 0,
+        completed_task_count=stats.done_count if stats else 0,
+        open_error_count=stats.open_error_count if stats else 0,
+        active_session_count=stats.active_session_count if stats else 0,
+    )
+
+
 @router.get("", response_model=list[ProjectResponse])
 async def list_projects(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Project).order_by(Project.updated_at.desc()))
-    projects = result.scalars().all()
-    responses = []
-    for p in projects:
-        task_result = await db.execute(
-            select(sa_func.count(Task.id)).where(Task.project_id == p.id)
-        )
-        total = task_result.scalar() or 0
-        done_result = await db.execute(
-            select(sa_func.count(Task.id)).where(Task.project_id == p.id, Task.status == "done")
-        )
-        done = done_result.scalar() or 0
-        responses.append(ProjectResponse(
-            id=p.id, name=p.name, description=p.description, status=p.status,
-            path=p.path, created_at=p.created_at, updated_at=p.updated_at,
-            task_count=total, completed_task_count=done,
-        ))
-    return responses
+    # Counts come from the trigger-maintained project_stats rows, so the
+    # listing never scans tasks. Selecting the Project entity without
+    # relationships loads no collections.
+    result = await db.execute(
+        select(Project, ProjectStats)
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+        .order_by(Project.updated_at.desc())
+    )
+    return [_response(project, stats) for project, stats in result.all()]
 
 
 @router.post("", response_model=ProjectResponse, status_code=201)
@@ -55,24 +58,15 @@ async def create_project(data: ProjectCreate, db: AsyncSession = Depends(get_db)
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(project_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    task_result = await db.execute(
-        select(sa_func.count(Task.id)).where(Task.project_id == project.id)
-    )
-    total = task_result.scalar() or 0
-    done_result = await db.execute(
-        select(sa_func.count(Task.id)).where(Task.project_id == project.id, Task.status == "done")
-    )
-    done = done_result.scalar() or 0
-    return ProjectResponse(
-        id=project.id, name=project.name, description=project.description,
-        status=project.status, path=project.path,
-        created_at=project.created_at, updated_at=project.updated_at,
-        task_count=total, completed_task_count=done,
+    result = await db.execute(
+        select(Project, ProjectStats)
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+        .where(Project.id == project_id)
     )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return _response(*row)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -113,3 +107,26 @@ async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
     await manager.broadcast("project", "deleted", {"id": project_id})
 
     return {"deleted": True}
+
+
+async def _project_graph(db: AsyncSession, project_id: int):
+    exists = (await db.execute(select(Project.id).where(Project.id == project_id))).scalar()
+    if exists is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await dependency_graphs.get(db, project_id)
+
+
+@router.get("/{project_id}/ready-tasks")
+async def list_ready_tasks(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Todo tasks whose prerequisites are all done or archived."""
+    graph = await _project_graph(db, project_id)
+    ready = graph.ready()
+    return {"tasks": [graph.summary(i) for i in ready], "count": len(ready)}
+
+
+@router.get("/{project_id}/critical-path")
+async def get_critical_path(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Longest chain of unfinished dependent tasks."""
+    graph = await _project_graph(db, project_id)
+    path = graph.critical_path()
+    return {"tasks": [graph.summary(i) for i in path], "length": len(path)}
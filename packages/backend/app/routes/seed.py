@@ -1,24 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from app.database import get_db
 from app.models.project import Project, Milestone, Label, TaskLabel
 from app.models.task import Task, TaskDependency
 from app.models.event import Session, Event, AgentExecution, SkillInvocation, ToolCall, FileChange, Error
-from app.models.analytics import DailyStats, AgentUsageStats
+from app.models.analytics import DailyStats, AgentUsageStats, RollupState
+from app.services.cache import analytics_cache
+from app.services.dependencies import dependency_graphs
+from app.services.git_import import import_git_history, GitError
+from app.services.jobs import Job, submit_db_job
+from app.services.latency import LatencySketch
+import math
 import uuid
 import random
 from datetime import date, datetime, timedelta
-import subprocess
 import os
-from collections import defaultdict
 
 router = APIRouter()
 
 
 @router.post("/demo")
-async def seed_demo_data(db: AsyncSession = Depends(get_db)):
+async def seed_demo_data(
+    response: Response,
+    background: bool = Query(False, description="Run as a job and return its id (202)"),
+    db: AsyncSession = Depends(get_db),
+):
     """Seed database with demo data for testing and demonstration."""
+    if background:
+        response.status_code = 202
+        return submit_db_job("seed_demo", _seed_demo).to_dict()
+    return await _seed_demo(db)
+
+
+async def _seed_demo(db: AsyncSession, job: Job | None = None):
 
     # Labels
     labels_data = [
@@ -255,18 +270,30 @@ async def seed_demo_data(db: AsyncSession = Depends(get_db)):
         current_date = today - timedelta(days=i)
 
         for agent_type, model in agent_configs:
+            total_calls = random.randint(10, 50)
+            durations = LatencySketch()
+            typical_ms = random.randint(800, 3000)
+            for _ in range(total_calls):
+                durations.add(random.lognormvariate(math.log(typical_ms), 0.6))
+            tool_durations = LatencySketch()
+            for _ in range(total_calls * 3):
+                tool_durations.add(random.lognormvariate(math.log(120), 1.0))
             stats = AgentUsageStats(
                 agent_type=agent_type,
                 model=model,
                 date=current_date,
-                total_calls=random.randint(10, 50),
-                avg_duration_ms=random.randint(800, 3000),
+                total_calls=total_calls,
+                avg_duration_ms=durations.mean,
                 success_count=random.randint(8, 45),
-                failure_count=random.randint(0, 5)
+                failure_count=random.randint(0, 5),
+                duration_sketch=durations.to_json(),
+                tool_duration_sketch=tool_durations.to_json(),
             )
             db.add(stats)
 
     await db.commit()
+    analytics_cache.invalidate()
+    dependency_graphs.invalidate()
 
     return {
         "status": "success",
@@ -284,8 +311,19 @@ async def seed_demo_data(db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/reset")
-async def reset_all_data(db: AsyncSession = Depends(get_db)):
+async def reset_all_data(
+    response: Response,
+    background: bool = Query(False, description="Run as a job and return its id (202)"),
+    db: AsyncSession = Depends(get_db),
+):
     """Delete all data from the database."""
+    if background:
+        response.status_code = 202
+        return submit_db_job("reset", _reset_all).to_dict()
+    return await _reset_all(db)
+
+
+async def _reset_all(db: AsyncSession, job: Job | None = None):
 
     # Delete in correct order to respect foreign key constraints
     await db.execute(delete(Event))
@@ -301,10 +339,13 @@ async def reset_all_data(db: AsyncSession = Depends(get_db)):
     await db.execute(delete(Milestone))
     await db.execute(delete(AgentUsageStats))
     await db.execute(delete(DailyStats))
+    await db.execute(delete(RollupState))
     await db.execute(delete(Label))
     await db.execute(delete(Project))
 
     await db.commit()
+    analytics_cache.invalidate()
+    dependency_graphs.invalidate()
 
     return {
         "status": "success",
@@ -313,15 +354,31 @@ async def reset_all_data(db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/init-from-git")
-async def init_from_git(request: dict, db: AsyncSession = Depends(get_db)):
-    """Initialize a project from git history. Imports commits, tags, file changes, and daily stats."""
+async def init_from_git(
+    request: dict,
+    response: Response,
+    background: bool = Query(False, description="Run as a job and return its id (202)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Initialize a project from git history. Imports commits, tags, file changes, and daily stats.
+
+    Running it again for the same path only imports commits added since.
+    """
+    if background:
+        response.status_code = 202
+        params = {k: request.get(k) for k in ("project_path", "project_name", "max_commits", "since") if request.get(k)}
+        return submit_db_job("init_from_git", lambda db, job: _init_from_git(request, db, job), params).to_dict()
+    return await _init_from_git(request, db)
+
+
+async def _init_from_git(request: dict, db: AsyncSession, job: Job | None = None):
 
     project_path = request.get("project_path")
     if not project_path or not os.path.isdir(project_path):
         return {"status": "error", "message": f"Invalid project path: {project_path}"}
 
     git_dir = os.path.join(project_path, ".git")
-    if not os.path.isdir(git_dir):
+    if not os.path.exists(git_dir):
         return {"status": "error", "message": f"Not a git repository: {project_path}"}
 
     project_name = request.get("project_name") or os.path.basename(os.path.abspath(project_path))
@@ -337,199 +394,28 @@ async def init_from_git(request: dict, db: AsyncSession = Depends(get_db)):
         db.add(project)
         await db.flush()
 
-    pid = project.id
-
-    # 2. Parse git log
-    git_log_cmd = [
-        "git", "-C", project_path, "log",
-        f"--format=%H|%ai|%s|%an",
-        f"--max-count={max_commits}",
-    ]
-    if since:
-        git_log_cmd.append(f"--since={since}")
-
+    # 2. Commits, file changes, tags and daily stats from one git log stream
     try:
-        log_result = subprocess.run(git_log_cmd, capture_output=True, text=True, timeout=30)
-    except Exception as e:
+        counts = await import_git_history(
+            db, project, max_commits=max_commits, since=since,
+            on_progress=(lambda n: job.update(n / max_commits, f"{n} commits read")) if job else None,
+        )
+    except GitError as e:
+        await db.rollback()
+        return {"status": "error", "message": f"git log failed: {e}"}
+    except (OSError, TimeoutError) as e:
+        await db.rollback()
         return {"status": "error", "message": f"Failed to run git log: {e}"}
 
-    if log_result.returncode != 0:
-        return {"status": "error", "message": f"git log failed: {log_result.stderr.strip()}"}
-
-    lines = [l.strip() for l in log_result.stdout.strip().split("\n") if l.strip()]
-    if not lines:
+    if not counts["commits"] and not counts["already_imported"]:
+        await db.rollback()
         return {"status": "error", "message": "No commits found"}
 
-    # 3. Group commits by date -> Sessions
-    commits_by_date = defaultdict(list)
-    for line in lines:
-        parts = line.split("|", 3)
-        if len(parts) < 4:
-            continue
-        commit_hash, timestamp_str, message, author = parts
-        try:
-            commit_time = datetime.fromisoformat(timestamp_str.strip())
-        except ValueError:
-            continue
-        commit_date = commit_time.date()
-        commits_by_date[commit_date].append({
-            "hash": commit_hash.strip(),
-            "time": commit_time,
-            "message": message.strip(),
-            "author": author.strip(),
-        })
-
-    sessions_map = {}  # date -> session_id
-    all_events = []
-    all_file_changes = []
-    commit_hashes = []
-
-    for d, commits in commits_by_date.items():
-        sid = str(uuid.uuid4())
-        sessions_map[d] = sid
-
-        earliest = min(c["time"] for c in commits)
-        latest = max(c["time"] for c in commits)
-
-        session = Session(
-            id=sid,
-            project_id=pid,
-            start_time=earliest,
-            end_time=latest,
-            summary=f"Git history: {len(commits)} commit(s) on {d.isoformat()}",
-        )
-        db.add(session)
-
-        for c in commits:
-            event = Event(
-                session_id=sid,
-                event_type="commit",
-                timestamp=c["time"],
-                payload={"hash": c["hash"][:8], "message": c["message"], "author": c["author"]},
-            )
-            all_events.append(event)
-            commit_hashes.append(c["hash"])
-
-    await db.flush()
-    db.add_all(all_events)
-    await db.flush()
-
-    # 4. File changes per commit
-    EMPTY_TREE = "4b825dc642cb6eb9a060e54bf899d15363d7aa16"
-
-    for i, full_hash in enumerate(commit_hashes):
-        parent_ref = EMPTY_TREE if i == len(commit_hashes) - 1 else f"{full_hash}^"
-        diff_cmd = [
-            "git", "-C", project_path, "diff", "--numstat", f"{parent_ref}..{full_hash}",
-        ]
-        try:
-            diff_result = subprocess.run(diff_cmd, capture_output=True, text=True, timeout=10)
-        except Exception:
-            continue
-
-        if diff_result.returncode != 0:
-            continue
-
-        # Find the session for this commit
-        commit_date = None
-        for d, commits in commits_by_date.items():
-            if any(c["hash"] == full_hash for c in commits):
-                commit_date = d
-                break
-        if not commit_date or commit_date not in sessions_map:
-            continue
-
-        sid = sessions_map[commit_date]
-
-        for diff_line in diff_result.stdout.strip().split("\n"):
-            if not diff_line.strip():
-                continue
-            diff_parts = diff_line.split("\t")
-            if len(diff_parts) < 3:
-                continue
-            added_str, removed_str, file_path = diff_parts[0], diff_parts[1], diff_parts[2]
-
-            try:
-                added = int(added_str) if added_str != "-" else 0
-                removed = int(removed_str) if removed_str != "-" else 0
-            except ValueError:
-                continue
-
-            if added > 0 and removed == 0:
-                change_type = "created"
-            elif removed > 0 and added == 0:
-                change_type = "deleted"
-            else:
-                change_type = "modified"
-
-            fc = FileChange(
-                session_id=sid,
-                file_path=file_path,
-                change_type=change_type,
-                lines_added=added,
-                lines_removed=removed,
-            )
-            all_file_changes.append(fc)
-
-    if all_file_changes:
-        db.add_all(all_file_changes)
-        await db.flush()
-
-    # 5. Git tags -> Milestones
-    tag_cmd = ["git", "-C", project_path, "tag", "-l", "--format=%(refname:short)|%(creatordate:iso)"]
-    milestones_count = 0
-    try:
-        tag_result = subprocess.run(tag_cmd, capture_output=True, text=True, timeout=10)
-        if tag_result.returncode == 0 and tag_result.stdout.strip():
-            for tag_line in tag_result.stdout.strip().split("\n"):
-                if not tag_line.strip():
-                    continue
-                tag_parts = tag_line.split("|", 1)
-                tag_name = tag_parts[0].strip()
-                if not tag_name:
-                    continue
-                tag_date = None
-                if len(tag_parts) > 1 and tag_parts[1].strip():
-                    try:
-                        tag_date = datetime.fromisoformat(tag_parts[1].strip())
-                    except ValueError:
-                        pass
-                milestone = Milestone(
-                    project_id=pid,
-                    title=tag_name,
-                    status="completed",
-                    due_date=tag_date,
-                )
-                db.add(milestone)
-                milestones_count += 1
-    except Exception:
-        pass
-
-    # 6. Daily stats
-    daily_stats_count = 0
-    for d, commits in commits_by_date.items():
-        stats = DailyStats(
-            project_id=pid,
-            date=d,
-            tasks_completed=len(commits),
-            session_count=1,
-            tokens_used=0,
-            agent_calls=0,
-        )
-        db.add(stats)
-        daily_stats_count += 1
-
     await db.commit()
+    analytics_cache.invalidate()
 
     return {
         "status": "success",
-        "project_id": pid,
-        "counts": {
-            "commits": len(commit_hashes),
-            "sessions": len(sessions_map),
-            "events": len(all_events),
-            "file_changes": len(all_file_changes),
-            "milestones": milestones_count,
-            "daily_stats": daily_stats_count,
-        },
+        "project_id": project.id,
+        "counts": counts,
     }
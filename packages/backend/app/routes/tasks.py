@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, case
 from app.database import get_db
-from app.models.task import Task
+from app.models.task import Task, TaskDependency
 from app.models.event import TaskExecution
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskStatusUpdate,
-    TaskReorderRequest, TaskBulkUpdate, TaskResponse,
+    TaskReorderRequest, TaskMoveRequest, TaskDependencyCreate, TaskBulkUpdate, TaskResponse,
 )
 from app.schemas.event import TaskExecutionResponse
+from app.services.dependencies import DependencyCycleError, dependency_graphs
+from app.services.task_order import end_of_column, move_task
 from app.services.websocket import manager
 
 router = APIRouter()
@@ -23,7 +25,7 @@ async def list_tasks(
     phase: str | None = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Task).order_by(Task.sort_order)
+    query = select(Task).order_by(Task.sort_order, Task.id)
     if project_id:
         query = query.where(Task.project_id == project_id)
     if status:
@@ -41,6 +43,8 @@ async def list_tasks(
 @router.post("", response_model=TaskResponse, status_code=201)
 async def create_task(data: TaskCreate, db: AsyncSession = Depends(get_db)):
     task = Task(**data.model_dump())
+    if "sort_order" not in data.model_fields_set:
+        task.sort_order = await end_of_column(db, task.project_id, task.status)
     db.add(task)
     await db.commit()
     await db.refresh(task)
@@ -112,32 +116,120 @@ async def update_task_status(task_id: int, data: TaskStatusUpdate, db: AsyncSess
     return task
 
 
+# SQLite's default limit on bound parameters per statement (3.32 and later)
+SQLITE_MAX_VARIABLES = 32766
+# Parameters per task in the reorder UPDATE, the widest statement chunked
+# below: a WHEN/THEN pair in each of the sort_order and status CASEs, plus
+# the task's entry in the IN list
+PARAMS_PER_TASK = 5
+# Tasks per statement
+SET_BASED_CHUNK = SQLITE_MAX_VARIABLES // PARAMS_PER_TASK
+
+_CHANGED_COLUMNS = (Task.id, Task.project_id, Task.status, Task.sort_order)
+
+
+def _changed(row) -> dict:
+    return {"id": row.id, "project_id": row.project_id, "status": row.status, "sort_order": row.sort_order}
+
+
 @router.patch("/reorder")
 async def reorder_tasks(items: list[TaskReorderRequest], db: AsyncSession = Depends(get_db)):
-    for item in items:
-        result = await db.execute(select(Task).where(Task.id == item.task_id))
-        task = result.scalar_one_or_none()
-        if task:
-            task.sort_order = item.new_sort_order
-            if item.new_status:
-                task.status = item.new_status
+    # Later entries for the same task win, as they did when applied one by one
+    by_id = {item.task_id: item for item in items}
+    ids = list(by_id)
+    changed = []
+    for start in range(0, len(ids), SET_BASED_CHUNK):
+        chunk = ids[start:start + SET_BASED_CHUNK]
+        values = {"sort_order": case({i: by_id[i].new_sort_order for i in chunk}, value=Task.id)}
+        statuses = {i: by_id[i].new_status for i in chunk if by_id[i].new_status}
+        if statuses:
+            values["status"] = case(statuses, value=Task.id, else_=Task.status)
+        # One UPDATE ... SET sort_order = CASE id WHEN ... per chunk; RETURNING
+        # gives the new positions without reading the rows back.
+        result = await db.execute(
+            update(Task).where(Task.id.in_(chunk)).values(**values)
+            .returning(*_CHANGED_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        changed.extend(_changed(row) for row in result.all())
     await db.commit()
-    return {"updated": len(items)}
+
+    if changed:
+        await manager.broadcast("task", "reordered", {
+            "ids": [t["id"] for t in changed],
+            "project_ids": sorted({t["project_id"] for t in changed}),
+            "count": len(changed),
+        })
+
+    changed.sort(key=lambda t: (t["project_id"], t["status"], t["sort_order"]))
+    return {"updated": len(changed), "tasks": changed}
+
+
+@router.post("/{task_id}/move")
+async def move(task_id: int, data: TaskMoveRequest, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        keys = await move_task(db, task, data.after_id, data.before_id, data.status)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    await manager.broadcast("task", "moved", {
+        "id": task.id,
+        "project_id": task.project_id,
+        "status": task.status,
+        "sort_order": task.sort_order,
+        "rebalanced": len(keys) - 1,
+    })
+
+    return {
+        "id": task.id,
+        "project_id": task.project_id,
+        "status": task.status,
+        "sort_order": task.sort_order,
+        # Every key written, including neighbours respread to make room
+        "sort_orders": keys,
+    }
 
 
 @router.patch("/bulk")
 async def bulk_update(data: TaskBulkUpdate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Task).where(Task.id.in_(data.task_ids)))
-    tasks = result.scalars().all()
-    for task in tasks:
-        if data.status:
-            task.status = data.status
-        if data.priority:
-            task.priority = data.priority
-        if data.milestone_id is not None:
-            task.milestone_id = data.milestone_id
+    values = {}
+    if data.status:
+        values["status"] = data.status
+    if data.priority:
+        values["priority"] = data.priority
+    if data.milestone_id is not None:
+        values["milestone_id"] = data.milestone_id
+
+    ids = list(dict.fromkeys(data.task_ids))
+    changed = []
+    for start in range(0, len(ids), SET_BASED_CHUNK):
+        chunk = ids[start:start + SET_BASED_CHUNK]
+        if values:
+            result = await db.execute(
+                update(Task).where(Task.id.in_(chunk)).values(**values)
+                .returning(*_CHANGED_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            result = await db.execute(select(*_CHANGED_COLUMNS).where(Task.id.in_(chunk)))
+        changed.extend(_changed(row) for row in result.all())
     await db.commit()
-    return {"updated": len(tasks)}
+
+    if changed and values:
+        await manager.broadcast("task", "bulk_updated", {
+            "ids": [t["id"] for t in changed],
+            "project_ids": sorted({t["project_id"] for t in changed}),
+            "count": len(changed),
+            **values,
+        })
+
+    return {"updated": len(changed), "tasks": changed}
 
 
 @router.delete("/{task_id}")
@@ -155,6 +247,79 @@ async def delete_task(task_id: int, db: AsyncSession = Depends(get_db)):
     return {"deleted": True}
 
 
+async def _get_task(db: AsyncSession, task_id: int) -> Task:
+    result = await db.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.get("/{task_id}/dependencies")
+async def list_dependencies(task_id: int, db: AsyncSession = Depends(get_db)):
+    task = await _get_task(db, task_id)
+    graph = await dependency_graphs.get(db, task.project_id)
+    return {
+        "depends_on": [graph.summary(i) for i in sorted(graph.depends_on.get(task_id, ()))],
+        "dependents": [graph.summary(i) for i in sorted(graph.dependents.get(task_id, ()))],
+        "blocked": graph.blocked(task_id),
+    }
+
+
+@router.post("/{task_id}/dependencies", status_code=201)
+async def add_dependency(task_id: int, data: TaskDependencyCreate, db: AsyncSession = Depends(get_db)):
+    task = await _get_task(db, task_id)
+    prerequisite = await _get_task(db, data.depends_on_id)
+    if prerequisite.project_id != task.project_id:
+        raise HTTPException(status_code=400, detail="Tasks belong to different projects")
+
+    async with dependency_graphs.write_lock:
+        graph = await dependency_graphs.get(db, task.project_id)
+        if data.depends_on_id not in graph.depends_on.get(task_id, ()):
+            try:
+                graph.check_edge(task_id, data.depends_on_id)
+            except DependencyCycleError as exc:
+                raise HTTPException(status_code=409, detail={"message": str(exc), "cycle": exc.path})
+            db.add(TaskDependency(task_id=task_id, depends_on_id=data.depends_on_id))
+            await db.commit()
+            dependency_graphs.edge_changed(task.project_id, task_id, data.depends_on_id, added=True)
+            await manager.broadcast("task", "dependency_added", {
+                "id": task_id,
+                "project_id": task.project_id,
+                "depends_on_id": data.depends_on_id,
+            })
+
+    return {"task_id": task_id, "depends_on_id": data.depends_on_id}
+
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}")
+async def remove_dependency(task_id: int, depends_on_id: int, db: AsyncSession = Depends(get_db)):
+    task = await _get_task(db, task_id)
+    async with dependency_graphs.write_lock:
+        result = await db.execute(
+            delete(TaskDependency).where(
+                TaskDependency.task_id == task_id, TaskDependency.depends_on_id == depends_on_id,
+            )
+        )
+        await db.commit()
+        if result.rowcount:
+            dependency_graphs.edge_changed(task.project_id, task_id, depends_on_id, added=False)
+            await manager.broadcast("task", "dependency_removed", {
+                "id": task_id,
+                "project_id": task.project_id,
+                "depends_on_id": depends_on_id,
+            })
+    return {"deleted": bool(result.rowcount)}
+
+
+@router.get("/{task_id}/blockers")
+async def list_blockers(task_id: int, db: AsyncSession = Depends(get_db)):
+    task = await _get_task(db, task_id)
+    graph = await dependency_graphs.get(db, task.project_id)
+    blockers = graph.blockers(task_id)
+    return {"blockers": [graph.summary(i) for i in blockers], "count": len(blockers)}
+
+
 @router.get("/{task_id}/executions", response_model=list[TaskExecutionResponse])
 async def list_task_executions(task_id: int, db: AsyncSession = Depends(get_db)):
     # Verify task exists
@@ -16,6 +16,9 @@ class TrendData(BaseModel):
     tasks_completed: list[int]
     tokens_used: list[int]
     session_counts: list[int]
+    agent_calls: list[int] = []
+    bucket: str = "day"
+    bucket_seconds: int = 86400
 
 
 class AgentStatsResponse(BaseModel):
@@ -24,6 +27,13 @@ class AgentStatsResponse(BaseModel):
     total_calls: int
     avg_duration_ms: float
     success_rate: float
+    # From the merged latency sketches; None when no durations were reported
+    p50_duration_ms: float | None = None
+    p95_duration_ms: float | None = None
+    p99_duration_ms: float | None = None
+    tool_p50_duration_ms: float | None = None
+    tool_p95_duration_ms: float | None = None
+    tool_p99_duration_ms: float | None = None
 
 
 class ActivityItem(BaseModel):
@@ -37,6 +47,7 @@ class ActivityItem(BaseModel):
 
 class ActivityListResponse(BaseModel):
     items: list[ActivityItem]
-    total: int
+    total: int | None = None  # only computed when include_total=true
     limit: int
     offset: int
+    next_cursor: str | None = None
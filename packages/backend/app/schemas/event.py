@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel
 
 
@@ -108,6 +109,31 @@ class FileChangeBatchCreate(BaseModel):
     file_changes: list[dict]
 
 
+class ToolCallCreate(BaseModel):
+    session_id: str
+    agent_execution_id: int | None = None
+    tool_name: str
+    parameters: dict | None = None
+    duration_ms: int | None = None
+    success: bool = True
+
+
+class FileChangeCreate(BaseModel):
+    session_id: str
+    file_path: str
+    change_type: str
+    lines_added: int = 0
+    lines_removed: int = 0
+    timestamp: datetime | None = None
+
+
+class ImportRecord(BaseModel):
+    """One NDJSON line of a telemetry import."""
+    kind: Literal["session", "event", "tool_call", "file_change"]
+    key: str | None = None  # idempotency key; records without one are always inserted
+    data: dict
+
+
 class ErrorCreate(BaseModel):
     session_id: str
     error_type: str
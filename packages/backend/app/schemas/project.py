@@ -25,5 +25,7 @@ class ProjectResponse(BaseModel):
     updated_at: datetime
     task_count: int = 0
     completed_task_count: int = 0
+    open_error_count: int = 0
+    active_session_count: int = 0
 
     model_config = {"from_attributes": True}
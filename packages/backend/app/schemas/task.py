@@ -40,6 +40,18 @@ class TaskReorderRequest(BaseModel):
     new_sort_order: float
 
 
+class TaskMoveRequest(BaseModel):
+    # Neighbours at the drop position; after_id wins when both are given.
+    # With neither, the task moves to the end of the column.
+    after_id: int | None = None
+    before_id: int | None = None
+    status: str | None = None
+
+
+class TaskDependencyCreate(BaseModel):
+    depends_on_id: int
+
+
 class TaskBulkUpdate(BaseModel):
     task_ids: list[int]
     status: str | None = None
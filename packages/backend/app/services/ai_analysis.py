@@ -1,188 +1,369 @@
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import timedelta, datetime
+from typing import Awaitable, Callable, NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sa_func, and_
-from app.models.task import Task
-from app.models.event import Session, Error, AgentExecution
-from app.models.project import Milestone
+from sqlalchemy import (
+    JSON, DateTime, Float, Integer, Select, String, and_, case, func as sa_func, literal, null, select,
+    type_coerce, union_all,
+)
+from sqlalchemy.orm import aliased
+from app.config import settings
+from app.models.task import Task, TaskDependency
+from app.models.event import Session, Event, Error, AgentExecution
+from app.models.project import Milestone, ProjectStats
+from app.models.analytics import AgentUsageStats, RollupState
+from app.services.dependencies import FINISHED_STATUSES
+from app.services.latency import LatencySketch
+from app.services.rollup import fold_agent_completions
+from app.services.trends import unindexed
 
 
-async def analyze_bottlenecks(db: AsyncSession, project_id: int | None = None):
-    """Detect bottlenecks using rule-based analysis."""
-    bottlenecks = []
+# Rule thresholds
+STUCK_TASK_DAYS = 3
+RECURRING_ERROR_COUNT = 5
+SLOW_AGENT_SECONDS = 30
+
+SEVERITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+
+@dataclass
+class RuleContext:
+    project_id: int | None
+    now: datetime
+    # Lower bound for rules over telemetry, which grows without limit
+    since: datetime
+
+
+# Columns every rule query selects, so that analyze_bottlenecks can send them
+# all as one UNION ALL; a rule leaves the ones it does not need NULL
+RULE_COLUMNS = {
+    "part": String, "label": String, "ref_id": Integer, "amount": Integer, "at": DateTime,
+    "total": Float, "smallest": Float, "largest": Float, "data": JSON,
+}
+
+
+def rule_row(rule: str, **columns) -> list:
+    """The select list for one rule query in the shared RULE_COLUMNS layout."""
+    return [literal(rule).label("rule")] + [
+        (columns[name] if name in columns else type_coerce(null(), type_)).label(name)
+        for name, type_ in RULE_COLUMNS.items()
+    ]
+
+
+@dataclass
+class BottleneckRule:
+    queries: Callable[[RuleContext], list[Select]]
+    describe: Callable[[AsyncSession, RuleContext, list], Awaitable[list[dict]]]
+
+
+BOTTLENECK_RULES: dict[str, BottleneckRule] = {}
+
+
+def bottleneck_rule(name: str, queries: Callable[[RuleContext], list[Select]]):
+    """Register a rule for analyze_bottlenecks; decorates its describe function.
+
+    ``queries(ctx)`` returns the rule's SELECTs, built with ``rule_row(name, ...)``.
+    Each should be an aggregate or narrow-column read that an index can answer,
+    bounded by ``ctx.since`` when it reads telemetry, and must honour
+    ``ctx.project_id``. ``describe(db, ctx, rows)`` turns the rule's rows into
+    bottleneck dicts.
+    """
+    def register(describe):
+        BOTTLENECK_RULES[name] = BottleneckRule(queries, describe)
+        return describe
+    return register
 
-    # Rule 1: Tasks stuck in_progress for 3+ days
-    three_days_ago = datetime.utcnow() - timedelta(days=3)
-    query = select(Task).where(
-        and_(Task.status == "in_progress", Task.updated_at < three_days_ago)
+
+def _days_since(ctx: RuleContext, column):
+    return sa_func.cast(sa_func.julianday(ctx.now) - sa_func.julianday(column), Integer)
+
+
+def _in_project(query, ctx: RuleContext, session_id_column):
+    """Restrict a telemetry query to the project's sessions, if one is given."""
+    if ctx.project_id is None:
+        return query
+    return query.join(Session, Session.id == session_id_column).where(Session.project_id == ctx.project_id)
+
+
+def _stuck_task_queries(ctx: RuleContext) -> list[Select]:
+    query = select(*rule_row(
+        "stuck_task", label=Task.title, ref_id=Task.id, amount=_days_since(ctx, Task.updated_at), at=Task.updated_at,
+    )).where(
+        Task.status == "in_progress", Task.updated_at < ctx.now - timedelta(days=STUCK_TASK_DAYS),
     )
-    if project_id:
-        query = query.where(Task.project_id == project_id)
-    result = await db.execute(query)
-    stuck_tasks = result.scalars().all()
-    for task in stuck_tasks:
-        days_stuck = (datetime.utcnow() - task.updated_at).days
-        bottlenecks.append({
+    if ctx.project_id:
+        query = query.where(Task.project_id == ctx.project_id)
+    return [query]
+
+
+@bottleneck_rule("stuck_task", _stuck_task_queries)
+async def _stuck_tasks(db: AsyncSession, ctx: RuleContext, rows: list) -> list[dict]:
+    return [
+        {
             "type": "stuck_task",
-            "severity": "high" if days_stuck > 7 else "medium",
-            "title": f"Task stuck for {days_stuck} days",
-            "description": f"'{task.title}' has been in progress since {task.updated_at.strftime('%Y-%m-%d')}",
-            "task_id": task.id,
+            "severity": "high" if row.amount > 7 else "medium",
+            "title": f"Task stuck for {row.amount} days",
+            "description": f"'{row.label}' has been in progress since {row.at.strftime('%Y-%m-%d')}",
+            "task_id": row.ref_id,
             "suggestion": "Consider breaking this task into smaller subtasks or reassessing its scope.",
-        })
+        }
+        for row in rows
+    ]
 
-    # Rule 2: Recurring errors (5+ in last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    error_counts = await db.execute(
-        select(Error.error_type, sa_func.count(Error.id).label("count"))
-        .where(Error.timestamp > week_ago)
+
+def _recurring_error_queries(ctx: RuleContext) -> list[Select]:
+    count = sa_func.count(Error.id)
+    query = (
+        select(*rule_row("recurring_error", label=Error.error_type, amount=count))
+        .where(Error.timestamp > ctx.since)
         .group_by(Error.error_type)
-        .having(sa_func.count(Error.id) >= 5)
+        .having(count >= RECURRING_ERROR_COUNT)
     )
-    for row in error_counts:
-        bottlenecks.append({
+    return [_in_project(query, ctx, Error.session_id)]
+
+
+@bottleneck_rule("recurring_error", _recurring_error_queries)
+async def _recurring_errors(db: AsyncSession, ctx: RuleContext, rows: list) -> list[dict]:
+    days = (ctx.now - ctx.since).days
+    return [
+        {
             "type": "recurring_error",
             "severity": "high",
-            "title": f"Recurring error: {row.error_type}",
-            "description": f"'{row.error_type}' has occurred {row.count} times in the last 7 days",
+            "title": f"Recurring error: {row.label}",
+            "description": f"'{row.label}' has occurred {row.amount} times in the last {days} days",
             "suggestion": "Investigate the root cause. This error pattern may indicate a systemic issue.",
-        })
+        }
+        for row in rows
+    ]
 
-    # Rule 3: Overdue milestones
-    overdue_query = select(Milestone).where(
-        and_(
-            Milestone.due_date < datetime.utcnow(),
-            Milestone.due_date.isnot(None),
-            Milestone.status.in_(["pending", "in_progress"]),
-        )
+
+def _overdue_milestone_queries(ctx: RuleContext) -> list[Select]:
+    query = select(*rule_row(
+        "overdue_milestone", label=Milestone.title, amount=_days_since(ctx, Milestone.due_date), at=Milestone.due_date,
+    )).where(
+        Milestone.due_date < ctx.now,
+        Milestone.status.in_(["pending", "in_progress"]),
     )
-    if project_id:
-        overdue_query = overdue_query.where(Milestone.project_id == project_id)
-    overdue_result = await db.execute(overdue_query)
-    for milestone in overdue_result.scalars().all():
-        days_overdue = (datetime.utcnow() - milestone.due_date).days
-        bottlenecks.append({
+    if ctx.project_id:
+        query = query.where(Milestone.project_id == ctx.project_id)
+    return [query]
+
+
+@bottleneck_rule("overdue_milestone", _overdue_milestone_queries)
+async def _overdue_milestones(db: AsyncSession, ctx: RuleContext, rows: list) -> list[dict]:
+    return [
+        {
             "type": "overdue_milestone",
-            "severity": "critical" if days_overdue > 7 else "high",
-            "title": f"Milestone overdue by {days_overdue} days",
-            "description": f"'{milestone.title}' was due {milestone.due_date.strftime('%Y-%m-%d')}",
+            "severity": "critical" if row.amount > 7 else "high",
+            "title": f"Milestone overdue by {row.amount} days",
+            "description": f"'{row.label}' was due {row.at.strftime('%Y-%m-%d')}",
             "suggestion": "Review remaining tasks and adjust the milestone deadline or scope.",
-        })
+        }
+        for row in rows
+    ]
 
-    # Rule 4: Slow agent performance (avg > 30s)
-    slow_agents = await db.execute(
-        select(
-            AgentExecution.agent_type,
-            sa_func.avg(
-                sa_func.julianday(AgentExecution.end_time) - sa_func.julianday(AgentExecution.start_time)
-            ).label("avg_duration_days"),
-        )
-        .where(AgentExecution.end_time.isnot(None))
-        .group_by(AgentExecution.agent_type)
+
+def _slow_agent_queries(ctx: RuleContext) -> list[Select]:
+    # Raw runs binned in SQL like the rollup's tool-call sketches: one row per
+    # occupied bin rather than one per run
+    duration_ms = (
+        sa_func.julianday(AgentExecution.end_time) - sa_func.julianday(AgentExecution.start_time)
+    ) * 86400000
+    bin_key = sa_func.latency_bin(duration_ms)
+    raw = _in_project(
+        select(*rule_row(
+            "slow_agent", part=literal("raw"), label=AgentExecution.agent_type, ref_id=bin_key,
+            amount=sa_func.count(), total=sa_func.sum(duration_ms),
+            smallest=sa_func.min(duration_ms), largest=sa_func.max(duration_ms),
+        ))
+        .where(AgentExecution.start_time >= ctx.since, AgentExecution.end_time.isnot(None))
+        .group_by(AgentExecution.agent_type, bin_key),
+        ctx, AgentExecution.session_id,
     )
-    for row in slow_agents:
-        if row.avg_duration_days and row.avg_duration_days * 86400 > 30:
-            avg_secs = round(row.avg_duration_days * 86400, 1)
-            bottlenecks.append({
-                "type": "slow_agent",
-                "severity": "medium",
-                "title": f"Slow agent: {row.agent_type}",
-                "description": f"Average execution time is {avg_secs}s",
-                "suggestion": "Consider using a lighter model tier or optimizing the task prompt.",
-            })
-
-    return sorted(
-        bottlenecks,
-        key=lambda b: {"critical": 0, "high": 1, "medium": 2, "low": 3}.get(b["severity"], 4),
+    if ctx.project_id is not None or settings.rollup_interval_seconds <= 0:
+        # The rollup is not per project, and may be disabled
+        return [raw]
+
+    in_window = and_(AgentUsageStats.date >= ctx.since.date(), AgentUsageStats.duration_sketch.isnot(None))
+    # Uncorrelated, so SQLite evaluates it once for the whole statement
+    has_sketches = select(AgentUsageStats.agent_type).where(in_window).exists()
+    sketches = select(*rule_row(
+        "slow_agent", part=literal("sketch"), label=AgentUsageStats.agent_type, data=AgentUsageStats.duration_sketch,
+    )).where(in_window)
+    # The agent_complete events the rollup has not folded in yet: a few
+    # minutes of rows past the watermark, so walk the primary key from it
+    watermark = select(RollupState.last_id).where(RollupState.source == "events").scalar_subquery()
+    tail = select(*rule_row(
+        "slow_agent", part=literal("tail"), ref_id=Event.id, at=Event.timestamp, data=Event.payload,
+    )).where(
+        Event.id > sa_func.coalesce(watermark, 0),
+        unindexed(Event.event_type) == "agent_complete",
+        unindexed(Event.timestamp) >= ctx.since,
+        has_sketches,
     )
+    # The raw runs only until sketches cover the window
+    return [raw.where(~has_sketches), sketches, tail]
 
 
-async def suggest_next_tasks(db: AsyncSession, project_id: int | None = None):
-    """Suggest which tasks to work on next."""
-    suggestions = []
+class _TailEvent(NamedTuple):
+    id: int
+    timestamp: datetime
+    payload: dict | None
+    project_id: int | None = None
 
-    # Priority 1: Critical priority tasks that are todo
-    query = select(Task).where(
-        and_(Task.status == "todo", Task.priority == "critical")
-    )
-    if project_id:
-        query = query.where(Task.project_id == project_id)
-    result = await db.execute(query.limit(5))
-    for task in result.scalars().all():
-        suggestions.append({
-            "task_id": task.id,
-            "title": task.title,
-            "reason": "Critical priority - should be addressed immediately",
-            "priority_score": 100,
+
+@bottleneck_rule("slow_agent", _slow_agent_queries)
+async def _slow_agents(db: AsyncSession, ctx: RuleContext, rows: list) -> list[dict]:
+    # Judged by p95 in every scope, so a tail of slow runs shows up even when
+    # most runs are fast, and an agent is flagged for a project exactly when
+    # its runs there would flag it globally
+    durations: dict[str, LatencySketch] = defaultdict(LatencySketch)
+    tail = []
+    for row in rows:
+        if row.part == "raw":
+            durations[row.label].add_bin(row.ref_id, row.amount, row.total, row.smallest, row.largest)
+        elif row.part == "sketch":
+            durations[row.label].merge(LatencySketch(row.data))
+        else:
+            tail.append(_TailEvent(row.ref_id, row.at, row.data))
+    if tail:
+        agents: dict = defaultdict(lambda: defaultdict(int))
+        await fold_agent_completions(db, defaultdict(lambda: defaultdict(int)), agents, tail)
+        for (agent_type, _, _), agg in agents.items():
+            if "duration_sketch" in agg:
+                durations[agent_type].merge(agg["duration_sketch"])
+
+    days = (ctx.now - ctx.since).days
+    found = []
+    for agent_type, sketch in durations.items():
+        if not sketch.count:
+            continue
+        p50, p95 = sketch.quantile(0.5) / 1000, sketch.quantile(0.95) / 1000
+        if p95 <= SLOW_AGENT_SECONDS:
+            continue
+        found.append({
+            "type": "slow_agent",
+            "severity": "high" if p50 > SLOW_AGENT_SECONDS else "medium",
+            "title": f"Slow agent: {agent_type}",
+            "description": (
+                f"p95 execution time is {round(p95, 1)}s (median {round(p50, 1)}s) "
+                f"over {sketch.count} runs in the last {days} days"
+            ),
+            "suggestion": "Consider using a lighter model tier or optimizing the task prompt.",
         })
+    return found
+
 
-    # Priority 2: Tasks with approaching due dates
-    three_days_future = datetime.utcnow() + timedelta(days=3)
-    due_soon_query = select(Task).where(
-        and_(
-            Task.status.in_(["todo", "in_progress"]),
-            Task.due_date.isnot(None),
-            Task.due_date <= three_days_future,
+async def analyze_bottlenecks(db: AsyncSession, project_id: int | None = None):
+    """Detect bottlenecks with every registered rule's queries in one statement."""
+    now = datetime.utcnow()
+    ctx = RuleContext(
+        project_id=project_id, now=now,
+        since=now - timedelta(days=settings.bottleneck_window_days),
+    )
+    rows: dict[str, list] = defaultdict(list)
+    queries = [query for rule in BOTTLENECK_RULES.values() for query in rule.queries(ctx)]
+    for row in await db.execute(union_all(*queries)):
+        rows[row.rule].append(row)
+    bottlenecks = []
+    for name, rule in BOTTLENECK_RULES.items():
+        bottlenecks.extend(await rule.describe(db, ctx, rows[name]))
+    return sorted(bottlenecks, key=lambda b: SEVERITY_RANK.get(b["severity"], 4))
+
+
+# Score contributions for suggest_next_tasks
+PRIORITY_SCORES = {"critical": 100, "high": 70, "medium": 40, "low": 10}
+OVERDUE_SCORE = 60
+DUE_SOON_SCORE = 50  # full weight when due now, fading to 0 at DUE_SOON_DAYS
+DUE_SOON_DAYS = 7
+IN_PROGRESS_SCORE = 15  # finishing started work beats starting new work
+STALE_SCORE = 20  # reached after STALE_DAYS without an update
+STALE_DAYS = 30
+
+
+def _task_score(now: datetime):
+    """Composite next-task score as a SQL expression over one tasks row."""
+    days_left = sa_func.julianday(Task.due_date) - sa_func.julianday(now)
+    idle_days = sa_func.max(sa_func.cast(sa_func.julianday(now) - sa_func.julianday(Task.updated_at), Integer), 0)
+    return (
+        case(
+            *[(Task.priority == name, score) for name, score in PRIORITY_SCORES.items()],
+            else_=PRIORITY_SCORES["medium"],
+        )
+        + case(
+            (Task.due_date.is_(None), 0),
+            (days_left < 0, OVERDUE_SCORE),
+            (days_left <= DUE_SOON_DAYS, DUE_SOON_SCORE * (1 - days_left / DUE_SOON_DAYS)),
+            else_=0,
         )
+        + case((Task.status == "in_progress", IN_PROGRESS_SCORE), else_=0)
+        + STALE_SCORE * sa_func.min(sa_func.coalesce(idle_days, 0) / float(STALE_DAYS), 1)
     )
-    if project_id:
-        due_soon_query = due_soon_query.where(Task.project_id == project_id)
-    due_soon = await db.execute(due_soon_query.limit(5))
-    for task in due_soon.scalars().all():
-        if not any(s["task_id"] == task.id for s in suggestions):
-            suggestions.append({
-                "task_id": task.id,
-                "title": task.title,
-                "reason": f"Due date approaching: {task.due_date.strftime('%Y-%m-%d')}",
-                "priority_score": 90,
-            })
-
-    # Priority 3: High priority todo tasks
-    high_query = select(Task).where(
-        and_(Task.status == "todo", Task.priority == "high")
+
+
+def _task_reasons(row, now: datetime) -> list[str]:
+    """Human-readable parts of the score for one suggested task."""
+    reasons = []
+    if row.priority in ("critical", "high"):
+        reasons.append(f"{row.priority.capitalize()} priority")
+    if row.due_date is not None:
+        if row.due_date < now:
+            reasons.append(f"Overdue since {row.due_date.strftime('%Y-%m-%d')}")
+        elif row.due_date <= now + timedelta(days=DUE_SOON_DAYS):
+            reasons.append(f"Due date approaching: {row.due_date.strftime('%Y-%m-%d')}")
+    if row.status == "in_progress":
+        reasons.append("Already in progress")
+    if row.updated_at is not None and (now - row.updated_at).days >= STALE_DAYS:
+        reasons.append(f"Stale for {(now - row.updated_at).days} days - finish or clean up")
+    return reasons or [f"{row.priority.capitalize()} priority task"]
+
+
+async def suggest_next_tasks(db: AsyncSession, project_id: int | None = None, limit: int = 10):
+    """Rank open, unblocked tasks by a composite score and return the top ``limit``.
+
+    The score is computed in SQL for every candidate; tasks waiting on an
+    unfinished prerequisite are excluded. ORDER BY ... LIMIT makes SQLite's
+    sorter keep only the best ``limit`` rows, a bounded heap: O(n log k).
+    """
+    now = datetime.utcnow()
+    prerequisite = aliased(Task)
+    blocked = (
+        select(TaskDependency.task_id)
+        .join(prerequisite, prerequisite.id == TaskDependency.depends_on_id)
+        .where(TaskDependency.task_id == Task.id, prerequisite.status.notin_(FINISHED_STATUSES))
+        .exists()
     )
-    if project_id:
-        high_query = high_query.where(Task.project_id == project_id)
-    result = await db.execute(high_query.limit(5))
-    for task in result.scalars().all():
-        if not any(s["task_id"] == task.id for s in suggestions):
-            suggestions.append({
-                "task_id": task.id,
-                "title": task.title,
-                "reason": "High priority task",
-                "priority_score": 70,
-            })
-
-    # Priority 4: Stale tasks (30+ days without update)
-    stale_date = datetime.utcnow() - timedelta(days=30)
-    stale_query = select(Task).where(
-        and_(Task.status.in_(["todo", "in_progress"]), Task.updated_at < stale_date)
+    score = _task_score(now).label("score")
+    query = (
+        select(Task.id, Task.title, Task.status, Task.priority, Task.due_date, Task.updated_at, score)
+        .where(Task.status.in_(["todo", "in_progress"]), ~blocked)
+        # Ties go to the older task
+        .order_by(score.desc(), Task.id)
+        .limit(limit)
     )
     if project_id:
-        stale_query = stale_query.where(Task.project_id == project_id)
-    stale = await db.execute(stale_query.limit(3))
-    for task in stale.scalars().all():
-        if not any(s["task_id"] == task.id for s in suggestions):
-            suggestions.append({
-                "task_id": task.id,
-                "title": task.title,
-                "reason": f"Stale for {(datetime.utcnow() - task.updated_at).days} days - consider cleanup",
-                "priority_score": 30,
-            })
+        query = query.where(Task.project_id == project_id)
 
-    return sorted(suggestions, key=lambda s: s["priority_score"], reverse=True)
+    return [
+        {
+            "task_id": row.id,
+            "title": row.title,
+            "reason": "; ".join(_task_reasons(row, now)),
+            "priority_score": round(row.score),
+        }
+        for row in await db.execute(query)
+    ]
 
 
 async def generate_report(db: AsyncSession, project_id: int | None = None):
     """Generate a summary report with recommendations."""
-    # Task stats
-    task_count_query = select(sa_func.count(Task.id))
-    done_count_query = select(sa_func.count(Task.id)).where(Task.status == "done")
+    # Task stats, from the trigger-maintained per-project counters
+    counts_query = select(sa_func.sum(ProjectStats.task_count), sa_func.sum(ProjectStats.done_count))
     if project_id:
-        task_count_query = task_count_query.where(Task.project_id == project_id)
-        done_count_query = done_count_query.where(Task.project_id == project_id)
-
-    total_tasks = (await db.execute(task_count_query)).scalar() or 0
-    done_tasks = (await db.execute(done_count_query)).scalar() or 0
+        counts_query = counts_query.where(ProjectStats.project_id == project_id)
+    total_tasks, done_tasks = (await db.execute(counts_query)).one()
+    total_tasks, done_tasks = total_tasks or 0, done_tasks or 0
 
     # Session stats (last 30 days)
     month_ago = datetime.utcnow() - timedelta(days=30)
@@ -0,0 +1,195 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator
+from sqlalchemy import Column, Index, MetaData, Table, delete, insert, select, func as sa_func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.config import settings
+from app.database import engine
+from app.models import Base
+from app.models.event import Session, Event, AgentExecution, TaskExecution, ArchivedMonth
+
+SESSIONS = Session.__table__
+
+# Sessions moved per transaction, together with all of their rows
+ARCHIVE_SESSION_BATCH = 50
+
+
+def session_child_tables() -> list[Table]:
+    """Tables that reference sessions, dependents first.
+
+    Deleting in this order means e.g. tool_calls go before the
+    agent_executions they reference instead of being rewritten by
+    ON DELETE SET NULL.
+    """
+    return [
+        table for table in reversed(Base.metadata.sorted_tables)
+        if any(fk.column.table is SESSIONS for fk in table.foreign_keys)
+    ]
+
+
+def archive_dir() -> Path:
+    return Path(settings.data_dir) / "archive"
+
+
+def month_path(month: str) -> Path:
+    return archive_dir() / f"{month}.db"
+
+
+def archive_tables(schema: str) -> dict[str, Table]:
+    """Archive copies of the session tables inside the attached ``schema``.
+
+    They carry no primary or foreign keys: rows keep their live ids, and
+    SQLite may hand those out again once a live table has been emptied.
+    """
+    metadata = MetaData()
+    tables = {}
+    for table in [SESSIONS, *session_child_tables()]:
+        key = "id" if table is SESSIONS else "session_id"
+        indexes = [Index(f"ix_{table.name}_{key}", key)]
+        if "timestamp" in table.c:
+            indexes.append(Index(f"ix_{table.name}_timestamp", "timestamp"))
+        tables[table.name] = Table(
+            table.name, metadata,
+            *[Column(c.name, c.type) for c in table.columns],
+            *indexes,
+            schema=schema,
+        )
+    return tables
+
+
+@asynccontextmanager
+async def attach_month(conn: AsyncConnection, month: str, create: bool = False) -> AsyncIterator[dict[str, Table]]:
+    """ATTACH one monthly archive to ``conn`` and yield its tables."""
+    path = month_path(month)
+    if create:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    elif not path.exists():
+        raise FileNotFoundError(path)
+    alias = "archive_" + month.replace("-", "_")
+    await conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (str(path),))
+    try:
+        tables = archive_tables(alias)
+        if create:
+            metadata = next(iter(tables.values())).metadata
+            await conn.run_sync(metadata.create_all)
+            await conn.commit()
+        yield tables
+    finally:
+        # DETACH is refused while a transaction is open on the connection
+        await conn.rollback()
+        try:
+            await conn.exec_driver_sql(f"DETACH DATABASE {alias}")
+        except Exception:
+            # Never hand a connection with a stray attachment back to the pool
+            await conn.invalidate()
+            raise
+
+
+async def archived_months(conn: AsyncConnection, since: datetime | None = None, until: datetime | None = None) -> list[str]:
+    """Months whose archived activity overlaps [since, until), oldest first."""
+    query = select(ArchivedMonth.month).order_by(ArchivedMonth.month)
+    if since is not None:
+        query = query.where(ArchivedMonth.last_time >= since)
+    if until is not None:
+        query = query.where(ArchivedMonth.first_time < until)
+    return list((await conn.execute(query)).scalars())
+
+
+async def _archive_batch(conn: AsyncConnection, archive: dict[str, Table], month: str, ids: list[str]) -> int:
+    # Main and attached databases commit separately under WAL, so first clear
+    # any copy of this batch left behind by an interrupted run.
+    events = 0
+    for table in [SESSIONS, *session_child_tables()]:
+        target = archive[table.name]
+        key = "id" if table is SESSIONS else "session_id"
+        await conn.execute(delete(target).where(target.c[key].in_(ids)))
+        result = await conn.execute(
+            insert(target).from_select(
+                [c.name for c in table.columns],
+                select(*table.columns).where(table.c[key].in_(ids)),
+            )
+        )
+        if table is Event.__table__:
+            events = result.rowcount
+
+    first_time, last_start, last_end = (await conn.execute(
+        select(
+            sa_func.min(Session.start_time),
+            sa_func.max(Session.start_time),
+            sa_func.max(Session.end_time),
+        ).where(Session.id.in_(ids))
+    )).one()
+    # The span covers every timestamp the hourly trends and the feed read
+    latest = [last_start, last_end]
+    for model, column in ((Event, Event.timestamp), (AgentExecution, AgentExecution.start_time),
+                          (TaskExecution, TaskExecution.stopped_at)):
+        latest.append((await conn.execute(
+            select(sa_func.max(column)).where(model.session_id.in_(ids))
+        )).scalar())
+    last_time = max(t for t in latest if t is not None)
+
+    for table in session_child_tables():
+        await conn.execute(delete(table).where(table.c.session_id.in_(ids)))
+    await conn.execute(delete(SESSIONS).where(SESSIONS.c.id.in_(ids)))
+
+    stmt = sqlite_insert(ArchivedMonth.__table__).values(
+        month=month, path=str(month_path(month)),
+        session_count=len(ids), event_count=events,
+        first_time=first_time, last_time=last_time,
+    )
+    await conn.execute(stmt.on_conflict_do_update(
+        index_elements=["month"],
+        set_={
+            "path": stmt.excluded.path,
+            "session_count": ArchivedMonth.session_count + stmt.excluded.session_count,
+            "event_count": ArchivedMonth.event_count + stmt.excluded.event_count,
+            "first_time": sa_func.min(ArchivedMonth.first_time, stmt.excluded.first_time),
+            "last_time": sa_func.max(ArchivedMonth.last_time, stmt.excluded.last_time),
+            "archived_at": sa_func.now(),
+        },
+    ))
+    await conn.commit()
+    return events
+
+
+async def archive_sessions(cutoff: datetime) -> dict[str, dict]:
+    """Move ended sessions started before ``cutoff`` into per-month archive files.
+
+    Each batch of sessions and all of their rows move in one transaction. The
+    daily stats are rolled up first, so trends keep covering archived days,
+    and an ``archive_months`` row summarizes what each file holds.
+    """
+    from app.services.rollup import run_rollup
+
+    await run_rollup()
+    month_of = sa_func.strftime("%Y-%m", Session.start_time)
+    # Open sessions stay live however old they are: they may still be written to
+    archivable = (Session.start_time < cutoff, Session.end_time.isnot(None))
+    async with engine.connect() as conn:
+        months = list((await conn.execute(
+            select(month_of).where(*archivable).group_by(month_of).order_by(month_of)
+        )).scalars())
+        await conn.rollback()
+
+    pause = settings.retention_chunk_pause_ms / 1000
+    moved = {}
+    for month in months:
+        sessions = events = 0
+        async with engine.connect() as conn:
+            async with attach_month(conn, month, create=True) as archive:
+                while True:
+                    ids = list((await conn.execute(
+                        select(Session.id)
+                        .where(*archivable, month_of == month)
+                        .limit(ARCHIVE_SESSION_BATCH)
+                    )).scalars())
+                    if not ids:
+                        break
+                    events += await _archive_batch(conn, archive, month, ids)
+                    sessions += len(ids)
+                    await asyncio.sleep(pause)
+        moved[month] = {"sessions": sessions, "events": events}
+    return moved
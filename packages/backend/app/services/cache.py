@@ -0,0 +1,70 @@
+import time
+from typing import Any, Awaitable, Callable
+from app.config import settings
+from app.services.websocket import manager
+
+
+class TTLCache:
+    """Small in-process response cache with TTL expiry and explicit invalidation."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def set(self, key: str, value: Any):
+        if self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        found, value = self.get(key)
+        if found:
+            return value
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose key starts with ``prefix`` (all entries by default)."""
+        if prefix:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+        else:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl,
+        }
+
+
+analytics_cache = TTLCache(settings.analytics_cache_ttl_seconds)
+
+
+def _invalidate_on_write(message_type: str, action: str, data: dict):
+    # Every task/session/project/event write already announces itself through
+    # manager.broadcast, which makes it the natural invalidation point.
+    if message_type == "job":
+        # Job progress is not a write; jobs that write broadcast or invalidate themselves
+        return
+    analytics_cache.invalidate()
+
+
+manager.add_listener(_invalidate_on_write)
@@ -1,41 +1,179 @@
+import asyncio
+import logging
+import time
 from datetime import datetime, timedelta
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
-from app.models.event import Event, ToolCall, Error, Session
-
-
-async def cleanup_old_data(db: AsyncSession):
-    """Clean up old data based on retention policies."""
-    results = {}
-
-    # Events: 90 days retention
-    cutoff_events = datetime.utcnow() - timedelta(days=90)
-    r = await db.execute(delete(Event).where(Event.timestamp < cutoff_events))
-    results["events_deleted"] = r.rowcount
-
-    # Tool calls: 60 days retention (via session start_time)
-    cutoff_tools = datetime.utcnow() - timedelta(days=60)
-    old_session_ids = await db.execute(
-        select(Session.id).where(Session.start_time < cutoff_tools)
-    )
-    old_ids = [row[0] for row in old_session_ids.all()]
-    if old_ids:
-        r = await db.execute(
-            delete(ToolCall).where(ToolCall.session_id.in_(old_ids))
-        )
-        results["tool_calls_deleted"] = r.rowcount
-    else:
-        results["tool_calls_deleted"] = 0
-
-    # Errors: 180 days retention
-    cutoff_errors = datetime.utcnow() - timedelta(days=180)
-    r = await db.execute(delete(Error).where(Error.timestamp < cutoff_errors))
-    results["errors_deleted"] = r.rowcount
-
-    # Sessions: 365 days retention
-    cutoff_sessions = datetime.utcnow() - timedelta(days=365)
-    r = await db.execute(delete(Session).where(Session.start_time < cutoff_sessions))
-    results["sessions_deleted"] = r.rowcount
-
-    await db.commit()
-    return results
+from sqlalchemy import Table, delete, select, func as sa_func
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.event import Event, ToolCall, Error, Session, ImportKey
+from app.services.archive import archive_sessions, session_child_tables
+
+logger = logging.getLogger(__name__)
+
+
+def _old_sessions(cutoff: datetime):
+    return select(Session.id).where(Session.start_time < cutoff)
+
+
+class RetentionJob:
+    """Deletes expired telemetry in short rowid-range transactions.
+
+    Each chunk is its own write transaction followed by a pause, so the
+    SQLite writer lock is never held for long and ingest keeps flowing.
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.running = False
+        self.current: str | None = None
+        self.chunks = 0
+        self.deleted: dict[str, int] = {}
+        self.archived: dict[str, dict] = {}
+        self.total_deleted = 0
+        self.last_started: datetime | None = None
+        self.last_duration_s: float | None = None
+        self.last_error: str | None = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "running": self.running,
+            "current": self.current,
+            "chunks": self.chunks,
+            "deleted": dict(self.deleted),
+            "archived": dict(self.archived),
+            "total_deleted": self.total_deleted,
+            "last_started": self.last_started.isoformat() if self.last_started else None,
+            "last_duration_s": self.last_duration_s,
+            "last_error": self.last_error,
+        }
+
+    async def _delete_in_chunks(self, label: str, table: Table, condition) -> int:
+        """Delete rows matching ``condition`` one id range at a time."""
+        self.current = label
+        async with AsyncSessionLocal() as db:
+            low, high = (await db.execute(
+                select(sa_func.min(table.c.id), sa_func.max(table.c.id)).where(condition)
+            )).one()
+        if low is None:
+            return 0
+
+        chunk = max(settings.retention_chunk_size, 1)
+        pause = settings.retention_chunk_pause_ms / 1000
+        deleted = 0
+        for start in range(low, high + 1, chunk):
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(table).where(table.c.id >= start, table.c.id < start + chunk, condition)
+                )
+                await db.commit()
+            deleted += result.rowcount
+            self.deleted[label] = self.deleted.get(label, 0) + result.rowcount
+            self.total_deleted += result.rowcount
+            self.chunks += 1
+            await asyncio.sleep(pause)
+        return deleted
+
+    async def _delete_in_batches(self, label: str, key_column, condition) -> int:
+        """Delete rows matching ``condition`` a bounded batch of keys at a time.
+
+        For tables keyed by strings (session UUIDs, import keys), which have
+        no id range to walk.
+        """
+        self.current = label
+        chunk = max(settings.retention_chunk_size, 1)
+        pause = settings.retention_chunk_pause_ms / 1000
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                keys = select(key_column).where(condition).limit(chunk)
+                result = await db.execute(delete(key_column.table).where(key_column.in_(keys)))
+                await db.commit()
+            deleted += result.rowcount
+            self.deleted[label] = self.deleted.get(label, 0) + result.rowcount
+            self.total_deleted += result.rowcount
+            self.chunks += 1
+            if result.rowcount < chunk:
+                return deleted
+            await asyncio.sleep(pause)
+
+    async def _delete_sessions(self, cutoff: datetime) -> int:
+        # Remove the children in chunks first so the final session deletes
+        # cascade into nothing instead of one unbounded DELETE.
+        old = _old_sessions(cutoff)
+        for table in session_child_tables():
+            await self._delete_in_chunks(f"sessions.{table.name}", table, table.c.session_id.in_(old))
+        return await self._delete_in_batches("sessions", Session.id, Session.start_time < cutoff)
+
+    async def run(self) -> dict:
+        """Apply every retention policy once; a policy of 0 days keeps data forever.
+
+        In archive mode, sessions older than ``archive_after_days`` are moved to
+        the monthly archive files instead (see app.services.archive).
+        """
+        if self.running:
+            return self.stats()
+        self.running = True
+        self.runs += 1
+        self.chunks = 0
+        self.deleted = {}
+        self.archived = {}
+        self.last_error = None
+        self.last_started = datetime.utcnow()
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        try:
+            if settings.retention_mode == "archive":
+                # Aged sessions leave the live DB with all of their rows, so
+                # the per-table delete policies have nothing left to act on.
+                if settings.archive_after_days > 0:
+                    self.current = "archive"
+                    self.archived = await archive_sessions(now - timedelta(days=settings.archive_after_days))
+            else:
+                await self._apply_delete_policies(now)
+            if settings.retention_import_keys_days > 0:
+                # Import keys are not session data, so both modes expire them
+                cutoff = now - timedelta(days=settings.retention_import_keys_days)
+                await self._delete_in_batches("import_keys", ImportKey.key, ImportKey.created_at < cutoff)
+        except Exception as exc:
+            self.last_error = str(exc)
+            raise
+        finally:
+            self.running = False
+            self.current = None
+            self.last_duration_s = round(time.perf_counter() - started, 3)
+        return self.stats()
+
+    async def _apply_delete_policies(self, now: datetime):
+        if settings.retention_events_days > 0:
+            cutoff = now - timedelta(days=settings.retention_events_days)
+            await self._delete_in_chunks("events", Event.__table__, Event.timestamp < cutoff)
+        if settings.retention_tool_calls_days > 0:
+            # Tool calls carry no timestamp; they expire with their session's start
+            cutoff = now - timedelta(days=settings.retention_tool_calls_days)
+            await self._delete_in_chunks(
+                "tool_calls", ToolCall.__table__, ToolCall.session_id.in_(_old_sessions(cutoff))
+            )
+        if settings.retention_errors_days > 0:
+            cutoff = now - timedelta(days=settings.retention_errors_days)
+            await self._delete_in_chunks("errors", Error.__table__, Error.timestamp < cutoff)
+        if settings.retention_sessions_days > 0:
+            await self._delete_sessions(now - timedelta(days=settings.retention_sessions_days))
+
+
+retention_job = RetentionJob()
+
+
+async def cleanup_old_data() -> dict:
+    """Clean up old data based on the retention policies in Settings."""
+    return await retention_job.run()
+
+
+async def run_retention_periodically(interval_seconds: float):
+    """Background loop started from the FastAPI lifespan."""
+    while True:
+        try:
+            await retention_job.run()
+        except Exception:
+            logger.exception("Retention cleanup failed")
+        await asyncio.sleep(interval_seconds)
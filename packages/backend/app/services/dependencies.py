@@ -0,0 +1,248 @@
+import asyncio
+from collections import deque
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task, TaskDependency
+from app.services.websocket import manager
+
+# A prerequisite in one of these states no longer blocks its dependents
+FINISHED_STATUSES = ("done", "archived")
+
+
+class DependencyCycleError(ValueError):
+    """Adding the edge would make a task (transitively) depend on itself."""
+
+    def __init__(self, path: list[int]):
+        self.path = path
+        super().__init__("Dependency cycle: " + " -> ".join(f"#{task_id}" for task_id in path))
+
+
+class ProjectGraph:
+    """Adjacency lists and task states for one project's dependency DAG.
+
+    ``depends_on[t]`` holds the prerequisites of ``t`` and ``dependents[t]``
+    the tasks waiting on it. Every query is answered from memory in O(V+E)
+    or better.
+    """
+
+    def __init__(self, tasks: list, edges: list[tuple[int, int]]):
+        self.tasks = {row.id: row for row in tasks}
+        self.status = {row.id: row.status for row in tasks}
+        self.depends_on: dict[int, set[int]] = {task_id: set() for task_id in self.tasks}
+        self.dependents: dict[int, set[int]] = {task_id: set() for task_id in self.tasks}
+        for task_id, depends_on_id in edges:
+            if depends_on_id not in self.tasks:
+                # Prerequisite in another project; edges are only added within one
+                continue
+            self.depends_on[task_id].add(depends_on_id)
+            self.dependents[depends_on_id].add(task_id)
+        self._topological: list[int] | None = None
+
+    def add_edge(self, task_id: int, depends_on_id: int):
+        self.depends_on.setdefault(task_id, set()).add(depends_on_id)
+        self.dependents.setdefault(depends_on_id, set()).add(task_id)
+        self._topological = None
+
+    def remove_edge(self, task_id: int, depends_on_id: int):
+        self.depends_on.get(task_id, set()).discard(depends_on_id)
+        self.dependents.get(depends_on_id, set()).discard(task_id)
+        self._topological = None
+
+    def finished(self, task_id: int) -> bool:
+        return self.status[task_id] in FINISHED_STATUSES
+
+    def summary(self, task_id: int) -> dict:
+        row = self.tasks[task_id]
+        return {
+            "id": row.id, "title": row.title, "status": row.status,
+            "priority": row.priority, "sort_order": row.sort_order,
+        }
+
+    def find_path(self, start: int, goal: int) -> list[int] | None:
+        """Prerequisite chain from ``start`` down to ``goal``, if there is one."""
+        parents = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            for nxt in self.depends_on.get(node, ()):
+                if nxt not in parents:
+                    parents[nxt] = node
+                    stack.append(nxt)
+        return None
+
+    def check_edge(self, task_id: int, depends_on_id: int):
+        """Raise DependencyCycleError if ``task_id`` may not depend on ``depends_on_id``."""
+        if task_id == depends_on_id:
+            raise DependencyCycleError([task_id, task_id])
+        # The new edge closes a cycle iff the prerequisite already depends on the task
+        path = self.find_path(depends_on_id, task_id)
+        if path is not None:
+            raise DependencyCycleError([task_id, *path])
+
+    def topological_order(self) -> list[int]:
+        """Prerequisites before dependents (Kahn); computed once per graph.
+
+        Tasks on a cycle left over from before edges were checked are omitted.
+        """
+        if self._topological is None:
+            remaining = {task_id: len(deps) for task_id, deps in self.depends_on.items()}
+            queue = deque(sorted(task_id for task_id, n in remaining.items() if n == 0))
+            order = []
+            while queue:
+                node = queue.popleft()
+                order.append(node)
+                for dependent in self.dependents[node]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        queue.append(dependent)
+            self._topological = order
+        return self._topological
+
+    def blocked(self, task_id: int) -> bool:
+        status = self.status
+        return any(status[dep] not in FINISHED_STATUSES for dep in self.depends_on.get(task_id, ()))
+
+    def ready(self) -> list[int]:
+        """Open tasks whose prerequisites are all finished, in board order."""
+        ready = [
+            task_id for task_id, status in self.status.items()
+            if status == "todo" and not self.blocked(task_id)
+        ]
+        return sorted(ready, key=lambda task_id: (self.tasks[task_id].sort_order, task_id))
+
+    def blockers(self, task_id: int) -> list[int]:
+        """Unfinished tasks that ``task_id`` transitively waits on, nearest first.
+
+        Finished prerequisites are not walked through: whatever they needed
+        is already done.
+        """
+        seen = {task_id}
+        queue = deque([task_id])
+        found = []
+        while queue:
+            for dep in sorted(self.depends_on.get(queue.popleft(), ())):
+                if dep in seen or self.finished(dep):
+                    continue
+                seen.add(dep)
+                found.append(dep)
+                queue.append(dep)
+        return found
+
+    def critical_path(self) -> list[int]:
+        """Longest chain of unfinished tasks, first prerequisite first."""
+        length: dict[int, int] = {}
+        previous: dict[int, int | None] = {}
+        best = None
+        for task_id in self.topological_order():
+            if self.finished(task_id):
+                continue
+            length[task_id], previous[task_id] = 1, None
+            for dep in self.depends_on[task_id]:
+                if dep in length and length[dep] + 1 > length[task_id]:
+                    length[task_id], previous[task_id] = length[dep] + 1, dep
+            if best is None or length[task_id] > length[best]:
+                best = task_id
+        path = []
+        while best is not None:
+            path.append(best)
+            best = previous[best]
+        return path[::-1]
+
+
+class DependencyGraphCache:
+    """Per-project ProjectGraph cache, rebuilt lazily after writes.
+
+    Task and project broadcasts drop the affected project (see
+    _invalidate_on_write), so a graph lives until something it covers changes.
+    Edge writes are applied to the cached graph directly.
+    """
+
+    def __init__(self):
+        self._graphs: dict[int, ProjectGraph] = {}
+        # Bumped on every invalidation so a build that raced a write is not stored
+        self._generation = 0
+        self.builds = 0
+        self.hits = 0
+        # Held while an edge is checked and written, so two concurrent inserts
+        # cannot each pass the cycle check for opposite edges.
+        self.write_lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession, project_id: int) -> ProjectGraph:
+        graph = self._graphs.get(project_id)
+        if graph is not None:
+            self.hits += 1
+            return graph
+        generation = self._generation
+        tasks = (await db.execute(
+            select(Task.id, Task.title, Task.status, Task.priority, Task.sort_order)
+            .where(Task.project_id == project_id)
+        )).all()
+        edges = (await db.execute(
+            select(TaskDependency.task_id, TaskDependency.depends_on_id)
+            .join(Task, Task.id == TaskDependency.task_id)
+            .where(Task.project_id == project_id)
+        )).all()
+        graph = ProjectGraph(tasks, [(row.task_id, row.depends_on_id) for row in edges])
+        self.builds += 1
+        if generation == self._generation:
+            self._graphs[project_id] = graph
+        return graph
+
+    def invalidate(self, project_id: int | None = None):
+        self._generation += 1
+        if project_id is None:
+            self._graphs.clear()
+        else:
+            self._graphs.pop(project_id, None)
+
+    def edge_changed(self, project_id: int, task_id: int, depends_on_id: int, added: bool):
+        """Apply an edge write to the cached graph instead of rebuilding it."""
+        # Builds already in flight read the table before this write
+        self._generation += 1
+        graph = self._graphs.get(project_id)
+        if graph is not None:
+            if added:
+                graph.add_edge(task_id, depends_on_id)
+            else:
+                graph.remove_edge(task_id, depends_on_id)
+
+    def invalidate_task(self, task_id: int):
+        for project_id, graph in list(self._graphs.items()):
+            if task_id in graph.tasks:
+                self.invalidate(project_id)
+
+    def stats(self) -> dict:
+        return {"projects": len(self._graphs), "builds": self.builds, "hits": self.hits}
+
+
+dependency_graphs = DependencyGraphCache()
+
+
+def _invalidate_on_write(message_type: str, action: str, data: dict):
+    if message_type == "task" and action in ("dependency_added", "dependency_removed"):
+        # Applied in place by DependencyGraphCache.edge_changed
+        return
+    if message_type == "task":
+        project_ids = data.get("project_ids") or (
+            [data["project_id"]] if data.get("project_id") is not None else []
+        )
+        for project_id in project_ids:
+            dependency_graphs.invalidate(project_id)
+        if data.get("id") is not None and (not project_ids or action in ("updated", "deleted")):
+            # The message names the task's current project; a graph cached
+            # for any other project it was in must go as well
+            dependency_graphs.invalidate_task(data["id"])
+    elif message_type == "task_execution" and data.get("task_id") is not None:
+        # Starting or stopping an execution changes the task's status
+        dependency_graphs.invalidate_task(data["task_id"])
+    elif message_type == "project" and data.get("id") is not None:
+        dependency_graphs.invalidate(data["id"])
+
+
+manager.add_listener(_invalidate_on_write)
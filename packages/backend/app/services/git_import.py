@@ -0,0 +1,289 @@
+import asyncio
+import uuid
+from datetime import date, datetime
+from typing import AsyncIterator, Awaitable, Callable
+from sqlalchemy import select, func as sa_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.project import Project, Milestone
+from app.models.event import Session, Event, FileChange
+from app.models.analytics import DailyStats
+from app.services.ingest import bulk_insert
+
+# Whole `git log` run; the stream is consumed as it is produced
+GIT_TIMEOUT_SECONDS = 300
+# File changes buffered before they are written
+FILE_CHANGE_BATCH = 5000
+# Commits between on_progress callbacks
+PROGRESS_EVERY = 100
+
+# Separators that cannot occur in hashes, dates or names
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+
+SESSION_SUMMARY_PREFIX = "Git history:"
+
+
+class GitError(Exception):
+    pass
+
+
+async def _run_git(*args: str) -> AsyncIterator[str]:
+    """Yield stdout lines of a git command without blocking the event loop."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    try:
+        async for raw in proc.stdout:
+            yield raw.decode("utf-8", errors="replace").rstrip("\n")
+        returncode = await proc.wait()
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stderr = (await stderr_task).decode("utf-8", errors="replace").strip()
+    if returncode != 0:
+        raise GitError(stderr or f"git exited with {returncode}")
+
+
+async def iter_commits(
+    project_path: str, max_commits: int, since: str | None = None, after: str | None = None,
+) -> AsyncIterator[dict]:
+    """Parse one `git log --numstat` stream into commits with their file stats.
+
+    Newest commits come first. ``after`` limits the log to commits made
+    since that hash. Merges are diffed against their first parent.
+    """
+    args = [
+        "-C", project_path, "log", "--numstat", "--diff-merges=first-parent",
+        f"--format={_RECORD}%H{_FIELD}%aI{_FIELD}%an{_FIELD}%s",
+        f"--max-count={max_commits}",
+    ]
+    if since:
+        args.append(f"--since={since}")
+    if after:
+        args.append(f"{after}..HEAD")
+
+    commit = None
+    async for line in _run_git(*args):
+        if line.startswith(_RECORD):
+            if commit:
+                yield commit
+            parts = line[1:].split(_FIELD, 3)
+            commit = None
+            if len(parts) < 4:
+                continue
+            try:
+                # Stored as the author's wall-clock time, like other timestamps
+                commit_time = datetime.fromisoformat(parts[1].strip()).replace(tzinfo=None)
+            except ValueError:
+                continue
+            commit = {
+                "hash": parts[0].strip(),
+                "time": commit_time,
+                "author": parts[2].strip(),
+                "message": parts[3].strip(),
+                "files": [],
+            }
+        elif commit and line:
+            file_parts = line.split("\t", 2)
+            if len(file_parts) < 3:
+                continue
+            try:
+                added = int(file_parts[0]) if file_parts[0] != "-" else 0
+                removed = int(file_parts[1]) if file_parts[1] != "-" else 0
+            except ValueError:
+                continue
+            commit["files"].append((file_parts[2], added, removed))
+    if commit:
+        yield commit
+
+
+def _change_type(added: int, removed: int) -> str:
+    if added > 0 and removed == 0:
+        return "created"
+    if removed > 0 and added == 0:
+        return "deleted"
+    return "modified"
+
+
+async def _imported_commits(db: AsyncSession, project_id: int) -> tuple[set[str], str | None]:
+    """Full hashes already imported for the project, and the newest of them."""
+    full_hash = sa_func.json_extract(Event.payload, "$.full_hash")
+    result = await db.execute(
+        select(full_hash)
+        .join(Session, Event.session_id == Session.id)
+        .where(
+            Session.project_id == project_id,
+            Session.summary.startswith(SESSION_SUMMARY_PREFIX),
+            Event.event_type == "commit",
+            full_hash.isnot(None),
+        )
+        .order_by(Event.timestamp.desc())
+    )
+    hashes = list(result.scalars())
+    return set(hashes), hashes[0] if hashes else None
+
+
+async def import_git_history(
+    db: AsyncSession, project: Project, max_commits: int = 500, since: str | None = None,
+    on_progress: Callable[[int], Awaitable] | None = None,
+) -> dict:
+    """Import commits as per-day sessions, commit events and file changes.
+
+    Re-running it only adds commits that are not imported yet: the log starts
+    at the newest imported commit, and hashes already present are skipped.
+    """
+    pid = project.id
+    imported, last_hash = await _imported_commits(db, pid)
+    already_imported = len(imported)
+
+    # Existing git sessions by day, so re-imports extend them
+    sessions_by_day: dict[date, Session] = {}
+    result = await db.execute(
+        select(Session).where(
+            Session.project_id == pid, Session.summary.startswith(SESSION_SUMMARY_PREFIX),
+        )
+    )
+    for session in result.scalars().all():
+        sessions_by_day.setdefault(session.start_time.date(), session)
+
+    commits_per_day: dict[date, int] = {}
+    new_sessions = 0
+    events: list[dict] = []
+    file_changes: list[dict] = []
+    file_change_count = 0
+
+    async def read_log(after: str | None):
+        nonlocal new_sessions, file_change_count
+        read = 0
+        async for commit in iter_commits(project.path, max_commits, since, after):
+            read += 1
+            if on_progress and read % PROGRESS_EVERY == 0:
+                await on_progress(read)
+            if commit["hash"] in imported:
+                continue
+            imported.add(commit["hash"])
+            day = commit["time"].date()
+            session = sessions_by_day.get(day)
+            if session is None:
+                session = Session(
+                    id=str(uuid.uuid4()), project_id=pid,
+                    start_time=commit["time"], end_time=commit["time"],
+                )
+                db.add(session)
+                sessions_by_day[day] = session
+                new_sessions += 1
+            else:
+                session.start_time = min(session.start_time, commit["time"])
+                session.end_time = max(session.end_time or commit["time"], commit["time"])
+            commits_per_day[day] = commits_per_day.get(day, 0) + 1
+            events.append({
+                "session_id": session.id,
+                "event_type": "commit",
+                "timestamp": commit["time"],
+                "payload": {
+                    "hash": commit["hash"][:8], "full_hash": commit["hash"],
+                    "message": commit["message"], "author": commit["author"],
+                },
+            })
+            for path, added, removed in commit["files"]:
+                file_changes.append({
+                    "session_id": session.id, "file_path": path,
+                    "change_type": _change_type(added, removed),
+                    "lines_added": added, "lines_removed": removed,
+                    "timestamp": commit["time"],
+                })
+            if len(file_changes) >= FILE_CHANGE_BATCH:
+                await db.flush()
+                file_change_count += await bulk_insert(db, FileChange.__table__, file_changes)
+                file_changes.clear()
+
+    async with asyncio.timeout(GIT_TIMEOUT_SECONDS):
+        try:
+            await read_log(last_hash)
+        except GitError:
+            if last_hash is None:
+                raise
+            # The last imported commit is gone (rebase, shallow clone):
+            # fall back to the full log; known hashes are still skipped.
+            await read_log(None)
+
+    for day, session in sessions_by_day.items():
+        if day in commits_per_day:
+            total = await _session_commit_total(db, session, commits_per_day[day])
+            session.summary = f"{SESSION_SUMMARY_PREFIX} {total} commit(s) on {day.isoformat()}"
+    await db.flush()
+    if events:
+        await bulk_insert(db, Event.__table__, events)
+    if file_changes:
+        file_change_count += await bulk_insert(db, FileChange.__table__, file_changes)
+
+    milestones = await _import_tags(db, project)
+    daily_stats = await _add_daily_stats(db, pid, commits_per_day)
+
+    return {
+        "commits": len(events),
+        "sessions": new_sessions,
+        "events": len(events),
+        "file_changes": file_change_count,
+        "milestones": milestones,
+        "daily_stats": daily_stats,
+        "already_imported": already_imported,
+    }
+
+
+async def _session_commit_total(db: AsyncSession, session: Session, added: int) -> int:
+    existing = (await db.execute(
+        select(sa_func.count(Event.id)).where(Event.session_id == session.id, Event.event_type == "commit")
+    )).scalar() or 0
+    return existing + added
+
+
+async def _import_tags(db: AsyncSession, project: Project) -> int:
+    """Git tags -> completed milestones; tags imported earlier are skipped."""
+    existing = set((await db.execute(
+        select(Milestone.title).where(Milestone.project_id == project.id)
+    )).scalars())
+    count = 0
+    try:
+        async for line in _run_git(
+            "-C", project.path, "tag", "-l", "--format=%(refname:short)|%(creatordate:iso-strict)",
+        ):
+            parts = line.split("|", 1)
+            tag_name = parts[0].strip()
+            if not tag_name or tag_name in existing:
+                continue
+            tag_date = None
+            if len(parts) > 1 and parts[1].strip():
+                try:
+                    tag_date = datetime.fromisoformat(parts[1].strip()).replace(tzinfo=None)
+                except ValueError:
+                    pass
+            db.add(Milestone(project_id=project.id, title=tag_name, status="completed", due_date=tag_date))
+            existing.add(tag_name)
+            count += 1
+    except GitError:
+        pass
+    return count
+
+
+async def _add_daily_stats(db: AsyncSession, project_id: int, commits_per_day: dict[date, int]) -> int:
+    if not commits_per_day:
+        return 0
+    result = await db.execute(
+        select(DailyStats).where(DailyStats.project_id == project_id, DailyStats.date.in_(commits_per_day))
+    )
+    existing = {row.date: row for row in result.scalars().all()}
+    for day, commits in commits_per_day.items():
+        row = existing.get(day)
+        if row is None:
+            db.add(DailyStats(
+                project_id=project_id, date=day, tasks_completed=commits,
+                session_count=1, tokens_used=0, agent_calls=0,
+            ))
+        else:
+            row.tasks_completed = (row.tasks_completed or 0) + commits
+    return len(commits_per_day)
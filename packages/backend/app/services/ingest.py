@@ -0,0 +1,59 @@
+from datetime import datetime
+from sqlalchemy import JSON, DateTime, Table, bindparam, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows per executemany() call. Plain executemany binds one row at a time, so
+# this only bounds how long a single call holds the aiosqlite worker thread.
+BULK_CHUNK_SIZE = 5000
+
+
+def prepare_rows(table: Table, items: list[dict]) -> list[dict]:
+    """Normalize raw dicts into uniform parameter sets for an executemany INSERT.
+
+    executemany() compiles the statement once from the first row, so every row
+    must carry the same keys. Unknown keys are dropped, and missing or None
+    values fall back to the column's Python default, or the current UTC time
+    for server-defaulted timestamp columns.
+    """
+    now = datetime.utcnow()
+    columns = [c for c in table.columns if c is not table.autoincrement_column]
+    fills = {}
+    for column in columns:
+        if column.default is not None and column.default.is_scalar:
+            fills[column.name] = column.default.arg
+        elif column.server_default is not None and isinstance(column.type, DateTime):
+            fills[column.name] = now
+
+    rows = []
+    for item in items:
+        row = {}
+        for column in columns:
+            value = item.get(column.name)
+            if value is None:
+                value = fills.get(column.name)
+            row[column.name] = value
+        rows.append(row)
+    return rows
+
+
+def insert_statement(table: Table):
+    """INSERT for prepare_rows() output that stores None JSON values as SQL NULL.
+
+    Core binds None for a JSON column as the JSON literal 'null', whereas the
+    ORM leaves the column NULL; the explicit binds keep both paths identical.
+    """
+    json_binds = {
+        c.name: bindparam(c.name, type_=JSON(none_as_null=True))
+        for c in table.columns
+        if isinstance(c.type, JSON)
+    }
+    return insert(table).values(json_binds) if json_binds else insert(table)
+
+
+async def bulk_insert(db: AsyncSession, table: Table, items: list[dict]) -> int:
+    """Insert rows with Core executemany, bypassing the ORM unit of work."""
+    rows = prepare_rows(table, items)
+    stmt = insert_statement(table)
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        await db.execute(stmt, rows[start:start + BULK_CHUNK_SIZE])
+    return len(rows)
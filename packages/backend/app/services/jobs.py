@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.websocket import manager
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for the REST API before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    """One background operation and its progress, as reported to clients."""
+
+    def __init__(self, kind: str, params: dict | None = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = "queued"  # queued, running, completed, failed, cancelled
+        self.progress = 0.0
+        self.message: str | None = None
+        self.result: dict | None = None
+        self.error: str | None = None
+        self.created_at = datetime.utcnow()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    async def update(self, progress: float | None = None, message: str | None = None):
+        """Report progress (0..1) from inside the job; pushed on the "job" channel."""
+        if progress is not None:
+            self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        await manager.broadcast("job", "progress", self.to_dict())
+
+
+JobFunc = Callable[[Job], Awaitable[dict | None]]
+
+
+class JobRunner:
+    """In-process background jobs with a bounded number running at once.
+
+    Jobs run as their own asyncio tasks, detached from the request that
+    submitted them, so a client disconnect does not interrupt them.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max(max_concurrent, 1)
+        self._semaphore: asyncio.Semaphore | None = None
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def submit(self, kind: str, func: JobFunc, params: dict | None = None) -> Job:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, func))
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job and not job.finished and job.task:
+            job.task.cancel()
+        return job
+
+    async def shutdown(self):
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, func: JobFunc):
+        await manager.broadcast("job", "created", job.to_dict())
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                await manager.broadcast("job", "started", job.to_dict())
+                job.result = await func(job)
+            if isinstance(job.result, dict) and job.result.get("status") == "error":
+                # Routes report expected failures as {"status": "error", "message": ...}
+                job.status = "failed"
+                job.error = job.result.get("message")
+            else:
+                job.status = "completed"
+                job.progress = 1.0
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = "failed"
+            job.error = str(exc) or type(exc).__name__
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.task = None
+            try:
+                await manager.broadcast("job", job.status, job.to_dict())
+            except Exception:
+                pass
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+
+job_runner = JobRunner(settings.job_max_concurrent)
+
+
+def submit_db_job(
+    kind: str, func: Callable[[AsyncSession, Job], Awaitable[dict | None]], params: dict | None = None,
+) -> Job:
+    """Run ``func(db, job)`` as a background job with its own DB session."""
+    async def run(job: Job):
+        async with AsyncSessionLocal() as db:
+            return await func(db, job)
+    return job_runner.submit(kind, run, params)
@@ -0,0 +1,101 @@
+import math
+
+# Every quantile is within 1% of a real sample (DDSketch-style log bins)
+RELATIVE_ACCURACY = 0.01
+# Lowest bins are folded together past this many; 1 ms .. 1 day needs ~910
+MAX_BINS = 1024
+# Durations below this many ms share a single bin
+MIN_MS = 1.0
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def latency_bin(value) -> int | None:
+    """Bin of a duration, None below MIN_MS; also registered in SQLite as latency_bin()."""
+    if value is None or value < MIN_MS:
+        return None
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+class LatencySketch:
+    """Mergeable duration histogram stored as JSON in the daily stats rows.
+
+    Bin ``i`` holds durations in (gamma^(i-1), gamma^i], so adding or merging
+    is a count increment per bin, and per-day sketches combine into exact
+    sketches of longer ranges without revisiting the raw rows.
+    """
+
+    def __init__(self, data: dict | None = None):
+        data = data or {}
+        self.bins: dict[int, int] = {int(k): v for k, v in (data.get("bins") or {}).items()}
+        self.low: int = data.get("low", 0)
+        self.count: int = data.get("count", 0)
+        self.sum: float = data.get("sum", 0.0)
+        self.min: float | None = data.get("min")
+        self.max: float | None = data.get("max")
+
+    def to_json(self) -> dict:
+        return {
+            "bins": {str(k): v for k, v in sorted(self.bins.items())},
+            "low": self.low,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    def add(self, value: float):
+        self.add_bin(latency_bin(value), 1, value, value, value)
+
+    def add_bin(self, key: int | None, count: int, total: float, smallest: float, largest: float):
+        """Fold in ``count`` durations that share bin ``key`` (e.g. grouped by latency_bin() in SQL)."""
+        if key is None:
+            self.low += count
+        else:
+            self.bins[key] = self.bins.get(key, 0) + count
+            self._collapse()
+        self.count += count
+        self.sum += total
+        self.min = smallest if self.min is None else min(self.min, smallest)
+        self.max = largest if self.max is None else max(self.max, largest)
+
+    def merge(self, other: "LatencySketch"):
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self._collapse()
+        self.low += other.low
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _collapse(self):
+        if len(self.bins) <= MAX_BINS:
+            return
+        keys = sorted(self.bins)
+        keep = keys[len(keys) - MAX_BINS]
+        for key in keys[:len(keys) - MAX_BINS]:
+            self.bins[keep] += self.bins.pop(key)
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Duration at quantile q (0..1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.low
+        if rank < seen:
+            return self.min
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * _GAMMA ** key / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from sqlalchemy import select, or_, func as sa_func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import AsyncSessionLocal
+from app.models.project import Project, ProjectStats
+from app.models.task import Task
+from app.models.event import Session, Error
+
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = [
+    "task_count", "todo_count", "in_progress_count", "done_count", "archived_count",
+    "open_error_count", "active_session_count",
+]
+
+
+def _expected_counts():
+    """Per-project counters recomputed from the source tables."""
+    def tasks(*conditions):
+        return (
+            select(sa_func.count()).select_from(Task)
+            .where(Task.project_id == Project.id, *conditions)
+            .scalar_subquery()
+        )
+    query = select(
+        Project.id,
+        tasks(),
+        tasks(Task.status == "todo"),
+        tasks(Task.status == "in_progress"),
+        tasks(Task.status == "done"),
+        tasks(Task.status == "archived"),
+        select(sa_func.count()).select_from(Error)
+        .join(Session, Session.id == Error.session_id)
+        .where(Session.project_id == Project.id, Error.resolved.is_(False))
+        .scalar_subquery(),
+        select(sa_func.count()).select_from(Session)
+        .where(Session.project_id == Project.id, Session.end_time.is_(None))
+        .scalar_subquery(),
+    )
+    # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT, or it
+    # parses the ON as a join constraint
+    return query.where(Project.id.isnot(None))
+
+
+async def reconcile_project_stats() -> dict:
+    """Rewrite every project_stats row that disagrees with the source tables.
+
+    One INSERT ... SELECT ... ON CONFLICT statement, so the comparison and
+    the repair see the same snapshot.
+    """
+    table = ProjectStats.__table__
+    stmt = sqlite_insert(table).from_select(["project_id", *COUNTER_COLUMNS], _expected_counts())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["project_id"],
+        set_={name: stmt.excluded[name] for name in COUNTER_COLUMNS},
+        where=or_(*[table.c[name] != stmt.excluded[name] for name in COUNTER_COLUMNS]),
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(stmt)
+        await db.commit()
+    repaired = max(result.rowcount, 0)
+    if repaired:
+        logger.warning("Repaired project_stats for %d project(s)", repaired)
+    return {"repaired": repaired}
+
+
+async def run_reconcile_periodically(interval_seconds: float):
+    """Background loop started from the FastAPI lifespan."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await reconcile_project_stats()
+        except Exception:
+            logger.exception("project_stats reconciliation failed")
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import select, tuple_, or_, and_, func as sa_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.analytics import DailyStats, AgentUsageStats, RollupState
+from app.models.event import Session, Event, AgentExecution, ToolCall, TaskExecution
+from app.models.task import Task
+from app.services.latency import LatencySketch
+
+logger = logging.getLogger(__name__)
+
+# Event types folded into the daily tables; everything else is skipped
+ROLLUP_EVENT_TYPES = ("session_start", "agent_complete")
+ROLLUP_BATCH_SIZE = 5000
+
+_DAILY_FIELDS = ("tasks_completed", "tokens_used", "session_count", "agent_calls")
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _token_total(usage) -> int:
+    """Sum input/output tokens from the shapes hooks and tools report."""
+    if not isinstance(usage, dict):
+        return 0
+    total = 0
+    for key in ("input", "output", "input_tokens", "output_tokens"):
+        value = usage.get(key)
+        if isinstance(value, (int, float)):
+            total += int(value)
+    return total
+
+
+async def _get_state(db: AsyncSession, source: str) -> RollupState:
+    state = await db.get(RollupState, source)
+    if state is None:
+        state = RollupState(source=source, last_id=0)
+        db.add(state)
+    return state
+
+
+async def _new_max_id(db: AsyncSession, state: RollupState, id_column) -> int:
+    """Highest id in the source; the rows above the mark are the new ones.
+
+    The source tables use AUTOINCREMENT, so deleting the newest rows never
+    lets a later insert reuse an id at or below the mark. Only a cleared
+    RollupState (as /api/seed/reset does) starts over from 0.
+    """
+    return (await db.execute(select(sa_func.max(id_column)))).scalar() or 0
+
+
+async def _rollup_session_starts(db: AsyncSession, daily: dict, low: int, high: int):
+    result = await db.execute(
+        select(Session.project_id, sa_func.date(Event.timestamp).label("day"), sa_func.count().label("sessions"))
+        .outerjoin(Session, Event.session_id == Session.id)
+        .where(Event.id > low, Event.id <= high, Event.event_type == "session_start")
+        .group_by(Session.project_id, sa_func.date(Event.timestamp))
+    )
+    for row in result.all():
+        daily[(row.project_id, _as_date(row.day))]["session_count"] += row.sessions
+
+
+async def fold_agent_completions(db: AsyncSession, daily: dict, agents: dict, rows: list):
+    """Add agent_complete events (id, timestamp, payload, project_id rows) to the aggregates.
+
+    Also used by the slow-agent rule for the events past the watermark.
+    """
+    # agent_complete events from the MCP tool only carry the execution id,
+    # and the execution's own times stand in for a missing duration_ms
+    execution_ids = {
+        row.payload.get("agent_execution_id")
+        for row in rows
+        if isinstance(row.payload, dict)
+        and row.payload.get("agent_execution_id")
+        and (not row.payload.get("agent_type") or not _is_number(row.payload.get("duration_ms")))
+    }
+    executions = {}
+    if execution_ids:
+        exec_result = await db.execute(
+            select(
+                AgentExecution.id, AgentExecution.agent_type, AgentExecution.model,
+                AgentExecution.start_time, AgentExecution.end_time,
+            )
+            .where(AgentExecution.id.in_(execution_ids))
+        )
+        executions = {r.id: r for r in exec_result.all()}
+
+    for row in rows:
+        day = _as_date(row.timestamp)
+        payload = row.payload if isinstance(row.payload, dict) else {}
+        execution = executions.get(payload.get("agent_execution_id"))
+        agent_type = payload.get("agent_type") or (execution.agent_type if execution else "unknown")
+        model = payload.get("model") or (execution.model if execution else "unknown")
+        agg = agents[(agent_type, model, day)]
+        agg["total_calls"] += 1
+        if payload.get("status") == "failed":
+            agg["failure_count"] += 1
+        else:
+            agg["success_count"] += 1
+        duration = payload.get("duration_ms")
+        if not _is_number(duration) and execution and execution.end_time:
+            duration = (execution.end_time - execution.start_time).total_seconds() * 1000
+        if _is_number(duration):
+            agg.setdefault("duration_sketch", LatencySketch()).add(duration)
+        daily[(row.project_id, day)]["tokens_used"] += _token_total(payload.get("token_usage"))
+
+
+async def _rollup_events(db: AsyncSession, daily: dict, agents: dict) -> int:
+    state = await _get_state(db, "events")
+    max_id = await _new_max_id(db, state, Event.id)
+    if max_id <= state.last_id:
+        return 0
+
+    await _rollup_session_starts(db, daily, state.last_id, max_id)
+    # agent_complete payloads are parsed in Python, so they are read in
+    # primary key ranges of ROLLUP_BATCH_SIZE rather than all at once
+    after = state.last_id
+    while True:
+        rows = (await db.execute(
+            select(Event.id, Event.timestamp, Event.payload, Session.project_id)
+            .outerjoin(Session, Event.session_id == Session.id)
+            .where(Event.id > after, Event.id <= max_id, Event.event_type == "agent_complete")
+            .order_by(Event.id)
+            .limit(ROLLUP_BATCH_SIZE)
+        )).all()
+        if not rows:
+            break
+        await fold_agent_completions(db, daily, agents, rows)
+        after = rows[-1].id
+
+    processed = max_id - state.last_id
+    state.last_id = max_id
+    return processed
+
+
+async def _rollup_agent_executions(db: AsyncSession, daily: dict) -> int:
+    state = await _get_state(db, "agent_executions")
+    max_id = await _new_max_id(db, state, AgentExecution.id)
+    if max_id <= state.last_id:
+        return 0
+
+    result = await db.execute(
+        select(
+            Session.project_id,
+            sa_func.date(AgentExecution.start_time).label("day"),
+            sa_func.count(AgentExecution.id).label("calls"),
+        )
+        .outerjoin(Session, AgentExecution.session_id == Session.id)
+        .where(AgentExecution.id > state.last_id, AgentExecution.id <= max_id)
+        .group_by(Session.project_id, sa_func.date(AgentExecution.start_time))
+    )
+    for row in result.all():
+        daily[(row.project_id, _as_date(row.day))]["agent_calls"] += row.calls
+
+    processed = max_id - state.last_id
+    state.last_id = max_id
+    return processed
+
+
+async def _rollup_tool_calls(db: AsyncSession, agents: dict) -> int:
+    # Tool calls are filed under the agent run that made them; calls made
+    # outside an agent execution have no agent_type and are skipped.
+    state = await _get_state(db, "tool_calls")
+    max_id = await _new_max_id(db, state, ToolCall.id)
+    if max_id <= state.last_id:
+        return 0
+
+    # Binned in SQL, so each (agent, model, day) brings back one row per
+    # occupied sketch bin rather than one per call
+    day = sa_func.date(AgentExecution.start_time)
+    bin_key = sa_func.latency_bin(ToolCall.duration_ms)
+    result = await db.execute(
+        select(
+            AgentExecution.agent_type, AgentExecution.model, day.label("day"), bin_key.label("bin"),
+            sa_func.count(ToolCall.id).label("calls"),
+            sa_func.sum(ToolCall.duration_ms).label("total"),
+            sa_func.min(ToolCall.duration_ms).label("smallest"),
+            sa_func.max(ToolCall.duration_ms).label("largest"),
+        )
+        .join(AgentExecution, ToolCall.agent_execution_id == AgentExecution.id)
+        .where(ToolCall.id > state.last_id, ToolCall.id <= max_id, ToolCall.duration_ms.isnot(None))
+        .group_by(AgentExecution.agent_type, AgentExecution.model, day, bin_key)
+    )
+    for row in result.all():
+        agg = agents[(row.agent_type, row.model, _as_date(row.day))]
+        agg.setdefault("tool_duration_sketch", LatencySketch()).add_bin(
+            row.bin, row.calls, row.total, row.smallest, row.largest
+        )
+
+    processed = max_id - state.last_id
+    state.last_id = max_id
+    return processed
+
+
+async def _rollup_task_completions(db: AsyncSession, daily: dict) -> int:
+    # Executions are updated in place when they stop, so the watermark is the
+    # (stopped_at, id) of the last completion seen rather than an insert id.
+    state = await _get_state(db, "task_executions")
+    query = (
+        select(TaskExecution.id, TaskExecution.stopped_at, Task.project_id)
+        .join(Task, TaskExecution.task_id == Task.id)
+        .where(TaskExecution.status == "completed", TaskExecution.stopped_at.isnot(None))
+        .order_by(TaskExecution.stopped_at, TaskExecution.id)
+    )
+    if state.last_time is not None:
+        query = query.where(or_(
+            TaskExecution.stopped_at > state.last_time,
+            and_(TaskExecution.stopped_at == state.last_time, TaskExecution.id > state.last_id),
+        ))
+    rows = (await db.execute(query)).all()
+    for row in rows:
+        daily[(row.project_id, _as_date(row.stopped_at))]["tasks_completed"] += 1
+    if rows:
+        state.last_time = rows[-1].stopped_at
+        state.last_id = rows[-1].id
+    return len(rows)
+
+
+async def _apply_daily(db: AsyncSession, daily: dict):
+    days = {day for _, day in daily}
+    existing = {}
+    if days:
+        result = await db.execute(select(DailyStats).where(DailyStats.date.in_(days)))
+        for row in result.scalars().all():
+            existing.setdefault((row.project_id, row.date), row)
+    for key, increments in daily.items():
+        row = existing.get(key)
+        if row is None:
+            row = DailyStats(project_id=key[0], date=key[1], **{f: 0 for f in _DAILY_FIELDS})
+            db.add(row)
+        for field, value in increments.items():
+            setattr(row, field, (getattr(row, field) or 0) + value)
+
+
+async def _apply_agents(db: AsyncSession, agents: dict):
+    if not agents:
+        return
+    result = await db.execute(
+        select(AgentUsageStats).where(
+            tuple_(AgentUsageStats.agent_type, AgentUsageStats.model, AgentUsageStats.date).in_(list(agents))
+        )
+    )
+    existing = {(r.agent_type, r.model, r.date): r for r in result.scalars().all()}
+    for (agent_type, model, day), agg in agents.items():
+        row = existing.get((agent_type, model, day))
+        if row is None:
+            row = AgentUsageStats(
+                agent_type=agent_type, model=model, date=day,
+                total_calls=0, avg_duration_ms=0.0, success_count=0, failure_count=0,
+            )
+            db.add(row)
+        for field in ("duration_sketch", "tool_duration_sketch"):
+            if field in agg:
+                # Assign a new dict: in-place changes to a JSON column are not tracked
+                sketch = LatencySketch(getattr(row, field))
+                sketch.merge(agg[field])
+                setattr(row, field, sketch.to_json())
+                if field == "duration_sketch":
+                    # The sketch counts only the calls that reported a duration,
+                    # which total_calls does not
+                    row.avg_duration_ms = sketch.mean
+        row.total_calls = (row.total_calls or 0) + agg["total_calls"]
+        row.success_count = (row.success_count or 0) + agg["success_count"]
+        row.failure_count = (row.failure_count or 0) + agg["failure_count"]
+
+
+async def run_rollup() -> dict:
+    """Fold rows added since the last run into DailyStats / AgentUsageStats.
+
+    Every source and its high-water mark are committed in one transaction, so
+    an interrupted run is simply repeated by the next one.
+    """
+    daily: dict = defaultdict(lambda: defaultdict(int))
+    agents: dict = defaultdict(lambda: defaultdict(int))
+    async with AsyncSessionLocal() as db:
+        processed = {
+            "events": await _rollup_events(db, daily, agents),
+            "agent_executions": await _rollup_agent_executions(db, daily),
+            "tool_calls": await _rollup_tool_calls(db, agents),
+            "task_completions": await _rollup_task_completions(db, daily),
+        }
+        await _apply_daily(db, daily)
+        await _apply_agents(db, agents)
+        await db.commit()
+    processed["daily_rows"] = len(daily)
+    processed["agent_rows"] = len(agents)
+    return processed
+
+
+async def run_rollup_periodically(interval_seconds: float):
+    """Background loop started from the FastAPI lifespan."""
+    while True:
+        try:
+            await run_rollup()
+        except Exception:
+            logger.exception("Stats rollup failed")
+        await asyncio.sleep(interval_seconds)
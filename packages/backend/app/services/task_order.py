@@ -0,0 +1,146 @@
+import asyncio
+from sqlalchemy import select, update, case, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task
+
+# Spacing between neighbours after a rebalance and when appending
+STEP = 1024.0
+# Narrowest gap bisected before the surrounding tasks are respread. Far above
+# float resolution for keys of any realistic magnitude.
+MIN_GAP = 1e-6
+# Tasks respread on each side of the drop position at first; doubled until
+# the window's outer neighbours leave enough room
+REBALANCE_WINDOW = 4
+
+# Moves read their neighbours and then write; serializing them keeps two
+# concurrent drops into the same gap from computing the same key.
+_move_lock = asyncio.Lock()
+
+_KEY = tuple_(Task.sort_order, Task.id)
+
+
+def _column(project_id: int, status: str, exclude_id: int | None = None):
+    query = select(Task.id, Task.sort_order).where(Task.project_id == project_id, Task.status == status)
+    if exclude_id is not None:
+        query = query.where(Task.id != exclude_id)
+    return query
+
+
+async def end_of_column(db: AsyncSession, project_id: int, status: str) -> float:
+    """Sort key that places a new task after every task in the column."""
+    last = (await db.execute(
+        _column(project_id, status).order_by(Task.sort_order.desc(), Task.id.desc()).limit(1)
+    )).first()
+    return last.sort_order + STEP if last else STEP
+
+
+async def _neighbours(db: AsyncSession, task: Task, status: str, anchor, after: bool, limit: int):
+    """Up to ``limit`` tasks on one side of ``anchor`` (a row), nearest first."""
+    query = _column(task.project_id, status, task.id)
+    if after:
+        query = query.where(_KEY > tuple_(anchor.sort_order, anchor.id)).order_by(Task.sort_order, Task.id)
+    else:
+        query = query.where(_KEY < tuple_(anchor.sort_order, anchor.id)).order_by(
+            Task.sort_order.desc(), Task.id.desc()
+        )
+    return (await db.execute(query.limit(limit))).all()
+
+
+async def _respread(db: AsyncSession, task: Task, status: str, prev, next_) -> dict[int, float]:
+    """Evenly space ``prev``, the moved task and ``next_`` plus a few tasks around them.
+
+    The window grows until its outer neighbours are far enough apart, so a
+    crowded spot costs a handful of writes rather than a whole column.
+    """
+    size = REBALANCE_WINDOW
+    while True:
+        below = [prev, *await _neighbours(db, task, status, prev, False, size)]
+        above = [next_, *await _neighbours(db, task, status, next_, True, size)]
+        lower = below.pop() if len(below) > size else None
+        upper = above.pop() if len(above) > size else None
+        window = [row.id for row in reversed(below)] + [task.id] + [row.id for row in above]
+        count = len(window)
+        if lower is None and upper is None:
+            keys = [STEP * (i + 1) for i in range(count)]
+        elif lower is None:
+            keys = [upper.sort_order - STEP * (count - i) for i in range(count)]
+        elif upper is None:
+            keys = [lower.sort_order + STEP * (i + 1) for i in range(count)]
+        else:
+            gap = (upper.sort_order - lower.sort_order) / (count + 1)
+            if gap < MIN_GAP:
+                size *= 2
+                continue
+            keys = [lower.sort_order + gap * (i + 1) for i in range(count)]
+        return dict(zip(window, keys))
+
+
+async def move_task(
+    db: AsyncSession, task: Task, after_id: int | None = None, before_id: int | None = None,
+    status: str | None = None,
+) -> dict[int, float]:
+    """Place ``task`` after ``after_id`` or before ``before_id`` and commit.
+
+    The key is the midpoint of the task's neighbours as stored now, not as
+    the client last saw them, so concurrent moves never interleave into the
+    same key. Returns the new sort key of every task written: usually just
+    the moved one, or a small window when the gap had to be respread.
+    """
+    async with _move_lock:
+        anchor_id = after_id if after_id is not None else before_id
+        anchor = None
+        if anchor_id is not None:
+            anchor = (await db.execute(
+                select(Task.id, Task.project_id, Task.status, Task.sort_order).where(Task.id == anchor_id)
+            )).first()
+            if anchor is None:
+                raise LookupError(f"Task {anchor_id} not found")
+            if anchor.id == task.id:
+                raise ValueError("A task cannot be moved next to itself")
+            if anchor.project_id != task.project_id:
+                raise ValueError("Tasks belong to different projects")
+            if status is not None and status != anchor.status:
+                raise ValueError(f"Task {anchor_id} is not in column '{status}'")
+            status = anchor.status
+        status = status or task.status
+
+        if anchor is None:
+            prev = (await db.execute(
+                _column(task.project_id, status, task.id)
+                .order_by(Task.sort_order.desc(), Task.id.desc()).limit(1)
+            )).first()
+            next_ = None
+        elif after_id is not None:
+            prev = anchor
+            next_ = next(iter(await _neighbours(db, task, status, anchor, True, 1)), None)
+        else:
+            next_ = anchor
+            prev = next(iter(await _neighbours(db, task, status, anchor, False, 1)), None)
+
+        if prev is None and next_ is None:
+            keys = {task.id: STEP}
+        elif prev is None:
+            keys = {task.id: next_.sort_order - STEP}
+        elif next_ is None:
+            keys = {task.id: prev.sort_order + STEP}
+        else:
+            middle = (prev.sort_order + next_.sort_order) / 2
+            if next_.sort_order - prev.sort_order >= MIN_GAP and prev.sort_order < middle < next_.sort_order:
+                keys = {task.id: middle}
+            else:
+                keys = await _respread(db, task, status, prev, next_)
+
+        task.sort_order = keys[task.id]
+        if status != task.status:
+            task.status = status
+            if status in ("done", "archived"):
+                task.phase = None
+        others = {task_id: key for task_id, key in keys.items() if task_id != task.id}
+        if others:
+            await db.execute(
+                update(Task).where(Task.id.in_(others))
+                .values(sort_order=case(others, value=Task.id))
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        return keys
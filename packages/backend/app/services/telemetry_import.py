@@ -0,0 +1,240 @@
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import AsyncIterator, Iterator
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import AsyncSessionLocal
+from app.models.project import Project
+from app.models.event import Session, Event, AgentExecution, ToolCall, FileChange, ImportKey
+from app.schemas.event import SessionCreate, EventCreate, ToolCallCreate, FileChangeCreate, ImportRecord
+from app.services.ingest import bulk_insert, prepare_rows
+
+# Records validated and committed together. A failed upload keeps every
+# committed chunk, and the idempotency keys make re-sending them a no-op.
+IMPORT_CHUNK_SIZE = 2000
+# Longest accepted NDJSON line; bounds the buffer held for a partial line
+MAX_LINE_BYTES = 1 << 20
+# Largest accepted upload after inflating, which stops a gzip bomb
+MAX_IMPORT_BYTES = 1 << 30
+# Validation errors echoed back in the response
+MAX_REPORTED_ERRORS = 50
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+_SCHEMAS: dict[str, type[BaseModel]] = {
+    "session": SessionCreate,
+    "event": EventCreate,
+    "tool_call": ToolCallCreate,
+    "file_change": FileChangeCreate,
+}
+_TABLES = {
+    "event": Event.__table__,
+    "tool_call": ToolCall.__table__,
+    "file_change": FileChange.__table__,
+}
+
+
+class ImportFormatError(ValueError):
+    """The upload is not a readable (optionally gzip-compressed) NDJSON stream."""
+
+
+class _GzipInflater:
+    """Inflates concatenated gzip members (e.g. appended spool files) in
+    pieces of at most MAX_LINE_BYTES, so a small compressed input cannot
+    expand into one huge buffer."""
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    @property
+    def eof(self) -> bool:
+        return self._decompressor.eof
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        try:
+            while True:
+                out = self._decompressor.decompress(data, MAX_LINE_BYTES)
+                data = self._decompressor.unconsumed_tail
+                if self._decompressor.eof and self._decompressor.unused_data:
+                    data = self._decompressor.unused_data
+                    self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if out:
+                    yield out
+                # A full piece may leave output buffered even with no input left
+                if not data and len(out) < MAX_LINE_BYTES:
+                    return
+        except zlib.error as exc:
+            raise ImportFormatError(f"Invalid gzip stream: {exc}") from exc
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines, inflating it first if it is gzip.
+
+    Uploads larger than MAX_IMPORT_BYTES once inflated are rejected.
+    """
+    inflater = None
+    sniffed = False
+    pending = b""
+    total = 0
+    async for chunk in chunks:
+        if not sniffed:
+            pending += chunk
+            if len(pending) < len(GZIP_MAGIC):
+                continue
+            chunk, pending, sniffed = pending, b"", True
+            if chunk.startswith(GZIP_MAGIC):
+                inflater = _GzipInflater()
+        for data in inflater.feed(chunk) if inflater is not None else (chunk,):
+            total += len(data)
+            if total > MAX_IMPORT_BYTES:
+                raise ImportFormatError(f"Upload larger than {MAX_IMPORT_BYTES} bytes")
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            if len(pending) > MAX_LINE_BYTES:
+                raise ImportFormatError(f"Line longer than {MAX_LINE_BYTES} bytes")
+            for line in lines:
+                yield line
+    if inflater is not None and not inflater.eof:
+        raise ImportFormatError("Truncated gzip stream")
+    if pending:
+        yield pending
+
+
+def _record_key(record: ImportRecord) -> str | None:
+    # Only a client key identifies a re-sent record: tool calls carry no
+    # timestamp, so identical content can be two genuine records
+    if not record.key:
+        return None
+    return hashlib.sha1(f"{record.kind}:key:{record.key}".encode()).hexdigest()
+
+
+class TelemetryImport:
+    """Validates and inserts NDJSON import records chunk by chunk."""
+
+    def __init__(self):
+        self.inserted: dict[str, int] = defaultdict(int)
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: list[dict] = []
+
+    def _reject(self, line_no: int, message: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def parse(self, line_no: int, line: bytes) -> tuple[str, str | None, dict] | None:
+        prefix = ()
+        try:
+            record = ImportRecord.model_validate_json(line)
+            prefix = ("data",)
+            row = _SCHEMAS[record.kind].model_validate(record.data).model_dump()
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in prefix + tuple(error["loc"]))
+            self._reject(line_no, f"{location}: {error['msg']}" if location else error["msg"])
+            return None
+        # Sessions are deduplicated by their own id instead of a key
+        key = None if record.kind == "session" else _record_key(record)
+        return record.kind, key, row
+
+    async def write_chunk(self, records: list[tuple[int, str, str | None, dict]]):
+        async with AsyncSessionLocal() as db:
+            sessions = [(line_no, row) for line_no, kind, _, row in records if kind == "session"]
+            project_ids = {row["project_id"] for _, row in sessions if row["project_id"] is not None}
+            known_projects = set()
+            if project_ids:
+                known_projects = set((await db.execute(
+                    select(Project.id).where(Project.id.in_(project_ids))
+                )).scalars())
+            valid_sessions = []
+            for line_no, row in sessions:
+                if row["project_id"] is not None and row["project_id"] not in known_projects:
+                    self._reject(line_no, f"data.project_id: unknown project {row['project_id']}")
+                    continue
+                valid_sessions.append(row)
+            sessions = valid_sessions
+            if sessions:
+                stmt = sqlite_insert(Session.__table__).on_conflict_do_nothing(index_elements=["id"])
+                result = await db.execute(stmt, prepare_rows(Session.__table__, sessions))
+                self.inserted["session"] += max(result.rowcount, 0)
+                self.duplicates += len(sessions) - max(result.rowcount, 0)
+
+            keyed = [r for r in records if r[1] != "session"]
+            keys = {key for _, _, key, _ in keyed if key is not None}
+            seen = set()
+            if keys:
+                seen = set((await db.execute(
+                    select(ImportKey.key).where(ImportKey.key.in_(keys))
+                )).scalars())
+            session_ids = {row["session_id"] for _, _, _, row in keyed}
+            known_sessions = set()
+            if session_ids:
+                known_sessions = set((await db.execute(
+                    select(Session.id).where(Session.id.in_(session_ids))
+                )).scalars())
+            agent_ids = {
+                row["agent_execution_id"] for _, kind, _, row in keyed
+                if kind == "tool_call" and row["agent_execution_id"] is not None
+            }
+            known_agents = set()
+            if agent_ids:
+                known_agents = set((await db.execute(
+                    select(AgentExecution.id).where(AgentExecution.id.in_(agent_ids))
+                )).scalars())
+
+            rows_by_kind: dict[str, list[dict]] = defaultdict(list)
+            new_keys = []
+            for line_no, kind, key, row in keyed:
+                if key is not None and key in seen:
+                    self.duplicates += 1
+                    continue
+                if row["session_id"] not in known_sessions:
+                    self._reject(line_no, f"data.session_id: unknown session '{row['session_id']}'")
+                    continue
+                if kind == "tool_call" and row["agent_execution_id"] not in known_agents:
+                    # Same outcome as the agent execution being deleted later
+                    row["agent_execution_id"] = None
+                if key is not None:
+                    seen.add(key)
+                    new_keys.append({"key": key})
+                rows_by_kind[kind].append(row)
+
+            for kind, rows in rows_by_kind.items():
+                self.inserted[kind] += await bulk_insert(db, _TABLES[kind], rows)
+            if new_keys:
+                await bulk_insert(db, ImportKey.__table__, new_keys)
+            await db.commit()
+
+    def summary(self) -> dict:
+        return {
+            "inserted": dict(self.inserted),
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+async def import_telemetry(chunks: AsyncIterator[bytes]) -> dict:
+    """Replay a (gzip) NDJSON stream of sessions, events, tool calls and file changes.
+
+    Each line is ``{"kind": ..., "key": ..., "data": {...}}``. Lines are
+    parsed as they arrive, so memory use is bounded by one chunk of records.
+    """
+    job = TelemetryImport()
+    records = []
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        parsed = job.parse(line_no, line)
+        if parsed is not None:
+            records.append((line_no, *parsed))
+        if len(records) >= IMPORT_CHUNK_SIZE:
+            await job.write_chunk(records)
+            records = []
+    if records:
+        await job.write_chunk(records)
+    return job.summary()
@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Integer, and_, case, literal, or_, select, union_all, func as sa_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from app.config import settings
+from app.database import engine
+from app.models.analytics import DailyStats, RollupState
+from app.models.event import Session, Event, AgentExecution, TaskExecution
+from app.models.task import Task
+from app.services.archive import archived_months, attach_month
+from app.services.rollup import ROLLUP_EVENT_TYPES
+
+# Bucket widths in seconds, finest first; "auto" and oversized requests move
+# down this list until the range fits in max_points buckets.
+BUCKETS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "4week": 28 * 86400,
+}
+# Buckets count from a Monday midnight, so days start at 00:00 and weeks on Mondays
+ORIGIN = datetime(1970, 1, 5)
+
+METRICS = ("tasks_completed", "tokens_used", "session_counts", "agent_calls")
+
+_TOKEN_KEYS = ("input", "output", "input_tokens", "output_tokens")
+
+
+def choose_bucket(since: datetime, until: datetime, requested: str, max_points: int) -> str:
+    """The finest bucket at least as wide as ``requested`` that keeps the range within max_points."""
+    span = (until - since).total_seconds()
+    names = list(BUCKETS)
+    start = 0 if requested == "auto" else names.index(requested)
+    for name in names[start:]:
+        if span / BUCKETS[name] <= max_points:
+            return name
+    return names[-1]
+
+
+def _bucket_index(value: datetime, seconds: int) -> int:
+    return int((value - ORIGIN).total_seconds() // seconds)
+
+
+def _bucket_start(index: int, seconds: int) -> datetime:
+    return ORIGIN + timedelta(seconds=index * seconds)
+
+
+def _label(index: int, seconds: int) -> str:
+    start = _bucket_start(index, seconds)
+    return start.isoformat() if seconds < BUCKETS["day"] else start.date().isoformat()
+
+
+def _bucket(column, seconds: int):
+    return sa_func.cast(
+        (sa_func.julianday(column) - sa_func.julianday(ORIGIN)) * 86400 / seconds, Integer
+    ).label("bucket")
+
+
+def _tokens(payload):
+    """Input/output tokens of an event payload, counted like rollup._token_total."""
+    total = 0
+    for key in _TOKEN_KEYS:
+        path = f"$.token_usage.{key}"
+        total = total + case(
+            (sa_func.json_type(payload, path).in_(["integer", "real"]),
+             sa_func.cast(sa_func.json_extract(payload, path), Integer)),
+            else_=0,
+        )
+    return total
+
+
+def unindexed(column):
+    """``+column``: SQLite will not drive the scan from an index on it."""
+    return UnaryExpression(column, operator=operators.custom_op("+"), type_=column.type)
+
+
+def _part(bucket, **values):
+    """One source's per-bucket totals, with 0 for the metrics it does not feed."""
+    return select(bucket, *[values.get(m, literal(0)).label(m) for m in METRICS])
+
+
+def _watermark(source: str, column):
+    return select(column).where(RollupState.source == source).scalar_subquery()
+
+
+def _daily_stats(seconds: int, since: datetime, until: datetime, project_id: int | None):
+    query = _part(
+        _bucket(DailyStats.date, seconds),
+        tasks_completed=sa_func.sum(DailyStats.tasks_completed),
+        tokens_used=sa_func.sum(DailyStats.tokens_used),
+        session_counts=sa_func.sum(DailyStats.session_count),
+        agent_calls=sa_func.sum(DailyStats.agent_calls),
+    ).where(DailyStats.date >= since.date(), DailyStats.date <= (until - timedelta(microseconds=1)).date())
+    if project_id:
+        query = query.where(DailyStats.project_id == project_id)
+    return query.group_by("bucket")
+
+
+# The rollup runs every rollup_interval_seconds (5 minutes by default), so
+# past its watermark there are only that many minutes of rows: the tail
+# queries walk the primary key from the watermark (by_id) and keep the time
+# bounds out of index selection. With the rollup disabled or not yet run the
+# tail is the whole range, and the time bounds pick the index as usual.
+#
+# The source parts read the live tables by default, or the same tables in an
+# attached archive month (see app.services.archive.archive_tables).
+
+_LIVE = {table.name: table for table in (
+    Session.__table__, Event.__table__, AgentExecution.__table__, TaskExecution.__table__,
+)}
+
+
+def _events(
+    seconds: int, since: datetime, until: datetime, project_id: int | None, tail: bool,
+    tables=_LIVE, by_id: bool = False,
+):
+    events, sessions = tables["events"].c, tables["sessions"].c
+    event_type, timestamp = events.event_type, events.timestamp
+    if by_id:
+        event_type, timestamp = unindexed(event_type), unindexed(timestamp)
+    query = _part(
+        _bucket(events.timestamp, seconds),
+        session_counts=sa_func.sum(case((events.event_type == "session_start", 1), else_=0)),
+        tokens_used=sa_func.sum(case((events.event_type == "agent_complete", _tokens(events.payload)), else_=0)),
+    ).where(event_type.in_(ROLLUP_EVENT_TYPES), timestamp >= since, timestamp < until)
+    if tail:
+        query = query.where(events.id > sa_func.coalesce(_watermark("events", RollupState.last_id), 0))
+    if project_id:
+        session_project = unindexed(sessions.project_id) if by_id else sessions.project_id
+        query = query.join(tables["sessions"], sessions.id == events.session_id).where(session_project == project_id)
+    return query.group_by("bucket")
+
+
+def _agent_executions(
+    seconds: int, since: datetime, until: datetime, project_id: int | None, tail: bool,
+    tables=_LIVE, by_id: bool = False,
+):
+    executions, sessions = tables["agent_executions"].c, tables["sessions"].c
+    start_time = unindexed(executions.start_time) if by_id else executions.start_time
+    query = _part(
+        _bucket(executions.start_time, seconds),
+        agent_calls=sa_func.count(executions.id),
+    ).where(start_time >= since, start_time < until)
+    if tail:
+        query = query.where(
+            executions.id > sa_func.coalesce(_watermark("agent_executions", RollupState.last_id), 0)
+        )
+    if project_id:
+        session_project = unindexed(sessions.project_id) if by_id else sessions.project_id
+        query = query.join(tables["sessions"], sessions.id == executions.session_id).where(session_project == project_id)
+    return query.group_by("bucket")
+
+
+def _task_completions(seconds: int, since: datetime, until: datetime, project_id: int | None, tail: bool, tables=_LIVE):
+    executions = tables["task_executions"].c
+    query = _part(
+        _bucket(executions.stopped_at, seconds),
+        tasks_completed=sa_func.count(executions.id),
+    ).where(executions.status == "completed", executions.stopped_at < until)
+    if tail:
+        # Same (stopped_at, id) watermark as rollup._rollup_task_completions;
+        # starting the index range at the watermark keeps it short.
+        last_time = _watermark("task_executions", RollupState.last_time)
+        last_id = _watermark("task_executions", RollupState.last_id)
+        query = query.where(
+            executions.stopped_at >= sa_func.max(since, sa_func.coalesce(last_time, since)),
+            or_(
+                last_time.is_(None),
+                executions.stopped_at > last_time,
+                and_(executions.stopped_at == last_time, executions.id > last_id),
+            ),
+        )
+    else:
+        query = query.where(executions.stopped_at >= since)
+    if project_id:
+        # Tasks are never archived, so this joins the live table either way
+        query = query.join(Task, Task.id == executions.task_id).where(Task.project_id == project_id)
+    return query.group_by("bucket")
+
+
+async def _rolled_up(db: AsyncSession) -> set[str]:
+    """Sources with a watermark that the running rollup keeps close to the newest row."""
+    if settings.rollup_interval_seconds <= 0:
+        return set()
+    return set((await db.execute(select(RollupState.source))).scalars())
+
+
+def _totals(parts):
+    combined = union_all(*parts).subquery()
+    return select(combined.c.bucket, *[sa_func.sum(combined.c[m]) for m in METRICS]).group_by(combined.c.bucket)
+
+
+def _add(totals: dict, rows):
+    for bucket, *values in rows:
+        previous = totals.get(bucket, (0,) * len(METRICS))
+        totals[bucket] = tuple(a + (b or 0) for a, b in zip(previous, values))
+
+
+async def _add_archived(totals: dict, seconds: int, since: datetime, until: datetime, project_id: int | None):
+    """Add the hourly totals of every archive month overlapping [since, until)."""
+    async with engine.connect() as conn:
+        for month in await archived_months(conn, since, until):
+            async with attach_month(conn, month) as archive:
+                result = await conn.execute(_totals([
+                    part(seconds, since, until, project_id, False, archive)
+                    for part in (_events, _agent_executions, _task_completions)
+                ]))
+                _add(totals, result.all())
+
+
+async def compute_trends(
+    db: AsyncSession, since: datetime, until: datetime,
+    bucket: str = "auto", max_points: int = 400, project_id: int | None = None,
+) -> dict:
+    """Per-bucket totals over [since, until), zero-filled.
+
+    Day and wider buckets add the rolled-up DailyStats rows to the source
+    rows the rollup has not folded in yet (past its watermarks), so a year
+    costs a few hundred DailyStats rows plus a short tail rather than a scan
+    of every event. Hourly buckets are counted from the source tables by
+    timestamp range, in the live DB and in every archive month the range
+    overlaps. The live parts run as one statement, which keeps the
+    watermarks and the DailyStats rows in the same snapshot while the
+    rollup commits.
+    """
+    name = choose_bucket(since, until, bucket, max_points)
+    seconds = BUCKETS[name]
+    first = _bucket_index(since, seconds)
+    last = _bucket_index(until - timedelta(microseconds=1), seconds)
+    since = _bucket_start(first, seconds)
+
+    tail = seconds >= BUCKETS["day"]
+    rolled_up = await _rolled_up(db) if tail else set()
+    parts = [
+        _events(seconds, since, until, project_id, tail, by_id="events" in rolled_up),
+        _agent_executions(seconds, since, until, project_id, tail, by_id="agent_executions" in rolled_up),
+        _task_completions(seconds, since, until, project_id, tail),
+    ]
+    if tail:
+        parts.append(_daily_stats(seconds, since, until, project_id))
+    totals: dict = {}
+    _add(totals, (await db.execute(_totals(parts))).all())
+    if not tail:
+        # Archived days are already in DailyStats; hours need the archived rows
+        await _add_archived(totals, seconds, since, until, project_id)
+
+    indexes = range(first, last + 1)
+    empty = (0,) * len(METRICS)
+    data = {
+        "bucket": name,
+        "bucket_seconds": seconds,
+        "dates": [_label(i, seconds) for i in indexes],
+    }
+    for position, metric in enumerate(METRICS):
+        data[metric] = [int(totals.get(i, empty)[position]) for i in indexes]
+    return data
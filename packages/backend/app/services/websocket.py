@@ -1,51 +1,197 @@
 import asyncio
 import json
 from datetime import datetime
+from typing import Callable
 from fastapi import WebSocket
+from app.config import settings
+
+# Outbound messages buffered per connection before the oldest ones are dropped
+SEND_QUEUE_SIZE = 256
+# A single send taking longer than this marks the client as stalled
+SEND_TIMEOUT_SECONDS = 5.0
+
+
+class _Client:
+    """One connected socket with its own bounded outbound queue and sender task."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.subscriptions: set[str] = set()
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+
+    def enqueue(self, message: str):
+        # Messages only tell the dashboard what to refetch, so when a client
+        # falls behind the oldest pending message is the cheapest to lose.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+def _encode(message: dict) -> str:
+    # Same encoding as Starlette's WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _merge_payload(merged: dict, data: dict) -> bool:
+    """Fold ``data`` into a pending payload of the same action and entity.
+
+    Lists such as ids and project_ids are unioned and counters add up; other
+    fields take the later value. Messages without an id describe a set of
+    rows (reordered, bulk_updated), so they are only combined when those
+    other fields agree; returns False when they do not.
+    """
+    if merged.get("id") is None:
+        for field, value in data.items():
+            if field in merged and field != "count" and not isinstance(value, list) and merged[field] != value:
+                return False
+    for field, value in data.items():
+        previous = merged.get(field)
+        if isinstance(previous, list) and isinstance(value, list):
+            merged[field] = list(dict.fromkeys(previous + value))
+        elif field == "count" and isinstance(previous, int) and isinstance(value, int):
+            merged[field] = previous + value
+        else:
+            merged[field] = value
+    if isinstance(merged.get("ids"), list) and "count" in merged:
+        # A row changed twice is still one changed row
+        merged["count"] = len(merged["ids"])
+    return True
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
-        self._subscriptions: dict[WebSocket, set[str]] = {}
+        self._clients: dict[WebSocket, _Client] = {}
+        # Reverse index so fan-out only visits interested clients. Clients
+        # without subscriptions receive everything.
+        self._channels: dict[str, set[_Client]] = {}
+        self._unsubscribed: set[_Client] = set()
+        # Per-channel coalescing: channel -> window (seconds), pending updates
+        # keyed by (action, entity id), and the scheduled flush for the window.
+        self._coalesce_windows: dict[str, float] = {}
+        self._pending: dict[str, dict[tuple, dict]] = {}
+        self._flush_handles: dict[str, asyncio.TimerHandle] = {}
+        # Called with (message_type, action, data) for every broadcast, before
+        # any coalescing, e.g. to invalidate caches derived from the changed data.
+        self._listeners: list[Callable[[str, str, dict], None]] = []
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self._clients)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self._subscriptions[websocket] = set()
+        client = _Client(websocket)
+        client.task = asyncio.create_task(self._sender(client))
+        self._clients[websocket] = client
+        self._unsubscribed.add(client)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        self._subscriptions.pop(websocket, None)
+        client = self._clients.pop(websocket, None)
+        if not client:
+            return
+        self._unsubscribed.discard(client)
+        for channel in client.subscriptions:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._channels[channel]
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
 
     def subscribe(self, websocket: WebSocket, channels: list[str]):
-        if websocket in self._subscriptions:
-            self._subscriptions[websocket].update(channels)
+        client = self._clients.get(websocket)
+        if not client:
+            return
+        self._unsubscribed.discard(client)
+        client.subscriptions.update(channels)
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(client)
+
+    def set_coalescing(self, channel: str, window_ms: int):
+        """Merge updates on ``channel`` that arrive within ``window_ms`` into one frame."""
+        if window_ms > 0:
+            self._coalesce_windows[channel] = window_ms / 1000
+        else:
+            self._coalesce_windows.pop(channel, None)
+
+    def add_listener(self, listener: Callable[[str, str, dict], None]):
+        self._listeners.append(listener)
 
     async def broadcast(self, message_type: str, action: str, data: dict):
+        """Queue a message for every interested client without waiting on sends."""
+        for listener in self._listeners:
+            listener(message_type, action, data)
+        window = self._coalesce_windows.get(message_type)
+        if window:
+            self._coalesce(message_type, action, data, window)
+        else:
+            self._fan_out(message_type, action, data)
+
+    def _coalesce(self, channel: str, action: str, data: dict, window: float):
+        pending = self._pending.setdefault(channel, {})
+        key = (action, data.get("id"))
+        merged = pending.get(key)
+        if merged is None or not _merge_payload(merged["data"], data):
+            if merged is not None:
+                # Sent as its own item in the batch
+                key = (action, None, len(pending))
+            pending[key] = {"action": action, "data": dict(data)}
+        if channel not in self._flush_handles:
+            loop = asyncio.get_running_loop()
+            self._flush_handles[channel] = loop.call_later(window, self._flush, channel)
+
+    def _flush(self, channel: str):
+        self._flush_handles.pop(channel, None)
+        items = list(self._pending.pop(channel, {}).values())
+        if len(items) == 1:
+            self._fan_out(channel, items[0]["action"], items[0]["data"])
+        elif items:
+            self._fan_out(channel, "batch", {"items": items, "count": len(items)})
+
+    def _fan_out(self, message_type: str, action: str, data: dict):
+        if not self._unsubscribed and message_type not in self._channels:
+            return
         message = {
             "type": message_type,
             "action": action,
             "data": data,
             "timestamp": datetime.utcnow().isoformat(),
         }
-        disconnected = []
-        for connection in self.active_connections:
-            subs = self._subscriptions.get(connection, set())
-            # Send if no subscriptions (send all) or type matches
-            if not subs or message_type in subs:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.append(connection)
-        for conn in disconnected:
-            self.disconnect(conn)
+        # Encode once and share the text across every recipient
+        text = _encode(message)
+        for client in self._unsubscribed:
+            client.enqueue(text)
+        for client in self._channels.get(message_type, ()):
+            client.enqueue(text)
 
     async def send_personal(self, websocket: WebSocket, data: dict):
+        client = self._clients.get(websocket)
+        if client:
+            client.enqueue(_encode(data))
+
+    async def _sender(self, client: _Client):
         try:
-            await websocket.send_json(data)
+            while True:
+                message = await client.queue.get()
+                # asyncio.timeout rather than wait_for: on 3.11 wait_for can
+                # swallow a cancel that lands as the send completes.
+                async with asyncio.timeout(SEND_TIMEOUT_SECONDS):
+                    await client.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
         except Exception:
-            self.disconnect(websocket)
+            # Closed socket or stalled consumer: drop it so it can reconnect
+            self.disconnect(client.websocket)
+            try:
+                await client.websocket.close(code=1013)
+            except Exception:
+                pass
 
 
 manager = ConnectionManager()
+for _channel in settings.ws_coalesce_channels:
+    manager.set_coalescing(_channel, settings.ws_coalesce_window_ms)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from sqlalchemy import Table
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.ingest import prepare_rows, insert_statement
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised by submit() when the queue is full and overflow is 'reject'."""
+
+
+@dataclass
+class _PendingRow:
+    table: Table
+    values: dict
+    future: asyncio.Future = field(repr=False)
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue that group-commits single-row telemetry inserts.
+
+    Routes submit a row and await its future; one background writer drains the
+    queue and commits whatever arrived within ``flush_interval_ms`` (or up to
+    ``batch_size`` rows) in a single transaction, so concurrent hook requests
+    share one SQLite commit instead of each paying for their own.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval_ms: int, overflow: str = "reject"):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow = overflow
+        self._queue: asyncio.Queue[_PendingRow | None] | None = None
+        self._task: asyncio.Task | None = None
+        self.stats = {"submitted": 0, "written": 0, "commits": 0, "rejected": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything queued so far, then stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        # Rows submitted while the writer was finishing sit behind the sentinel
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._write(leftover[start:start + self.batch_size])
+
+    async def submit(self, table: Table, values: dict) -> dict:
+        """Queue one row and wait until it is committed; returns the stored row."""
+        pending = _PendingRow(table, values, asyncio.get_running_loop().create_future())
+        if self.overflow == "block":
+            await self._queue.put(pending)
+        else:
+            try:
+                self._queue.put_nowait(pending)
+            except asyncio.QueueFull:
+                self.stats["rejected"] += 1
+                raise IngestQueueFull()
+        self.stats["submitted"] += 1
+        return await pending.future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: list[_PendingRow]):
+        try:
+            results = await self._insert(batch)
+        except Exception:
+            # One bad row (e.g. an unknown session_id) must not fail the rows
+            # that were merely committed alongside it, so retry individually.
+            for pending in batch:
+                try:
+                    results = await self._insert([pending])
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    if pending.future.done():
+                        # The submitter went away; the log is the only record
+                        logger.error("Queued %s row failed: %s", pending.table.name, e)
+                    else:
+                        pending.future.set_exception(e)
+                else:
+                    self._resolve([pending], results)
+            return
+        self._resolve(batch, results)
+
+    async def _insert(self, batch: list[_PendingRow]) -> list[dict]:
+        groups: dict[Table, list[int]] = {}
+        for i, pending in enumerate(batch):
+            groups.setdefault(pending.table, []).append(i)
+
+        results: list[dict] = [{}] * len(batch)
+        async with AsyncSessionLocal() as db:
+            for table, indexes in groups.items():
+                rows = prepare_rows(table, [batch[i].values for i in indexes])
+                stmt = insert_statement(table).returning(*table.columns, sort_by_parameter_order=True)
+                result = await db.execute(stmt, rows)
+                for i, row in zip(indexes, result.all()):
+                    results[i] = dict(row._mapping)
+            await db.commit()
+        self.stats["commits"] += 1
+        return results
+
+    def _resolve(self, batch: list[_PendingRow], results: list[dict]):
+        self.stats["written"] += len(batch)
+        for pending, row in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(row)
+
+
+ingest_queue = WriteBehindQueue(
+    max_size=settings.ingest_queue_max_size,
+    batch_size=settings.ingest_batch_size,
+    flush_interval_ms=settings.ingest_flush_interval_ms,
+    overflow=settings.ingest_queue_overflow,
+)
@@ -0,0 +1,69 @@
+"""Bottleneck detection over 1M agent executions (BENCH_AGENT_EXECUTIONS overrides).
+
+Every rule filters on an indexed time window, so a cold analysis reads the
+last week of telemetry rather than the whole table. The cache is cleared
+before each round.
+"""
+import json
+import os
+import random
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.cache import analytics_cache
+
+pytestmark = pytest.mark.benchmark
+
+EXECUTIONS = int(os.environ.get("BENCH_AGENT_EXECUTIONS", 1_000_000))
+PROJECTS = 20
+DAYS = 180
+
+
+@pytest.fixture(scope="module")
+def project_ids(client, db_path) -> list[int]:
+    """Sessions every other day for half a year, executions spread evenly over them."""
+    ids = [client.post("/api/projects", json={"name": f"p{i}"}).json()["id"] for i in range(PROJECTS)]
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    sessions = [
+        (str(uuid.uuid4()), project_id, (now - timedelta(days=day)).isoformat(" "))
+        for project_id in ids for day in range(0, DAYS, 2)
+    ]
+    agents = ["explorer", "coder", "reviewer", "planner", "tester"]
+    usage = json.dumps({"input": 100, "output": 200})
+
+    def executions():
+        for _ in range(EXECUTIONS):
+            start = now - timedelta(seconds=rng.random() * DAYS * 86400)
+            end = start + timedelta(seconds=rng.random() * 80)
+            yield (rng.choice(sessions)[0], rng.choice(agents), start.isoformat(" "), end.isoformat(" "), usage)
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO sessions (id, project_id, start_time) VALUES (?, ?, ?)", sessions)
+    conn.executemany(
+        "INSERT INTO agent_executions (session_id, agent_type, model, start_time, end_time, status, token_usage)"
+        " VALUES (?, ?, 'sonnet', ?, ?, 'completed', ?)",
+        executions(),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return ids
+
+
+@pytest.mark.parametrize("scope", ["global", "project"])
+def test_analyze_bottlenecks(benchmark, client, project_ids, scope):
+    params = {"project_id": project_ids[3]} if scope == "project" else {}
+    benchmark.group = "analyze_bottlenecks"
+    benchmark.extra_info["agent_executions"] = EXECUTIONS
+
+    response = benchmark.pedantic(
+        lambda: client.post("/api/ai/analyze/bottlenecks", params=params),
+        setup=analytics_cache.invalidate, rounds=5,
+    )
+
+    assert response.status_code == 200
+    assert "slow_agent" in {b["type"] for b in response.json()["bottlenecks"]}
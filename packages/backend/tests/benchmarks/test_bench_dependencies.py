@@ -0,0 +1,86 @@
+"""Dependency graph queries on a 10k-task project with about 20k edges.
+
+The graph is built once per project and cached until a task or edge write,
+so "rebuild" rounds pay for loading it and "cached" rounds only traverse.
+"""
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.task import Task, TaskDependency
+from app.services.dependencies import dependency_graphs
+from app.services.ingest import bulk_insert
+
+pytestmark = pytest.mark.benchmark
+
+TASKS = 10000
+
+
+@pytest.fixture(scope="module")
+def graph(client) -> tuple[int, list[int]]:
+    """Each task depends on two earlier tasks among its 50 predecessors."""
+    project_id = client.post("/api/projects", json={"name": "graph"}).json()["id"]
+    rng = random.Random(7)
+    statuses = ["todo"] * 6 + ["in_progress"] * 2 + ["done"] * 2
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await bulk_insert(db, Task.__table__, [
+                {"project_id": project_id, "title": f"t{i}", "status": rng.choice(statuses),
+                 "priority": "medium", "sort_order": float(i)}
+                for i in range(TASKS)
+            ])
+            ids = list((await db.execute(
+                select(Task.id).where(Task.project_id == project_id).order_by(Task.id)
+            )).scalars())
+            edges = {
+                (task_id, ids[rng.randrange(max(0, k - 50), k)])
+                for k, task_id in enumerate(ids[1:], 1) for _ in range(2)
+            }
+            await bulk_insert(db, TaskDependency.__table__, [
+                {"task_id": a, "depends_on_id": b} for a, b in edges
+            ])
+            await db.commit()
+            return ids
+
+    return project_id, client.portal.call(seed)
+
+
+def _paths(project_id: int, ids: list[int]) -> dict[str, str]:
+    return {
+        "ready_tasks": f"/api/projects/{project_id}/ready-tasks",
+        "critical_path": f"/api/projects/{project_id}/critical-path",
+        "blockers": f"/api/tasks/{ids[-1]}/blockers",
+    }
+
+
+@pytest.mark.parametrize("query", ["ready_tasks", "critical_path", "blockers"])
+@pytest.mark.parametrize("cached", [False, True], ids=["rebuild", "cached"])
+def test_graph_query(benchmark, client, graph, query, cached):
+    path = _paths(*graph)[query]
+    setup = None if cached else dependency_graphs.invalidate
+    client.get(path)
+    benchmark.group = query
+    benchmark.extra_info["tasks"] = TASKS
+
+    response = benchmark.pedantic(lambda: client.get(path), setup=setup, rounds=20 if cached else 5)
+
+    assert response.status_code == 200
+
+
+def test_cycle_rejection(benchmark, client, graph):
+    """The longest possible cycle: the first task made to depend on the last."""
+    _, ids = graph
+    benchmark.group = "add_dependency"
+
+    response = benchmark.pedantic(
+        lambda: client.post(f"/api/tasks/{ids[0]}/dependencies", json={"depends_on_id": ids[-1]}),
+        rounds=10,
+    )
+
+    assert response.status_code == 409
+    cycle = response.json()["detail"]["cycle"]
+    assert cycle[0] == cycle[-1] == ids[0]
+    benchmark.extra_info["cycle_length"] = len(cycle)
@@ -0,0 +1,57 @@
+"""Batch ingest throughput: the Core executemany path against per-row ORM objects."""
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models.event import Event
+from app.services.ingest import bulk_insert
+
+pytestmark = pytest.mark.benchmark
+
+
+def _events(count: int) -> list[dict]:
+    return [
+        {"session_id": "bench", "event_type": "tool_call", "payload": {"tool_name": "Read", "i": i}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def session_id(client):
+    client.post("/api/sessions", json={"id": "bench"})
+    return "bench"
+
+
+def _report_throughput(benchmark, rows: int):
+    benchmark.extra_info["rows"] = rows
+    if benchmark.stats is None:  # --benchmark-disable: ran once, nothing timed
+        return
+    benchmark.extra_info["rows_per_second"] = round(rows / benchmark.stats.stats.mean)
+
+
+@pytest.mark.parametrize("rows", [50, 1000, 10000])
+def test_events_batch_endpoint(benchmark, client, session_id, rows):
+    body = {"events": _events(rows)}
+    benchmark.group = "events_batch_endpoint"
+
+    response = benchmark.pedantic(lambda: client.post("/api/events/batch", json=body), rounds=5)
+
+    assert response.json()["inserted"] == rows
+    _report_throughput(benchmark, rows)
+
+
+@pytest.mark.parametrize("path", ["core", "orm"])
+def test_insert_paths(benchmark, run, session_id, path):
+    """The same 10k rows through bulk_insert and through db.add_all (the old endpoint body)."""
+    rows = _events(10000)
+
+    async def insert():
+        async with AsyncSessionLocal() as db:
+            if path == "core":
+                await bulk_insert(db, Event.__table__, rows)
+            else:
+                db.add_all([Event(**row) for row in rows])
+            await db.commit()
+
+    benchmark.group = "insert_paths"
+    benchmark.pedantic(lambda: run(insert), rounds=5)
+    _report_throughput(benchmark, len(rows))
@@ -0,0 +1,73 @@
+"""Project listing latency as the project count grows (3 tasks per project).
+
+"grouped_counts" runs the listing's original single query: project columns
+outer-joined to one grouped pass over tasks for the total and done counts,
+which replaced two COUNT queries per project. "endpoint" is GET /api/projects
+as it is now, reading the trigger-maintained project_stats rows instead, and
+also pays for the HTTP round trip and response serialization. Both should
+grow far slower than the project count.
+"""
+import pytest
+from sqlalchemy import case, select, func as sa_func
+
+from app.database import AsyncSessionLocal
+from app.models.project import Project
+from app.models.task import Task
+
+pytestmark = pytest.mark.benchmark
+
+
+def _grow_to(client, count: int):
+    existing = len(client.get("/api/projects").json())
+    for i in range(existing, count):
+        project_id = client.post("/api/projects", json={"name": f"p{i}"}).json()["id"]
+        for j in range(3):
+            client.post("/api/tasks", json={
+                "project_id": project_id, "title": f"t{j}", "status": "done" if j == 0 else "todo",
+            })
+
+
+def _grouped_counts_query():
+    counts = (
+        select(
+            Task.project_id,
+            sa_func.count(Task.id).label("task_count"),
+            sa_func.sum(case((Task.status == "done", 1), else_=0)).label("completed_task_count"),
+        )
+        .group_by(Task.project_id)
+        .subquery()
+    )
+    return (
+        select(
+            Project.id, Project.name, Project.description, Project.status,
+            Project.path, Project.created_at, Project.updated_at,
+            sa_func.coalesce(counts.c.task_count, 0).label("task_count"),
+            sa_func.coalesce(counts.c.completed_task_count, 0).label("completed_task_count"),
+        )
+        .outerjoin(counts, Project.id == counts.c.project_id)
+        .order_by(Project.updated_at.desc())
+    )
+
+
+async def _grouped_counts():
+    async with AsyncSessionLocal() as db:
+        return [row._asdict() for row in await db.execute(_grouped_counts_query())]
+
+
+LISTINGS = {
+    "grouped_counts": lambda client: client.portal.call(_grouped_counts),
+    "endpoint": lambda client: client.get("/api/projects").json(),
+}
+
+
+# Size-major, since the projects only ever grow
+@pytest.mark.parametrize("projects, listing", [(n, name) for n in (10, 100, 500) for name in LISTINGS])
+def test_list_projects(benchmark, client, projects, listing):
+    _grow_to(client, projects)
+    benchmark.group = f"list_projects[{projects}]"
+    benchmark.extra_info["projects"] = projects
+
+    rows = benchmark(LISTINGS[listing], client)
+
+    assert len(rows) == projects
+    assert all(r["task_count"] == 3 and r["completed_task_count"] == 1 for r in rows)
@@ -0,0 +1,56 @@
+"""Reorder and bulk-update latency at 10/100/1000 items in a 1000-task project.
+
+Both endpoints apply the whole request with set-based UPDATEs, so latency
+should not grow by a round trip per item.
+"""
+import random
+import sqlite3
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+TASKS = 1000
+
+
+@pytest.fixture(scope="module")
+def task_ids(client, db_path) -> list[int]:
+    project_id = client.post("/api/projects", json={"name": "board"}).json()["id"]
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO tasks (project_id, title, status, priority, sort_order) VALUES (?, ?, 'todo', 'medium', ?)",
+        [(project_id, f"t{i}", float(i)) for i in range(TASKS)],
+    )
+    conn.commit()
+    ids = [row[0] for row in conn.execute("SELECT id FROM tasks WHERE project_id = ?", (project_id,))]
+    conn.close()
+    return ids
+
+
+@pytest.mark.parametrize("items", [10, 100, 1000])
+def test_reorder(benchmark, client, db_path, task_ids, items):
+    moves = [
+        {"task_id": task_id, "new_sort_order": float(k), "new_status": "in_progress" if k % 2 else None}
+        for k, task_id in enumerate(random.Random(items).sample(task_ids, items))
+    ]
+    benchmark.group = "reorder"
+    benchmark.extra_info["items"] = items
+
+    response = benchmark(lambda: client.patch("/api/tasks/reorder", json=moves))
+
+    assert response.status_code == 200
+    conn = sqlite3.connect(db_path)
+    placed = dict(conn.execute("SELECT id, sort_order FROM tasks"))
+    conn.close()
+    assert all(placed[m["task_id"]] == m["new_sort_order"] for m in moves)
+
+
+@pytest.mark.parametrize("items", [10, 100, 1000])
+def test_bulk_update(benchmark, client, task_ids, items):
+    body = {"task_ids": random.Random(items).sample(task_ids, items), "priority": "high"}
+    benchmark.group = "bulk_update"
+    benchmark.extra_info["items"] = items
+
+    response = benchmark(lambda: client.patch("/api/tasks/bulk", json=body))
+
+    assert response.status_code == 200
@@ -0,0 +1,79 @@
+"""Messages/sec through broadcast and delivery at 1000 connections.
+
+Messages are encoded once and fanned out through the channel index, so a
+channel with 100 subscribers costs about a ninth of one with 900.
+"""
+import asyncio
+
+import pytest
+
+from app.services.websocket import ConnectionManager
+
+pytestmark = pytest.mark.benchmark
+
+CONNECTIONS = 1000
+# Below the per-client queue size, so nothing is dropped within a round
+MESSAGES = 200
+PAYLOAD = {"id": 1, "title": "x" * 80, "status": "todo", "project_id": 3}
+
+
+class FakeSocket:
+    # Sends across all sockets, so waiting for delivery is not O(connections)
+    delivered = 0
+
+    def __init__(self):
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.received += 1
+        FakeSocket.delivered += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+
+@pytest.mark.parametrize("channel, subscribers", [("task", 100), ("session", 900)])
+def test_broadcast_to_subscribers(benchmark, loop, channel, subscribers):
+    manager = ConnectionManager()
+    sockets = [FakeSocket() for _ in range(CONNECTIONS)]
+
+    async def connect():
+        for i, sock in enumerate(sockets):
+            await manager.connect(sock)
+            manager.subscribe(sock, ["task"] if i % 10 == 0 else ["session"])
+
+    bursts = 0
+
+    async def burst():
+        nonlocal bursts
+        bursts += 1
+        total = FakeSocket.delivered + MESSAGES * subscribers
+        for _ in range(MESSAGES):
+            await manager.broadcast(channel, "updated", PAYLOAD)
+        while FakeSocket.delivered < total:
+            await asyncio.sleep(0)
+
+    loop.run_until_complete(connect())
+    benchmark.group = "broadcast_to_subscribers"
+    benchmark.pedantic(lambda: loop.run_until_complete(burst()), rounds=5)
+    benchmark.extra_info.update(connections=CONNECTIONS, subscribers=subscribers)
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        benchmark.extra_info["messages_per_second"] = round(MESSAGES / benchmark.stats.stats.mean)
+
+    listening = [sock for i, sock in enumerate(sockets) if (i % 10 == 0) == (channel == "task")]
+    # Five rounds, or one under --benchmark-disable
+    assert all(sock.received == bursts * MESSAGES for sock in listening)
+    assert sum(sock.received for sock in sockets) == bursts * MESSAGES * subscribers
@@ -0,0 +1,82 @@
+"""Broadcast cost on the request path with 500 clients, one of them stalled.
+
+Each client has its own queue and sender task, so broadcast only enqueues:
+the stalled socket neither slows it down nor delays the other clients, and
+is dropped once a send times out.
+"""
+import asyncio
+
+import pytest
+
+from app.services import websocket
+from app.services.websocket import ConnectionManager
+
+pytestmark = pytest.mark.benchmark
+
+CLIENTS = 500
+MESSAGES = 100
+
+
+class FakeSocket:
+    def __init__(self, stalled: bool = False):
+        self.stalled = stalled
+        self.received = 0
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.stalled:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(0)
+        self.received += 1
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+
+def test_broadcast_with_stalled_client(benchmark, loop, monkeypatch):
+    monkeypatch.setattr(websocket, "SEND_TIMEOUT_SECONDS", 0.5)
+    manager = ConnectionManager()
+    sockets = [FakeSocket(stalled=i == 0) for i in range(CLIENTS)]
+
+    async def connect():
+        for sock in sockets:
+            await manager.connect(sock)
+
+    async def burst():
+        for i in range(MESSAGES):
+            await manager.broadcast("task", "updated", {"id": i})
+
+    async def drain():
+        # Untimed: lets the sender tasks deliver the previous round
+        while any(sock.received < sent for sock in sockets[1:]):
+            await asyncio.sleep(0.01)
+
+    sent = 0
+
+    def setup():
+        nonlocal sent
+        loop.run_until_complete(drain())
+        sent += MESSAGES
+
+    loop.run_until_complete(connect())
+    benchmark.extra_info.update(clients=CLIENTS, messages_per_round=MESSAGES)
+    benchmark.pedantic(lambda: loop.run_until_complete(burst()), setup=setup, rounds=10)
+
+    loop.run_until_complete(drain())
+    loop.run_until_complete(asyncio.sleep(websocket.SEND_TIMEOUT_SECONDS * 2))
+    assert all(sock.received == sent for sock in sockets[1:])
+    assert sockets[0].closed_with == 1013
+    assert len(manager.active_connections) == CLIENTS - 1
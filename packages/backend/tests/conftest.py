@@ -0,0 +1,80 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Settings and the engine are created at import time, so the test database
+# and the disabled background loops must be configured before app is imported.
+_data_dir = tempfile.mkdtemp(prefix="mcp-pm-tests-")
+os.environ["MCP_PM_DATA_DIR"] = _data_dir
+os.environ["MCP_PM_DATABASE_URL"] = f"sqlite+aiosqlite:///{_data_dir}/mcp_pm.db"
+os.environ["MCP_PM_ROLLUP_INTERVAL_SECONDS"] = "0"
+os.environ["MCP_PM_RETENTION_INTERVAL_SECONDS"] = "0"
+os.environ["MCP_PM_PROJECT_STATS_RECONCILE_INTERVAL_SECONDS"] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.archive import archive_dir  # noqa: E402
+from app.services.cache import analytics_cache  # noqa: E402
+from app.services.dependencies import dependency_graphs  # noqa: E402
+
+DB_PATH = f"{_data_dir}/mcp_pm.db"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One app instance for the run; its lifespan creates and migrates the database."""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def run(client):
+    """Await a coroutine function on the app's event loop, where the engine's connections live."""
+    return client.portal.call
+
+
+@pytest.fixture(scope="session")
+def db_path(client) -> str:
+    return DB_PATH
+
+
+@pytest.fixture
+def db(client):
+    """Plain sqlite3 connection for bulk seeding and EXPLAIN QUERY PLAN."""
+    conn = sqlite3.connect(DB_PATH)
+    yield conn
+    conn.close()
+
+
+def _clear_database():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA foreign_keys=OFF")
+    tables = [
+        name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' AND name != 'alembic_version'"
+        )
+    ]
+    for name in tables:
+        conn.execute(f"DELETE FROM {name}")
+    conn.commit()
+    conn.close()
+    shutil.rmtree(archive_dir(), ignore_errors=True)
+    analytics_cache.invalidate()
+    dependency_graphs.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def _empty_database(request, client):
+    yield
+    # Benchmark modules share one seeded dataset and clear it at the end
+    if request.node.get_closest_marker("benchmark") is None:
+        _clear_database()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _empty_database_after_module(client):
+    yield
+    _clear_database()
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from app.config import settings
+
+OLD_DAY = "2026-03-10"
+
+
+@pytest.fixture
+def archived(client, db, monkeypatch):
+    """Two ended sessions and one open session from March, one live session from today.
+
+    Each has a session_start event plus two more, an hour apart.
+    """
+    monkeypatch.setattr(settings, "retention_mode", "archive")
+    monkeypatch.setattr(settings, "archive_after_days", 90)
+    monkeypatch.setattr(settings, "retention_chunk_pause_ms", 0)
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    sessions = [
+        ("old-1", f"{OLD_DAY} 09:00:00", f"{OLD_DAY} 12:00:00"),
+        ("old-2", f"{OLD_DAY} 10:00:00", f"{OLD_DAY} 13:00:00"),
+        ("open", f"{OLD_DAY} 11:00:00", None),
+    ]
+    for session_id, start, end in sessions:
+        db.execute(
+            "INSERT INTO sessions (id, project_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+            (session_id, project_id, start, end),
+        )
+        hour = int(start[11:13])
+        for offset, event_type in enumerate(("session_start", "tool_use", "tool_use")):
+            db.execute(
+                "INSERT INTO events (session_id, event_type, timestamp) VALUES (?, ?, ?)",
+                (session_id, event_type, f"{OLD_DAY} {hour + offset:02d}:30:00"),
+            )
+    db.execute("INSERT INTO sessions (id, project_id) VALUES ('live', ?)", (project_id,))
+    db.executemany(
+        "INSERT INTO events (session_id, event_type) VALUES ('live', ?)",
+        [("session_start",), ("tool_use",), ("tool_use",)],
+    )
+    db.commit()
+    result = client.post("/api/dashboard/retention/run").json()
+    assert result["archived"] == {"2026-03": {"sessions": 2, "events": 6}}
+    return project_id
+
+
+def test_open_sessions_stay_live(client, db, archived):
+    live = {row[0] for row in db.execute("SELECT id FROM sessions")}
+    assert live == {"open", "live"}
+
+
+def test_activity_feed_pages_through_archived_events(client, archived):
+    first = client.get("/api/dashboard/activities", params={"limit": 4, "include_total": True}).json()
+    assert first["total"] == 12
+
+    seen = []
+    params = {"limit": 4}
+    while True:
+        page = client.get("/api/dashboard/activities", params=params).json()
+        seen += [(item["timestamp"], item["session_id"]) for item in page["items"]]
+        if not page["next_cursor"]:
+            break
+        params = {"limit": 4, "cursor": page["next_cursor"]}
+
+    assert len(seen) == 12
+    assert seen == sorted(seen, reverse=True)
+    assert {session_id for _, session_id in seen} == {"live", "open", "old-1", "old-2"}
+
+    project_page = client.get("/api/dashboard/activities", params={"project_id": archived, "limit": 50}).json()
+    assert len(project_page["items"]) == 12
+    offset_page = client.get("/api/dashboard/activities", params={"limit": 4, "offset": 8}).json()
+    assert [(i["timestamp"], i["session_id"]) for i in offset_page["items"]] == seen[8:]
+
+
+def test_hourly_trends_read_archived_days(client, archived):
+    params = {"since": f"{OLD_DAY}T00:00:00", "until": f"{OLD_DAY}T23:59:59"}
+    hours = client.get("/api/dashboard/trends", params={**params, "bucket": "hour"}).json()
+    assert sum(hours["session_counts"]) == 3
+    assert hours["session_counts"][9:12] == [1, 1, 1]
+
+    scoped = client.get(
+        "/api/dashboard/trends", params={**params, "bucket": "hour", "project_id": archived},
+    ).json()
+    assert scoped["session_counts"] == hours["session_counts"]
+
+
+def test_export_resumes_within_the_right_source(client, archived):
+    def export(**params):
+        response = client.get("/api/export/events", params=params)
+        assert response.status_code == 200
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    rows = export()
+    assert [r["source"] for r in rows] == ["2026-03"] * 6 + ["live"] * 6
+
+    # Ids are only unique within a source, so the cursor names it too
+    last = rows[3]
+    resumed = export(after=f"{last['source']}:{last['id']}")
+    assert resumed == rows[4:]
+    assert client.get("/api/export/events", params={"after": "12"}).status_code == 400
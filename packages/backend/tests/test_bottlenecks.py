@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.services.ai_analysis import analyze_bottlenecks
+from app.services.latency import LatencySketch
+
+
+async def _slow_agent_titles(project_id: int | None = None) -> list[str]:
+    async with AsyncSessionLocal() as db:
+        return [b["title"] for b in await analyze_bottlenecks(db, project_id) if b["type"] == "slow_agent"]
+
+
+def _add_runs(db, seconds: float, count: int = 3, project_id: int | None = None):
+    db.execute("INSERT OR IGNORE INTO sessions (id, project_id) VALUES ('s', ?)", (project_id,))
+    start = datetime.utcnow() - timedelta(hours=1)
+    db.executemany(
+        "INSERT INTO agent_executions (session_id, agent_type, model, start_time, end_time, status) "
+        "VALUES ('s', 'executor', 'opus', ?, ?, 'completed')",
+        [(start.isoformat(sep=" "), (start + timedelta(seconds=seconds)).isoformat(sep=" "))] * count,
+    )
+    db.commit()
+
+
+def _insert_sketch(db, durations_ms: list[float]):
+    sketch = LatencySketch()
+    for duration in durations_ms:
+        sketch.add(duration)
+    db.execute(
+        "INSERT INTO agent_usage_stats (agent_type, model, date, total_calls, avg_duration_ms, "
+        "success_count, failure_count, duration_sketch) VALUES ('executor', 'opus', ?, ?, ?, ?, 0, ?)",
+        (datetime.utcnow().date().isoformat(), sketch.count, sketch.mean, sketch.count, json.dumps(sketch.to_json())),
+    )
+    db.commit()
+
+
+def test_slow_agents_without_rollup_use_raw_runs(run, db):
+    _add_runs(db, 60)
+    assert run(_slow_agent_titles) == ["Slow agent: executor"]
+
+
+def test_slow_agents_without_sketches_use_raw_runs(run, db, monkeypatch):
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    _add_runs(db, 60)
+    assert run(_slow_agent_titles) == ["Slow agent: executor"]
+
+
+def test_slow_agents_prefer_sketches(run, db, monkeypatch):
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    _add_runs(db, 60)
+    _insert_sketch(db, [2000] * 10)
+    assert run(_slow_agent_titles) == []
+
+
+def test_slow_agents_same_verdict_in_every_scope(client, run, db):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    # Mean about 16 s, p95 120 s: the tail is what makes the agent slow
+    _add_runs(db, 5, count=19, project_id=project_id)
+    _add_runs(db, 120, count=2, project_id=project_id)
+
+    assert run(_slow_agent_titles) == ["Slow agent: executor"]
+    assert run(lambda: _slow_agent_titles(project_id)) == ["Slow agent: executor"]
+
+
+def test_slow_agents_add_events_past_the_rollup(run, db, monkeypatch):
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    _insert_sketch(db, [2000] * 10)
+    db.execute("INSERT INTO sessions (id) VALUES ('s')")
+    db.executemany(
+        "INSERT INTO events (session_id, event_type, payload) VALUES ('s', 'agent_complete', ?)",
+        [('{"agent_type": "executor", "model": "opus", "duration_ms": 90000}',)] * 5,
+    )
+    db.execute("INSERT INTO rollup_state (source, last_id) VALUES ('events', 0)")
+    db.commit()
+    assert run(_slow_agent_titles) == ["Slow agent: executor"]
+
+    # Once the rollup has folded them in, the same events are not counted twice
+    db.execute("UPDATE rollup_state SET last_id = (SELECT max(id) FROM events)")
+    db.commit()
+    assert run(_slow_agent_titles) == []
+
+
+def test_every_rule_runs_in_one_statement(client, run, db, monkeypatch):
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    long_ago = (datetime.utcnow() - timedelta(days=10)).isoformat(sep=" ")
+    task_id = client.post("/api/tasks", json={"project_id": project_id, "title": "t", "status": "in_progress"}).json()["id"]
+    db.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (long_ago, task_id))
+    db.execute(
+        "INSERT INTO milestones (project_id, title, due_date, status) VALUES (?, 'm', ?, 'pending')",
+        (project_id, long_ago),
+    )
+    db.commit()
+    client.post("/api/sessions", json={"id": "s", "project_id": project_id})
+    for _ in range(5):
+        client.post("/api/events/errors", json={"session_id": "s", "error_type": "E", "message": "x"})
+    db.executemany(
+        "INSERT INTO events (session_id, event_type, payload) VALUES ('s', 'agent_complete', ?)",
+        [('{"agent_type": "executor", "model": "opus", "duration_ms": 90000}',)] * 5,
+    )
+    db.commit()
+    _insert_sketch(db, [2000] * 10)
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def analyze():
+        async with AsyncSessionLocal() as session:
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                return await analyze_bottlenecks(session)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    found = run(analyze)
+
+    assert sorted(b["type"] for b in found) == ["overdue_milestone", "recurring_error", "slow_agent", "stuck_task"]
+    assert next(b for b in found if b["type"] == "stuck_task")["task_id"] == task_id
+    assert len(statements) == 1
@@ -0,0 +1,33 @@
+from app.services.dependencies import _invalidate_on_write, dependency_graphs
+
+
+def _task(client, project_id: int, title: str) -> int:
+    return client.post("/api/tasks", json={"project_id": project_id, "title": title}).json()["id"]
+
+
+def test_task_missing_from_cached_graph(client, db):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    first = _task(client, project_id, "a")
+    assert client.get(f"/api/tasks/{first}/dependencies").status_code == 200
+
+    # Written behind the cache's back, so the cached graph does not know it
+    db.execute(
+        "INSERT INTO tasks (project_id, title, status, priority, sort_order) VALUES (?, 'b', 'todo', 'medium', 1)",
+        (project_id,),
+    )
+    db.commit()
+    second = db.execute("SELECT max(id) FROM tasks").fetchone()[0]
+    response = client.get(f"/api/tasks/{second}/dependencies")
+    assert response.status_code == 200
+    assert response.json() == {"depends_on": [], "dependents": [], "blocked": False}
+
+
+def test_update_naming_another_project_drops_the_old_graph(client):
+    old_project = client.post("/api/projects", json={"name": "old"}).json()["id"]
+    new_project = client.post("/api/projects", json={"name": "new"}).json()["id"]
+    task_id = _task(client, old_project, "a")
+    client.get(f"/api/tasks/{task_id}/dependencies")
+    assert dependency_graphs.stats()["projects"] == 1
+
+    _invalidate_on_write("task", "updated", {"id": task_id, "project_id": new_project})
+    assert dependency_graphs.stats()["projects"] == 0
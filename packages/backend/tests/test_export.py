@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.routes import export
+
+ROWS = 1050
+
+
+@pytest.fixture
+def events(client, db) -> None:
+    """ROWS events, one a minute from 2026-03-10 00:00 UTC, inserted out of time order."""
+    client.post("/api/sessions", json={"id": "s"})
+    db.executemany(
+        "INSERT INTO events (session_id, event_type, timestamp, payload) VALUES ('s', 'tool_call', ?, ?)",
+        [
+            (f"2026-03-10 {minute // 60:02d}:{minute % 60:02d}:00", json.dumps({"i": minute}))
+            for minute in sorted(range(ROWS), key=lambda m: (m % 7, m))
+        ],
+    )
+    db.commit()
+
+
+def _ndjson(client, **params) -> list[dict]:
+    response = client.get("/api/export/events", params=params)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_multi_page_export_keeps_every_row_in_order(client, events, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 100)
+
+    rows = _ndjson(client)
+    assert len(rows) == ROWS
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+    assert len({r["id"] for r in rows}) == ROWS
+    assert {r["source"] for r in rows} == {"live"}
+
+    response = client.get("/api/export/events", params={"format": "csv"})
+    table = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(r["id"]) for r in table] == [r["id"] for r in rows]
+    assert json.loads(table[0]["payload"]) == rows[0]["payload"]
+
+
+def test_time_range_with_an_offset_is_read_as_utc(client, events):
+    naive = _ndjson(client, since="2026-03-10T10:00:00", until="2026-03-10T11:00:00")
+    offset = _ndjson(client, since="2026-03-10T12:00:00+02:00", until="2026-03-10T11:00:00Z")
+
+    assert len(naive) == 60
+    assert offset == naive
@@ -0,0 +1,96 @@
+import os
+import subprocess
+
+import pytest
+
+INIT = "/api/seed/init-from-git"
+
+COUNTS = """
+SELECT
+    (SELECT COUNT(*) FROM sessions),
+    (SELECT COUNT(*) FROM events WHERE event_type = 'commit'),
+    (SELECT COUNT(*) FROM file_changes),
+    (SELECT COUNT(*) FROM milestones),
+    (SELECT SUM(tasks_completed) FROM daily_stats)
+"""
+
+
+def _git(repo, *args: str, when: str = "2026-03-10T09:00:00+00:00") -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "dev", "GIT_AUTHOR_EMAIL": "dev@example.com",
+        "GIT_COMMITTER_NAME": "dev", "GIT_COMMITTER_EMAIL": "dev@example.com",
+        "GIT_AUTHOR_DATE": when, "GIT_COMMITTER_DATE": when,
+    }
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], env=env, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def _commit(repo, name: str, lines: int, when: str):
+    (repo / name).write_text("x\n" * lines)
+    _git(repo, "add", name)
+    _git(repo, "commit", "-q", "-m", f"change {name}", when=when)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Three commits over two days and one tag."""
+    _git(tmp_path, "init", "-q")
+    _commit(tmp_path, "a.txt", 3, "2026-03-10T09:00:00+00:00")
+    _commit(tmp_path, "b.txt", 2, "2026-03-10T15:00:00+00:00")
+    _git(tmp_path, "tag", "v1")
+    _commit(tmp_path, "a.txt", 5, "2026-03-11T10:00:00+00:00")
+    return tmp_path
+
+
+def _import(client, repo) -> dict:
+    result = client.post(INIT, json={"project_path": str(repo)}).json()
+    assert result["status"] == "success", result
+    return result["counts"]
+
+
+def test_first_import(client, db, repo):
+    counts = _import(client, repo)
+
+    assert (counts["commits"], counts["sessions"], counts["file_changes"], counts["milestones"]) == (3, 2, 3, 1)
+    assert db.execute(COUNTS).fetchone() == (2, 3, 3, 1, 3)
+    assert db.execute("SELECT summary FROM sessions ORDER BY start_time").fetchall() == [
+        ("Git history: 2 commit(s) on 2026-03-10",), ("Git history: 1 commit(s) on 2026-03-11",),
+    ]
+
+
+def test_second_run_is_idempotent(client, db, repo):
+    _import(client, repo)
+    before = db.execute(COUNTS).fetchone()
+
+    counts = _import(client, repo)
+
+    assert (counts["commits"], counts["sessions"], counts["milestones"], counts["already_imported"]) == (0, 0, 0, 3)
+    assert db.execute(COUNTS).fetchone() == before
+    assert len(client.get("/api/projects").json()) == 1
+
+
+def test_rerun_adds_only_new_commits(client, db, repo):
+    _import(client, repo)
+    _commit(repo, "c.txt", 1, "2026-03-11T18:00:00+00:00")
+
+    counts = _import(client, repo)
+
+    assert (counts["commits"], counts["sessions"]) == (1, 0)
+    assert db.execute(COUNTS).fetchone() == (2, 4, 4, 1, 4)
+    assert db.execute(
+        "SELECT summary, end_time FROM sessions WHERE summary LIKE '%2026-03-11'"
+    ).fetchone() == ("Git history: 2 commit(s) on 2026-03-11", "2026-03-11 18:00:00.000000")
+
+
+def test_rewritten_history_falls_back_to_the_full_log(client, db, repo):
+    _import(client, repo)
+    # The newest imported commit no longer exists
+    _git(repo, "commit", "-q", "--amend", "-m", "reworded", when="2026-03-11T11:00:00+00:00")
+
+    counts = _import(client, repo)
+
+    # Only the rewritten commit is new; the two before it are still known
+    assert (counts["commits"], counts["already_imported"]) == (1, 3)
+    assert db.execute(COUNTS).fetchone()[1] == 4
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import jobs
+from app.services.jobs import JobRunner
+
+
+@pytest.fixture
+def pushed(monkeypatch) -> list[tuple[str, str]]:
+    """(event, status) of every job update pushed on the "job" channel."""
+    events = []
+
+    async def broadcast(channel, event, data):
+        assert channel == "job"
+        events.append((event, data["status"]))
+
+    monkeypatch.setattr(jobs.manager, "broadcast", broadcast)
+    return events
+
+
+def test_job_moves_through_its_states(run, pushed):
+    async def scenario():
+        runner = JobRunner(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def work(job):
+            await job.update(0.5, "halfway")
+            await release.wait()
+            return {"rows": 3}
+
+        first = runner.submit("work", work)
+        second = runner.submit("work", work)
+        await asyncio.sleep(0.01)
+        # One slot: the second job waits for the first
+        seen = [(first.status, first.progress, first.message), second.status]
+        release.set()
+        await asyncio.gather(*(job.task for job in (first, second) if job.task))
+        return seen, first
+
+    seen, job = run(scenario)
+
+    assert seen == [("running", 0.5, "halfway"), "queued"]
+    assert (job.status, job.progress, job.result, job.error) == ("completed", 1.0, {"rows": 3}, None)
+    assert job.started_at <= job.finished_at and job.task is None
+    assert pushed[:3] == [("created", "queued"), ("started", "running"), ("progress", "running")]
+    assert pushed.count(("completed", "completed")) == 2
+
+
+@pytest.mark.parametrize("outcome, error", [
+    (RuntimeError("disk full"), "disk full"),
+    (KeyError, "KeyError"),
+    ({"status": "error", "message": "Not a git repository"}, "Not a git repository"),
+])
+def test_failures_are_recorded(run, pushed, outcome, error):
+    async def scenario():
+        async def work(job):
+            if isinstance(outcome, dict):
+                return outcome
+            raise outcome
+
+        job = JobRunner(max_concurrent=1).submit("work", work)
+        await job.task
+        return job
+
+    job = run(scenario)
+
+    assert (job.status, job.error) == ("failed", error)
+    assert job.finished_at is not None and job.progress < 1
+    assert pushed[-1] == ("failed", "failed")
+
+
+def test_cancel_running_job_but_not_a_finished_one(run, pushed):
+    async def scenario():
+        runner = JobRunner(max_concurrent=1)
+        done = runner.submit("quick", lambda job: asyncio.sleep(0))
+        await done.task
+        slow = runner.submit("slow", lambda job: asyncio.sleep(60))
+        await asyncio.sleep(0.01)
+        runner.cancel(slow.id)
+        runner.cancel(done.id)
+        await asyncio.gather(slow.task, return_exceptions=True)
+        return done, slow
+
+    done, slow = run(scenario)
+
+    assert (done.status, slow.status) == ("completed", "cancelled")
+
+
+def test_rerunning_a_completed_job_runs_it_again(run, pushed):
+    async def scenario():
+        runner = JobRunner(max_concurrent=1)
+        calls = []
+
+        async def work(job):
+            calls.append(job.id)
+            return {"run": len(calls)}
+
+        first = runner.submit("retention", work, {"mode": "delete"})
+        await first.task
+        second = runner.submit("retention", work, {"mode": "delete"})
+        await second.task
+        return runner, first, second
+
+    runner, first, second = run(scenario)
+
+    assert first.id != second.id
+    assert (first.status, first.result) == ("completed", {"run": 1})
+    assert (second.status, second.result) == ("completed", {"run": 2})
+    assert runner.list() == [second, first]
+
+
+def test_finished_jobs_are_pruned_oldest_first(run, pushed, monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FINISHED_JOBS", 2)
+
+    async def scenario():
+        runner = JobRunner(max_concurrent=1)
+        submitted = []
+        for _ in range(4):
+            job = runner.submit("work", lambda job: asyncio.sleep(0))
+            submitted.append(job)
+            await job.task
+        return runner, submitted
+
+    runner, submitted = run(scenario)
+
+    # The newest job is still counted as unfinished when its submit prunes
+    assert runner.list() == submitted[:0:-1]
+
+
+def _wait(client, job_id: str) -> dict:
+    deadline = time.monotonic() + 5
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_background_endpoint_reruns(client):
+    ids = []
+    for _ in range(2):
+        response = client.post("/api/dashboard/retention/run", params={"background": True})
+        assert response.status_code == 202
+        ids.append(response.json()["id"])
+        assert _wait(client, ids[-1])["status"] == "completed"
+
+    listed = [job["id"] for job in client.get("/api/jobs", params={"status": "completed"}).json()]
+    assert ids[0] != ids[1] and listed[:2] == ids[::-1]
+    assert client.get("/api/jobs/missing").status_code == 404
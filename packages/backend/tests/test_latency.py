@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from app.services.latency import LatencySketch, RELATIVE_ACCURACY, MIN_MS, latency_bin
+
+QUANTILES = (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1)
+
+
+def _samples(count: int = 20000, seed: int = 1) -> list[float]:
+    # Log-normal around 2 s with a long tail, like agent and tool durations
+    rng = random.Random(seed)
+    return [rng.lognormvariate(7.6, 1.2) for _ in range(count)]
+
+
+def _exact(ordered: list[float], q: float) -> float:
+    # The sample the sketch's rank q * (count - 1) points at
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _sketch(values) -> LatencySketch:
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_quantiles_within_relative_accuracy(seed):
+    values = _samples(seed=seed)
+    sketch = _sketch(values)
+    ordered = sorted(values)
+
+    for q in QUANTILES:
+        exact = _exact(ordered, q)
+        assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact * (1 + 1e-9), q
+    assert sketch.count == len(values)
+    assert sketch.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_merge_equals_one_sketch_of_everything():
+    values = _samples()
+    parts = [values[i::7] for i in range(7)]
+
+    merged = LatencySketch()
+    for part in parts:
+        # Through JSON, as the daily rows store them
+        merged.merge(LatencySketch(_sketch(part).to_json()))
+    whole = _sketch(values)
+
+    assert merged.bins == whole.bins
+    assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+    assert merged.sum == pytest.approx(whole.sum)
+    assert [merged.quantile(q) for q in QUANTILES] == [whole.quantile(q) for q in QUANTILES]
+
+
+def test_add_bin_matches_add():
+    values = _samples(2000)
+    by_bin: dict = {}
+    for value in values:
+        by_bin.setdefault(latency_bin(value), []).append(value)
+    binned = LatencySketch()
+    for key, group in by_bin.items():
+        binned.add_bin(key, len(group), sum(group), min(group), max(group))
+
+    added = _sketch(values)
+    assert binned.bins == added.bins
+    assert (binned.count, binned.min, binned.max) == (added.count, added.min, added.max)
+    assert binned.sum == pytest.approx(added.sum)
+
+
+def test_durations_below_min_ms():
+    sketch = _sketch([0.1, 0.5, 0.2, 1000])
+
+    assert sketch.low == 3
+    assert sketch.quantile(0.5) == 0.1
+    assert sketch.quantile(1) == 1000
+    assert latency_bin(MIN_MS / 2) is None
+
+
+def test_empty_sketch():
+    sketch = LatencySketch()
+    sketch.merge(LatencySketch())
+
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean is None
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+NEXT = "/api/ai/suggestions/next-tasks"
+
+
+@pytest.fixture
+def dag(client) -> tuple[int, dict[str, int]]:
+    """A small release plan; arrows point at prerequisites.
+
+    ship -> test -> build -> design
+    ship -> docs -> spec (done)
+    review -> notes (archived)
+    """
+    project_id = client.post("/api/projects", json={"name": "release"}).json()["id"]
+    yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    tasks = {
+        "spec": {"status": "done", "priority": "critical"},
+        "notes": {"status": "archived", "priority": "high"},
+        "design": {"priority": "high"},
+        "build": {"priority": "critical"},
+        "test": {"priority": "medium"},
+        "docs": {"priority": "low"},
+        "ship": {"priority": "critical"},
+        "review": {"priority": "low"},
+        "fix": {"priority": "medium", "status": "in_progress"},
+        "hotfix": {"priority": "low", "due_date": yesterday},
+    }
+    ids = {
+        title: client.post("/api/tasks", json={"project_id": project_id, "title": title, **fields}).json()["id"]
+        for title, fields in tasks.items()
+    }
+    for task, prerequisite in [
+        ("ship", "test"), ("test", "build"), ("build", "design"),
+        ("ship", "docs"), ("docs", "spec"), ("review", "notes"),
+    ]:
+        response = client.post(f"/api/tasks/{ids[task]}/dependencies", json={"depends_on_id": ids[prerequisite]})
+        assert response.status_code == 201
+    return project_id, ids
+
+
+def _suggested(client, **params) -> list[tuple[str, int]]:
+    return [(s["title"], s["priority_score"]) for s in client.get(NEXT, params=params).json()["suggestions"]]
+
+
+def test_blocked_and_finished_tasks_are_left_out(client, dag):
+    project_id, _ = dag
+
+    # build, test and ship wait on unfinished work; spec and notes are finished
+    # themselves but unblock docs and review
+    assert _suggested(client, project_id=project_id) == [
+        ("design", 70), ("hotfix", 70), ("fix", 55), ("docs", 10), ("review", 10),
+    ]
+
+
+def test_finishing_a_prerequisite_unblocks_its_dependents(client, dag):
+    project_id, ids = dag
+    client.patch(f"/api/tasks/{ids['design']}/status", json={"status": "done"})
+
+    assert [t for t, _ in _suggested(client, project_id=project_id)] == ["build", "hotfix", "fix", "docs", "review"]
+
+    for title in ("build", "test", "docs"):
+        client.patch(f"/api/tasks/{ids[title]}/status", json={"status": "done"})
+    assert _suggested(client, project_id=project_id)[0] == ("ship", 100)
+
+
+def test_limit_keeps_the_best_and_reasons_explain_them(client, dag):
+    project_id, _ = dag
+    suggestions = client.get(NEXT, params={"project_id": project_id, "limit": 3}).json()["suggestions"]
+
+    assert [s["title"] for s in suggestions] == ["design", "hotfix", "fix"]
+    assert suggestions[0]["reason"] == "High priority"
+    assert suggestions[1]["reason"].startswith("Overdue since ")
+    assert suggestions[2]["reason"] == "Already in progress"
+
+
+def test_other_projects_are_excluded(client, dag):
+    project_id, _ = dag
+    other = client.post("/api/projects", json={"name": "other"}).json()["id"]
+    client.post("/api/tasks", json={"project_id": other, "title": "elsewhere", "priority": "critical"})
+
+    assert "elsewhere" not in [t for t, _ in _suggested(client, project_id=project_id)]
+    assert _suggested(client)[0] == ("elsewhere", 100)
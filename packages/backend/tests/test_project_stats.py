@@ -0,0 +1,105 @@
+"""The trigger-maintained project_stats counters against fresh aggregates."""
+from app.services.project_stats import reconcile_project_stats
+
+EXPECTED = """
+SELECT
+    p.id,
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'todo'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'in_progress'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'done'),
+    (SELECT COUNT(*) FROM tasks WHERE project_id = p.id AND status = 'archived'),
+    (SELECT COUNT(*) FROM errors JOIN sessions ON sessions.id = errors.session_id
+     WHERE sessions.project_id = p.id AND NOT errors.resolved),
+    (SELECT COUNT(*) FROM sessions WHERE project_id = p.id AND end_time IS NULL)
+FROM projects p ORDER BY p.id
+"""
+ACTUAL = """
+SELECT project_id, task_count, todo_count, in_progress_count, done_count, archived_count,
+       open_error_count, active_session_count
+FROM project_stats ORDER BY project_id
+"""
+
+
+def assert_consistent(db, run):
+    assert db.execute(ACTUAL).fetchall() == db.execute(EXPECTED).fetchall()
+    assert run(reconcile_project_stats) == {"repaired": 0}
+
+
+def _projects(client, count: int = 2) -> list[int]:
+    return [client.post("/api/projects", json={"name": f"p{i}"}).json()["id"] for i in range(count)]
+
+
+def _task(client, project_id: int, status: str = "todo") -> int:
+    return client.post("/api/tasks", json={"project_id": project_id, "title": "t", "status": status}).json()["id"]
+
+
+def test_task_insert_status_change_and_delete(client, db, run):
+    a, _ = _projects(client)
+    tasks = [_task(client, a, status) for status in ("todo", "todo", "in_progress", "done")]
+    assert_consistent(db, run)
+
+    assert client.patch(f"/api/tasks/{tasks[0]}/status", json={"status": "done"}).status_code == 200
+    assert client.put(f"/api/tasks/{tasks[1]}", json={"status": "archived"}).status_code == 200
+    assert client.patch("/api/tasks/bulk", json={"task_ids": tasks[2:], "status": "todo"}).status_code == 200
+    assert_consistent(db, run)
+
+    assert client.delete(f"/api/tasks/{tasks[0]}").status_code == 200
+    assert_consistent(db, run)
+    assert db.execute("SELECT task_count, todo_count FROM project_stats WHERE project_id = ?", (a,)).fetchone() == (3, 2)
+
+
+def test_task_moves_between_projects(client, db, run):
+    a, b = _projects(client)
+    tasks = [_task(client, a, "in_progress") for _ in range(3)]
+
+    db.execute("UPDATE tasks SET project_id = ? WHERE id = ?", (b, tasks[0]))
+    # Project and status in the same statement
+    db.execute("UPDATE tasks SET project_id = ?, status = 'done' WHERE id = ?", (b, tasks[1]))
+    db.commit()
+
+    assert_consistent(db, run)
+
+
+def test_sessions_and_errors(client, db, run):
+    a, b = _projects(client)
+    for session_id in ("s1", "s2", "s3"):
+        client.post("/api/sessions", json={"id": session_id, "project_id": a})
+    for session_id in ("s1", "s1", "s2"):
+        client.post("/api/events/errors", json={"session_id": session_id, "error_type": "E", "message": "x"})
+    assert_consistent(db, run)
+    assert db.execute("SELECT active_session_count, open_error_count FROM project_stats").fetchall() == [(3, 3), (0, 0)]
+
+    assert client.put("/api/sessions/s1", json={"end_time": "2026-01-01T00:00:00"}).status_code == 200
+    assert client.put("/api/sessions/s2", json={"project_id": b}).status_code == 200
+    db.execute("UPDATE errors SET resolved = 1 WHERE id = (SELECT min(id) FROM errors WHERE session_id = 's1')")
+    db.commit()
+    assert_consistent(db, run)
+
+    # The delete cascades into the session's errors
+    assert client.delete("/api/sessions/s2").status_code == 200
+    assert client.delete("/api/sessions/s1").status_code == 200
+    assert_consistent(db, run)
+    assert db.execute("SELECT active_session_count, open_error_count FROM project_stats").fetchall() == [(1, 0), (0, 0)]
+
+
+def test_deleting_a_project(client, db, run):
+    a, b = _projects(client)
+    _task(client, a)
+    client.post("/api/sessions", json={"id": "s1", "project_id": a})
+    client.post("/api/events/errors", json={"session_id": "s1", "error_type": "E", "message": "x"})
+
+    assert client.delete(f"/api/projects/{a}").status_code == 200
+
+    assert_consistent(db, run)
+    assert db.execute("SELECT project_id FROM project_stats").fetchall() == [(b,)]
+
+
+def test_reconcile_repairs_drift(client, db, run):
+    a, = _projects(client, 1)
+    _task(client, a)
+    db.execute("UPDATE project_stats SET task_count = 7")
+    db.commit()
+
+    assert run(reconcile_project_stats) == {"repaired": 1}
+    assert_consistent(db, run)
@@ -0,0 +1,142 @@
+"""EXPLAIN QUERY PLAN checks for the hot telemetry queries.
+
+Each test records the statements an endpoint sends to SQLite and fails if any
+of them reads a telemetry table with a full scan instead of an index.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import engine
+from app.services.latency import latency_bin
+from app.services.rollup import run_rollup
+
+TELEMETRY_TABLES = {
+    "sessions", "events", "agent_executions", "skill_invocations",
+    "tool_calls", "file_changes", "errors", "task_executions", "import_keys",
+}
+# "SCAN events" or "SCAN events_1" (an alias); index scans read "SCAN x USING ..."
+_FULL_SCAN = re.compile(r"^SCAN (\w+?)(?:_\d+)?$")
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+def full_scans(db, statements) -> list[str]:
+    db.create_function("latency_bin", 1, latency_bin, deterministic=True)
+    found = []
+    for statement, parameters in statements:
+        for *_, detail in db.execute(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            match = _FULL_SCAN.match(detail)
+            if match and match.group(1) in TELEMETRY_TABLES:
+                found.append(f"{detail}: {' '.join(statement.split())}")
+    return found
+
+
+@pytest.fixture
+def seeded(client, db):
+    assert client.post("/api/seed/demo").status_code == 200
+    session_id, = db.execute("SELECT id FROM sessions ORDER BY start_time LIMIT 1").fetchone()
+    old = (datetime.utcnow() - timedelta(days=400)).isoformat(sep=" ")
+    db.execute("UPDATE sessions SET start_time = ? WHERE id = ?", (old, session_id))
+    db.execute(
+        "INSERT INTO agent_executions (session_id, agent_type, model, start_time, end_time, status) "
+        "VALUES (?, 'executor', 'sonnet', ?, ?, 'completed')",
+        (session_id, old, old),
+    )
+    db.execute(
+        "INSERT INTO tool_calls (session_id, agent_execution_id, tool_name, duration_ms, success) "
+        "VALUES (?, 1, 'Read', 120, 1)",
+        (session_id,),
+    )
+    db.execute(
+        "INSERT INTO errors (session_id, error_type, message, resolved, timestamp) VALUES (?, 'runtime', 'x', 0, ?)",
+        (session_id, old),
+    )
+    db.execute("UPDATE events SET timestamp = ? WHERE session_id = ?", (old, session_id))
+    db.commit()
+    return session_id
+
+
+def test_activity_feed_uses_indexes(client, db, seeded):
+    project_id, = db.execute("SELECT id FROM projects LIMIT 1").fetchone()
+    with captured_statements() as statements:
+        first = client.get("/api/dashboard/activities", params={"limit": 5}).json()
+        client.get("/api/dashboard/activities", params={"limit": 5, "cursor": first["next_cursor"]})
+        client.get("/api/dashboard/activities", params={"event_type": "session_start"})
+        client.get("/api/dashboard/activities", params={"project_id": project_id})
+    assert statements
+    assert full_scans(db, statements) == []
+
+
+def test_session_list_uses_indexes(client, db, seeded):
+    project_id, = db.execute("SELECT id FROM projects LIMIT 1").fetchone()
+    with captured_statements() as statements:
+        client.get("/api/sessions")
+        client.get("/api/sessions", params={"project_id": project_id})
+        client.get("/api/sessions", params={"active_only": True})
+    assert statements
+    assert full_scans(db, statements) == []
+
+
+def test_retention_deletes_use_indexes(client, db, seeded, monkeypatch):
+    monkeypatch.setattr(settings, "retention_mode", "delete")
+    monkeypatch.setattr(settings, "retention_chunk_pause_ms", 0)
+    for policy in ("events", "tool_calls", "errors", "sessions", "import_keys"):
+        monkeypatch.setattr(settings, f"retention_{policy}_days", 365)
+    with captured_statements() as statements:
+        result = client.post("/api/dashboard/retention/run").json()
+    assert result["deleted"].get("sessions") == 1
+    assert any(s.lstrip().upper().startswith("DELETE") for s, _ in statements)
+    assert full_scans(db, statements) == []
+
+
+def test_bottleneck_rules_use_indexes(client, db, seeded):
+    project_id, = db.execute("SELECT id FROM projects LIMIT 1").fetchone()
+    with captured_statements() as statements:
+        client.post("/api/ai/analyze/bottlenecks")
+        client.post("/api/ai/analyze/bottlenecks", params={"project_id": project_id})
+    assert statements
+    assert full_scans(db, statements) == []
+
+
+def _event_plans(db, statements) -> list[str]:
+    db.create_function("latency_bin", 1, latency_bin, deterministic=True)
+    return [
+        detail
+        for statement, parameters in statements
+        for *_, detail in db.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        if re.match(r"^(SCAN|SEARCH) events\b", detail)
+    ]
+
+
+def test_trends_tail_uses_time_index_until_rollup_runs(client, db, run, seeded, monkeypatch):
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    db.execute("DELETE FROM rollup_state")
+    db.commit()
+    with captured_statements() as statements:
+        client.get("/api/dashboard/trends", params={"days": 365, "bucket": "day"})
+    plans = _event_plans(db, statements)
+    assert plans and all("USING INDEX ix_events_event_type_timestamp" in d for d in plans)
+
+    run(run_rollup)
+    with captured_statements() as statements:
+        client.get("/api/dashboard/trends", params={"days": 365, "bucket": "day"})
+    plans = _event_plans(db, statements)
+    assert plans and all("INTEGER PRIMARY KEY" in d for d in plans)
@@ -0,0 +1,35 @@
+from sqlalchemy import event
+
+from app.database import engine
+from app.routes import tasks
+
+
+def test_reorder_chunks_fit_the_variable_limit(client, db):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    count = tasks.SET_BASED_CHUNK + 10
+    db.executemany(
+        "INSERT INTO tasks (project_id, title, status, priority, sort_order) VALUES (?, 't', 'todo', 'medium', ?)",
+        [(project_id, i) for i in range(count)],
+    )
+    db.commit()
+    ids = [r[0] for r in db.execute("SELECT id FROM tasks ORDER BY id")]
+    # Every task moves and changes column: the widest statement the route builds
+    items = [{"task_id": i, "new_sort_order": -n, "new_status": "in_progress"} for n, i in enumerate(ids)]
+
+    parameters = []
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        if statement.startswith("UPDATE tasks"):
+            parameters.append(len(params))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.patch("/api/tasks/reorder", json=items)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == count
+    assert parameters == [tasks.SET_BASED_CHUNK * tasks.PARAMS_PER_TASK, 10 * tasks.PARAMS_PER_TASK]
+    assert max(parameters) <= tasks.SQLITE_MAX_VARIABLES
+    assert [r[0] for r in db.execute("SELECT id FROM tasks WHERE status = 'in_progress' ORDER BY sort_order")] == ids[::-1]
@@ -0,0 +1,94 @@
+from app.services import rollup
+from app.services.rollup import run_rollup
+
+
+def _start_session(db, session_id: str, project_id: int):
+    db.execute("INSERT INTO sessions (id, project_id) VALUES (?, ?)", (session_id, project_id))
+    db.execute("INSERT INTO events (session_id, event_type) VALUES (?, 'session_start')", (session_id,))
+    db.commit()
+
+
+def _session_count(db) -> int:
+    return db.execute("SELECT coalesce(sum(session_count), 0) FROM daily_stats").fetchone()[0]
+
+
+def test_deleting_newest_rows_keeps_the_mark(client, db, run):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    for session_id in ("a", "b", "c"):
+        _start_session(db, session_id, project_id)
+    run(run_rollup)
+    assert _session_count(db) == 3
+
+    # The newest event goes with its session; history must not be folded in again
+    assert client.delete("/api/sessions/c").status_code == 200
+    run(run_rollup)
+    assert _session_count(db) == 3
+
+    _start_session(db, "d", project_id)
+    run(run_rollup)
+    assert _session_count(db) == 4
+
+
+def test_delete_and_insert_between_runs(client, db, run):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    for session_id in ("a", "b", "c"):
+        _start_session(db, session_id, project_id)
+    run(run_rollup)
+
+    # Without AUTOINCREMENT d's event would take c's freed id, at the mark
+    assert client.delete("/api/sessions/c").status_code == 200
+    _start_session(db, "d", project_id)
+    run(run_rollup)
+    assert _session_count(db) == 4
+
+
+def test_emptied_source_starts_over(client, db, run):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    _start_session(db, "a", project_id)
+    run(run_rollup)
+    assert client.post("/api/seed/reset").status_code == 200
+
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    _start_session(db, "b", project_id)
+    run(run_rollup)
+    assert _session_count(db) == 1
+
+
+def test_agent_mean_counts_only_timed_calls(client, db, run):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    _start_session(db, "a", project_id)
+    db.executemany(
+        "INSERT INTO events (session_id, event_type, payload) VALUES ('a', 'agent_complete', ?)",
+        [
+            ('{"agent_type": "executor", "model": "sonnet", "duration_ms": 100}',),
+            ('{"agent_type": "executor", "model": "sonnet"}',),
+        ],
+    )
+    db.commit()
+    run(run_rollup)
+    db.execute(
+        "INSERT INTO events (session_id, event_type, payload) VALUES ('a', 'agent_complete', ?)",
+        ('{"agent_type": "executor", "model": "sonnet", "duration_ms": 400}',),
+    )
+    db.commit()
+    run(run_rollup)
+
+    total_calls, avg = db.execute("SELECT total_calls, avg_duration_ms FROM agent_usage_stats").fetchone()
+    assert total_calls == 3
+    assert avg == 250
+
+
+def test_agent_completions_read_in_batches(client, db, run, monkeypatch):
+    monkeypatch.setattr(rollup, "ROLLUP_BATCH_SIZE", 2)
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    _start_session(db, "a", project_id)
+    db.executemany(
+        "INSERT INTO events (session_id, event_type, payload) VALUES ('a', 'agent_complete', ?)",
+        [(f'{{"agent_type": "executor", "model": "sonnet", "duration_ms": {ms}}}',) for ms in range(100, 600, 100)],
+    )
+    db.commit()
+    run(run_rollup)
+
+    total_calls, avg = db.execute("SELECT total_calls, avg_duration_ms FROM agent_usage_stats").fetchone()
+    assert (total_calls, avg) == (5, 300)
+    assert _session_count(db) == 1
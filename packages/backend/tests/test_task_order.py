@@ -0,0 +1,99 @@
+"""Fractional sort keys: the column order after a sequence of moves."""
+import pytest
+
+from app.services import task_order
+
+
+def _column(db, project_id: int, status: str) -> list[int]:
+    return [r[0] for r in db.execute(
+        "SELECT id FROM tasks WHERE project_id = ? AND status = ? ORDER BY sort_order, id", (project_id, status)
+    )]
+
+
+def _move(client, task_id: int, **body) -> dict:
+    response = client.post(f"/api/tasks/{task_id}/move", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def board(client) -> tuple[int, list[int]]:
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    ids = [
+        client.post("/api/tasks", json={"project_id": project_id, "title": f"t{i}"}).json()["id"]
+        for i in range(5)
+    ]
+    return project_id, ids
+
+
+def test_moves_within_a_column(client, db, board):
+    project_id, (a, b, c, d, e) = board
+    assert _column(db, project_id, "todo") == [a, b, c, d, e]
+
+    _move(client, e, before_id=a)  # to the head
+    _move(client, a, after_id=d)  # between two tasks
+    _move(client, b)  # to the tail
+    _move(client, c, after_id=b)  # after the tail
+
+    assert _column(db, project_id, "todo") == [e, d, a, b, c]
+
+
+def test_moves_across_columns(client, db, board):
+    project_id, (a, b, c, d, e) = board
+
+    _move(client, a, status="in_progress")  # into an empty column
+    _move(client, b, after_id=a)
+    _move(client, c, before_id=a)
+    _move(client, a, status="todo")  # back, to the end of the column
+
+    assert _column(db, project_id, "in_progress") == [c, b]
+    assert _column(db, project_id, "todo") == [d, e, a]
+    assert db.execute("SELECT status FROM tasks WHERE id = ?", (b,)).fetchone() == ("in_progress",)
+
+
+def test_exhausted_gap_is_respread(client, db, board):
+    project_id, ids = board
+    expected = list(ids)
+    respread = 0
+    # Dropping each task just after the head halves the head's gap every time
+    for i in range(60):
+        task_id = expected[-1 - i % 3]
+        expected.remove(task_id)
+        expected.insert(1, task_id)
+        result = _move(client, task_id, after_id=expected[0])
+        respread += len(result["sort_orders"]) > 1
+
+    assert respread > 0
+    assert _column(db, project_id, "todo") == expected
+    keys = [r[0] for r in db.execute(
+        "SELECT sort_order FROM tasks WHERE project_id = ? ORDER BY sort_order", (project_id,)
+    )]
+    assert all(right - left >= task_order.MIN_GAP for left, right in zip(keys, keys[1:]))
+
+
+def test_respread_window_grows_in_a_crowded_column(client, db, monkeypatch):
+    monkeypatch.setattr(task_order, "REBALANCE_WINDOW", 1)
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    ids = [
+        client.post("/api/tasks", json={"project_id": project_id, "title": f"t{i}"}).json()["id"]
+        for i in range(8)
+    ]
+    # Every key packed into a span too narrow for any window but the whole column
+    db.executemany("UPDATE tasks SET sort_order = ? WHERE id = ?", [(1 + i * 1e-7, t) for i, t in enumerate(ids)])
+    db.commit()
+
+    result = _move(client, ids[0], after_id=ids[4])
+
+    assert len(result["sort_orders"]) > 3
+    assert _column(db, project_id, "todo") == [*ids[1:5], ids[0], *ids[5:]]
+
+
+def test_invalid_anchors(client, board):
+    project_id, (a, b, *_) = board
+    other = client.post("/api/projects", json={"name": "q"}).json()["id"]
+    stranger = client.post("/api/tasks", json={"project_id": other, "title": "x"}).json()["id"]
+
+    assert client.post(f"/api/tasks/{a}/move", json={"after_id": a}).status_code == 400
+    assert client.post(f"/api/tasks/{a}/move", json={"after_id": stranger}).status_code == 400
+    assert client.post(f"/api/tasks/{a}/move", json={"after_id": b, "status": "done"}).status_code == 400
+    assert client.post(f"/api/tasks/{a}/move", json={"after_id": 10**9}).status_code == 404
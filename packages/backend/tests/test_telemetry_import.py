@@ -0,0 +1,82 @@
+import gzip
+import json
+
+from app.config import settings
+from app.services import telemetry_import
+
+
+def _ndjson(*records) -> bytes:
+    return b"\n".join(json.dumps(r).encode() for r in records)
+
+
+def test_unknown_project_is_an_invalid_line(client, db):
+    project_id = client.post("/api/projects", json={"name": "p"}).json()["id"]
+    body = _ndjson(
+        {"kind": "session", "data": {"id": "a", "project_id": project_id}},
+        {"kind": "session", "data": {"id": "b", "project_id": 999}},
+        {"kind": "event", "key": "e1", "data": {"session_id": "a", "event_type": "session_start"}},
+    )
+    response = client.post("/api/events/import", content=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == {"session": 1, "event": 1}
+    assert result["invalid"] == 1
+    assert result["errors"] == [{"line": 2, "error": "data.project_id: unknown project 999"}]
+    assert [r[0] for r in db.execute("SELECT id FROM sessions")] == ["a"]
+
+
+def test_keyless_records_are_never_duplicates(client, db):
+    client.post("/api/sessions", json={"id": "a"})
+    ping = {"kind": "tool_call", "data": {"session_id": "a", "tool_name": "ping"}}
+    body = _ndjson(ping, ping, ping)
+
+    assert client.post("/api/events/import", content=body).json()["inserted"] == {"tool_call": 3}
+    assert client.post("/api/events/import", content=body).json()["inserted"] == {"tool_call": 3}
+    assert db.execute("SELECT COUNT(*) FROM tool_calls").fetchone()[0] == 6
+    assert db.execute("SELECT COUNT(*) FROM import_keys").fetchone()[0] == 0
+
+
+def test_keyed_records_are_imported_once(client, db):
+    client.post("/api/sessions", json={"id": "a"})
+    body = _ndjson({"kind": "event", "key": "e1", "data": {"session_id": "a", "event_type": "x"}})
+
+    assert client.post("/api/events/import", content=body).json()["inserted"] == {"event": 1}
+    result = client.post("/api/events/import", content=body).json()
+    assert result["inserted"] == {}
+    assert result["duplicates"] == 1
+
+
+def test_inflated_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(telemetry_import, "MAX_IMPORT_BYTES", 1 << 20)
+    # About 8 KB compressed, 8 MB inflated
+    bomb = gzip.compress(b"\n" * (8 << 20))
+
+    response = client.post("/api/events/import", content=bomb)
+
+    assert response.status_code == 400
+    assert "larger than" in response.json()["detail"]
+
+
+def test_concatenated_gzip_members(client, db):
+    client.post("/api/sessions", json={"id": "a"})
+    members = [
+        gzip.compress(_ndjson({"kind": "event", "key": f"e{i}", "data": {"session_id": "a", "event_type": "x"}}) + b"\n")
+        for i in range(3)
+    ]
+
+    assert client.post("/api/events/import", content=b"".join(members)).json()["inserted"] == {"event": 3}
+
+
+def test_retention_prunes_old_import_keys(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "retention_chunk_pause_ms", 0)
+    db.executemany(
+        "INSERT INTO import_keys (key, created_at) VALUES (?, datetime('now', ?))",
+        [("old", "-40 days"), ("new", "-1 days")],
+    )
+    db.commit()
+
+    result = client.post("/api/dashboard/retention/run").json()
+
+    assert result["deleted"]["import_keys"] == 1
+    assert [r[0] for r in db.execute("SELECT key FROM import_keys")] == ["new"]
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services.rollup import run_rollup
+
+TRENDS = "/api/dashboard/trends"
+
+
+def _seed(client, db, project_id: int, first_day: int, days: int):
+    """A session per day with its start, agent runs, tokens and a completed task."""
+    now = datetime.utcnow().replace(microsecond=0)
+    task_id = client.post("/api/tasks", json={"project_id": project_id, "title": "t"}).json()["id"]
+    for day in range(first_day, first_day + days):
+        at = (now - timedelta(days=day, hours=1)).isoformat(" ")
+        session_id = f"s{project_id}-{first_day}-{day}"
+        db.execute("INSERT INTO sessions (id, project_id, start_time) VALUES (?, ?, ?)", (session_id, project_id, at))
+        db.execute(
+            "INSERT INTO events (session_id, event_type, timestamp) VALUES (?, 'session_start', ?)", (session_id, at)
+        )
+        db.execute(
+            "INSERT INTO events (session_id, event_type, timestamp, payload) VALUES (?, 'agent_complete', ?, ?)",
+            (session_id, at, '{"token_usage": {"input": 100, "output": 20}}'),
+        )
+        db.executemany(
+            "INSERT INTO agent_executions (session_id, agent_type, model, start_time, status) "
+            "VALUES (?, 'executor', 'sonnet', ?, 'completed')",
+            [(session_id, at)] * 2,
+        )
+        db.execute(
+            "INSERT INTO task_executions (task_id, session_id, started_at, stopped_at, status) "
+            "VALUES (?, ?, ?, ?, 'completed')",
+            (task_id, session_id, at, at),
+        )
+    db.commit()
+
+
+@pytest.fixture
+def projects(client, db, monkeypatch) -> list[int]:
+    # Enabled, so the tail walks from the watermark once the rollup has run
+    monkeypatch.setattr(settings, "rollup_interval_seconds", 300)
+    ids = [client.post("/api/projects", json={"name": f"p{i}"}).json()["id"] for i in range(2)]
+    for project_id in ids:
+        _seed(client, db, project_id, 1, 20)
+    return ids
+
+
+def _trends(client, projects) -> list[dict]:
+    return [
+        client.get(TRENDS, params=params).json()
+        for params in (
+            {"days": 30, "bucket": "day"},
+            {"days": 30, "bucket": "week"},
+            {"days": 30, "bucket": "day", "project_id": projects[1]},
+        )
+    ]
+
+
+def test_trends_match_before_and_after_rollup(client, db, run, projects):
+    before = _trends(client, projects)
+    run(run_rollup)
+    after = _trends(client, projects)
+
+    assert after == before
+    day = before[0]
+    assert sum(day["session_counts"]) == 40
+    assert sum(day["agent_calls"]) == 80
+    assert sum(day["tokens_used"]) == 40 * 120
+    assert sum(day["tasks_completed"]) == 40
+    assert sum(before[2]["session_counts"]) == 20
+
+
+def test_trends_add_the_tail_past_the_watermark(client, db, run, projects):
+    run(run_rollup)
+    # New rows the rollup has not seen, some on days it already folded in
+    _seed(client, db, projects[0], 0, 3)
+    tail = _trends(client, projects)
+    run(run_rollup)
+
+    assert _trends(client, projects) == tail
+    assert sum(tail[0]["session_counts"]) == 43
+
+
+def test_hourly_trends_ignore_the_rollup(client, db, run, projects):
+    params = {"days": 7, "bucket": "hour"}
+    before = client.get(TRENDS, params=params).json()
+    run(run_rollup)
+
+    assert client.get(TRENDS, params=params).json() == before
+    assert sum(before["session_counts"]) == 12
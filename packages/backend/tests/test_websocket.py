@@ -0,0 +1,45 @@
+import asyncio
+
+from app.services.websocket import ConnectionManager
+
+
+async def _coalesced(*messages) -> list[tuple[str, dict]]:
+    manager = ConnectionManager()
+    manager.set_coalescing("task", 10)
+    sent = []
+    manager._fan_out = lambda channel, action, data: sent.append((action, data))
+    for action, data in messages:
+        await manager.broadcast("task", action, data)
+    await asyncio.sleep(0.05)
+    return sent
+
+
+async def test_set_messages_union_their_ids():
+    sent = await _coalesced(
+        ("reordered", {"ids": [1, 2], "project_ids": [1], "count": 2}),
+        ("reordered", {"ids": [2, 3], "project_ids": [2], "count": 2}),
+    )
+    assert sent == [("reordered", {"ids": [1, 2, 3], "project_ids": [1, 2], "count": 3})]
+
+
+async def test_conflicting_bulk_updates_stay_apart():
+    sent = await _coalesced(
+        ("bulk_updated", {"ids": [1], "project_ids": [1], "count": 1, "status": "done"}),
+        ("bulk_updated", {"ids": [2], "project_ids": [1], "count": 1, "status": "todo"}),
+        ("bulk_updated", {"ids": [3], "project_ids": [1], "count": 1, "status": "done"}),
+    )
+    assert len(sent) == 1
+    action, data = sent[0]
+    assert action == "batch"
+    assert [item["data"] for item in data["items"]] == [
+        {"ids": [1, 3], "project_ids": [1], "count": 2, "status": "done"},
+        {"ids": [2], "project_ids": [1], "count": 1, "status": "todo"},
+    ]
+
+
+async def test_entity_updates_keep_the_latest_fields():
+    sent = await _coalesced(
+        ("updated", {"id": 7, "status": "todo", "project_id": 1}),
+        ("updated", {"id": 7, "status": "done", "project_id": 1}),
+    )
+    assert sent == [("updated", {"id": 7, "status": "done", "project_id": 1})]
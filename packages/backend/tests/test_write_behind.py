@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models.event import Event
+from app.services.write_behind import WriteBehindQueue, IngestQueueFull, ingest_queue
+
+
+def _event(session_id: str = "s", i: int = 0) -> dict:
+    return {"session_id": session_id, "event_type": "tool_call", "payload": {"i": i}}
+
+
+def _event_count(db) -> int:
+    return db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+@pytest.fixture
+def session(client) -> str:
+    client.post("/api/sessions", json={"id": "s"})
+    return "s"
+
+
+def test_batch_size_flushes_without_waiting(run, db, session):
+    async def scenario():
+        queue = WriteBehindQueue(max_size=100, batch_size=10, flush_interval_ms=60_000)
+        await queue.start()
+        rows = await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(Event.__table__, _event(i=i)) for i in range(20))), 5
+        )
+        await queue.stop()
+        return queue.stats, rows
+
+    stats, rows = run(scenario)
+
+    assert stats["commits"] == 2
+    assert [row["payload"]["i"] for row in rows] == list(range(20))
+    assert len({row["id"] for row in rows}) == 20
+    assert _event_count(db) == 20
+
+
+def test_interval_flushes_a_partial_batch(run, db, session):
+    async def scenario():
+        queue = WriteBehindQueue(max_size=100, batch_size=100, flush_interval_ms=50)
+        await queue.start()
+        await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(Event.__table__, _event(i=i)) for i in range(3))), 5
+        )
+        stats = dict(queue.stats)
+        await queue.stop()
+        return stats
+
+    assert run(scenario)["commits"] == 1
+    assert _event_count(db) == 3
+
+
+def test_stop_flushes_everything_queued(run, db, session):
+    async def scenario():
+        queue = WriteBehindQueue(max_size=100, batch_size=10, flush_interval_ms=60_000)
+        await queue.start()
+        before = [asyncio.ensure_future(queue.submit(Event.__table__, _event(i=i))) for i in range(25)]
+        stopping = asyncio.ensure_future(queue.stop())
+        # Queued behind the stop sentinel
+        after = [asyncio.ensure_future(queue.submit(Event.__table__, _event(i=i))) for i in range(25, 30)]
+        await asyncio.wait_for(asyncio.gather(stopping, *before, *after), 5)
+        return queue.stats
+
+    stats = run(scenario)
+
+    assert stats["written"] == 30
+    assert _event_count(db) == 30
+
+
+def test_failed_rows_are_reported_and_others_kept(run, db, session):
+    async def scenario():
+        queue = WriteBehindQueue(max_size=100, batch_size=5, flush_interval_ms=60_000)
+        await queue.start()
+        submits = [queue.submit(Event.__table__, _event(i=i)) for i in range(4)]
+        submits.insert(2, queue.submit(Event.__table__, _event("missing")))
+        results = await asyncio.wait_for(asyncio.gather(*submits, return_exceptions=True), 5)
+        await queue.stop()
+        return queue.stats, results
+
+    stats, results = run(scenario)
+
+    # The unknown session violates the foreign key; only that submitter sees it
+    assert [isinstance(r, Exception) for r in results] == [False, False, True, False, False]
+    assert (stats["written"], stats["failed"]) == (4, 1)
+    assert _event_count(db) == 4
+
+
+def test_full_queue_rejects(run, session):
+    async def scenario():
+        queue = WriteBehindQueue(max_size=1, batch_size=10, flush_interval_ms=60_000)
+        await queue.start()
+        first = asyncio.ensure_future(queue.submit(Event.__table__, _event(i=0)))
+        second = asyncio.ensure_future(queue.submit(Event.__table__, _event(i=1)))
+        await asyncio.sleep(0)
+        await queue.stop()
+        return await first, second.exception(), queue.stats
+
+    first, error, stats = run(scenario)
+
+    assert first["payload"] == {"i": 0}
+    assert isinstance(error, IngestQueueFull)
+    assert stats["rejected"] == 1
+
+
+def test_lifespan_end_commits_queued_rows(client, db, session, monkeypatch):
+    monkeypatch.setattr(settings, "ingest_queue_enabled", True)
+    # Neither a full batch nor the interval flushes these rows; only shutdown does
+    monkeypatch.setattr(ingest_queue, "flush_interval", 60)
+    submitted = ingest_queue.stats["submitted"]
+    with TestClient(app) as queued:
+        futures = [
+            queued.portal.start_task_soon(
+                lambda i=i: asyncio.to_thread(queued.post, "/api/events", json=_event(i=i))
+            )
+            for i in range(5)
+        ]
+        deadline = time.monotonic() + 5
+        while ingest_queue.stats["submitted"] < submitted + 5:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert _event_count(db) == 0
+
+    assert [f.result().status_code for f in futures] == [201] * 5
+    assert _event_count(db) == 5
@@ -14,7 +14,7 @@ export default function AnalyticsPage() {
 
   const { data: trends } = useQuery({
     queryKey: ["analytics", "trends", days],
-    queryFn: () => apiFetch<any>(`/api/dashboard/trends?days=${days}`),
+    queryFn: () => apiFetch<any>(`/api/dashboard/trends?days=${days}&bucket=day`),
   });
 
   const { data: agentStats } = useQuery({
@@ -29,20 +29,32 @@ const eventTypeColors: Record<string, string> = {
 
 export function ActivityList() {
   const [eventType, setEventType] = useState<string>("");
-  const [offset, setOffset] = useState(0);
+  // Cursors of the pages visited so far; the last entry is the current page
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+  const cursor = cursors[cursors.length - 1];
   const limit = 30;
 
   const { data, isLoading } = useQuery({
-    queryKey: ["activities", eventType, offset],
+    queryKey: ["activities", eventType, cursor],
     queryFn: () => api.dashboard.activities({
       event_type: eventType || undefined,
       limit,
-      offset,
+      cursor,
     }),
   });
 
-  const totalPages = data ? Math.ceil(data.total / limit) : 0;
-  const currentPage = Math.floor(offset / limit) + 1;
+  // The exact total is a full scan, so fetch it separately and only per filter
+  const { data: totalData } = useQuery({
+    queryKey: ["activities", eventType, "total"],
+    queryFn: () => api.dashboard.activities({
+      event_type: eventType || undefined,
+      limit: 1,
+      include_total: true,
+    }),
+  });
+
+  const currentPage = cursors.length;
+  const hasNext = Boolean(data?.next_cursor);
 
   return (
     <div>
@@ -50,7 +62,7 @@ export function ActivityList() {
       <div className="flex items-center gap-3 mb-4">
         <select
           value={eventType}
-          onChange={(e) => { setEventType(e.target.value); setOffset(0); }}
+          onChange={(e) => { setEventType(e.target.value); setCursors([undefined]); }}
           className="rounded-md border border-border bg-card px-3 py-1.5 text-sm"
         >
           <option value="">모든 이벤트</option>
@@ -58,9 +70,9 @@ export function ActivityList() {
             <option key={t} value={t}>{t}</option>
           ))}
         </select>
-        {data && (
+        {totalData?.total != null && (
           <span className="text-sm text-muted-foreground">
-            총 {data.total}개
+            총 {totalData.total}개
           </span>
         )}
       </div>
@@ -79,21 +91,22 @@ export function ActivityList() {
       </div>
 
       {/* Pagination */}
-      {totalPages > 1 && (
+      {(currentPage > 1 || hasNext) && (
         <div className="flex items-center justify-center gap-2 mt-6">
           <button
-            onClick={() => setOffset(Math.max(0, offset - limit))}
-            disabled={offset === 0}
+            onClick={() => setCursors(cursors.slice(0, -1))}
+            disabled={currentPage === 1}
             className="px-3 py-1.5 rounded-md border border-border text-sm disabled:opacity-40 hover:bg-card"
           >
             이전
           </button>
           <span className="text-sm text-muted-foreground">
-            {currentPage} / {totalPages}
+            {currentPage}
+            {totalData?.total != null && ` / ${Math.max(1, Math.ceil(totalData.total / limit))}`}
           </span>
           <button
-            onClick={() => setOffset(offset + limit)}
-            disabled={currentPage >= totalPages}
+            onClick={() => data?.next_cursor && setCursors([...cursors, data.next_cursor])}
+            disabled={!hasNext}
             className="px-3 py-1.5 rounded-md border border-border text-sm disabled:opacity-40 hover:bg-card"
           >
             다음
@@ -6,6 +6,8 @@ interface AgentPerformanceTableProps {
     model: string;
     total_calls: number;
     avg_duration_ms: number;
+    p95_duration_ms?: number | null;
+    p99_duration_ms?: number | null;
     success_rate: number;
   }>;
 }
@@ -36,6 +38,12 @@ export function AgentPerformanceTable({ data }: AgentPerformanceTableProps) {
             <th className="text-right py-2 px-3 text-muted-foreground font-medium">
               평균 소요시간
             </th>
+            <th className="text-right py-2 px-3 text-muted-foreground font-medium">
+              p95
+            </th>
+            <th className="text-right py-2 px-3 text-muted-foreground font-medium">
+              p99
+            </th>
             <th className="text-right py-2 px-3 text-muted-foreground font-medium">
               성공률
             </th>
@@ -59,6 +67,12 @@ export function AgentPerformanceTable({ data }: AgentPerformanceTableProps) {
                 <td className="py-2 px-3 text-right">
                   {formatDuration(agent.avg_duration_ms)}
                 </td>
+                <td className="py-2 px-3 text-right">
+                  {agent.p95_duration_ms != null ? formatDuration(agent.p95_duration_ms) : "-"}
+                </td>
+                <td className="py-2 px-3 text-right">
+                  {agent.p99_duration_ms != null ? formatDuration(agent.p99_duration_ms) : "-"}
+                </td>
                 <td className="py-2 px-3 text-right">
                   <span
                     className={
@@ -101,6 +101,15 @@ export function KanbanBoard({ paramsPromise }: KanbanBoardProps) {
     },
   });
 
+  // Move mutation: position within a column; the server assigns the sort key
+  const moveMutation = useMutation({
+    mutationFn: ({ taskId, afterId, beforeId }: { taskId: number; afterId?: number; beforeId?: number }) =>
+      api.tasks.move(taskId, { after_id: afterId, before_id: beforeId }),
+    onSettled: () => {
+      queryClient.invalidateQueries({ queryKey: ["tasks", projectId] });
+    },
+  });
+
   // Delete mutation
   const deleteMutation = useMutation({
     mutationFn: (taskId: number) => api.tasks.delete(taskId),
@@ -221,7 +230,14 @@ export function KanbanBoard({ paramsPromise }: KanbanBoardProps) {
       const overColId = getColumnId(overTask);
       if (task) {
         const currentColId = getColumnId(task);
-        if (currentColId !== overColId) {
+        if (currentColId === overColId && task.id !== overTask.id) {
+          const column = columnTasks[overColId];
+          const from = column.findIndex((t) => t.id === task.id);
+          const to = column.findIndex((t) => t.id === overTask.id);
+          moveMutation.mutate(
+            from < to ? { taskId, afterId: overTask.id } : { taskId, beforeId: overTask.id }
+          );
+        } else if (currentColId !== overColId) {
           const col = COLUMNS.find((c) => c.id === overColId);
           if (col) {
             updateMutation.mutate({
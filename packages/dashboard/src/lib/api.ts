@@ -64,9 +64,10 @@ export interface ActivityEvent {
 
 export interface ActivityListResponse {
   items: ActivityEvent[];
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  next_cursor: string | null;
 }
 
 export interface AgentStat {
@@ -75,6 +76,12 @@ export interface AgentStat {
   total_calls: number;
   avg_duration_ms: number;
   success_rate: number;
+  p50_duration_ms: number | null;
+  p95_duration_ms: number | null;
+  p99_duration_ms: number | null;
+  tool_p50_duration_ms: number | null;
+  tool_p95_duration_ms: number | null;
+  tool_p99_duration_ms: number | null;
   date?: string;
 }
 
@@ -82,7 +89,10 @@ export interface TrendData {
   dates: string[];
   tasks_completed: number[];
   tokens_used: number[];
-  session_count: number[];
+  session_counts: number[];
+  agent_calls: number[];
+  bucket: "hour" | "day" | "week" | "4week";
+  bucket_seconds: number;
 }
 
 export interface SessionInfo {
@@ -110,6 +120,14 @@ export interface TaskExecutionResponse {
   ralph_context: Record<string, unknown> | null;
 }
 
+export interface TaskMoveResponse {
+  id: number;
+  project_id: number;
+  status: string;
+  sort_order: number;
+  sort_orders: Record<string, number>;
+}
+
 export const api = {
   projects: {
     list: () => apiFetch<Project[]>("/api/projects"),
@@ -124,6 +142,8 @@ export const api = {
     create: (data: Partial<TaskItem>) => apiFetch<TaskItem>("/api/tasks", { method: "POST", body: JSON.stringify(data) }),
     update: (id: number, data: Partial<TaskItem>) => apiFetch<TaskItem>(`/api/tasks/${id}`, { method: "PUT", body: JSON.stringify(data) }),
     updateStatus: (id: number, status: string) => apiFetch<TaskItem>(`/api/tasks/${id}/status`, { method: "PATCH", body: JSON.stringify({ status }) }),
+    move: (id: number, position: { after_id?: number; before_id?: number; status?: string }) =>
+      apiFetch<TaskMoveResponse>(`/api/tasks/${id}/move`, { method: "POST", body: JSON.stringify(position) }),
     delete: (id: number) => apiFetch<{ deleted: boolean }>(`/api/tasks/${id}`, { method: "DELETE" }),
   },
   sessions: {
@@ -148,14 +168,15 @@ export const api = {
   },
   dashboard: {
     overview: () => apiFetch<DashboardOverview>("/api/dashboard/overview"),
-    trends: (days?: number) => apiFetch<TrendData>(`/api/dashboard/trends?days=${days || 30}`),
+    trends: (days?: number) => apiFetch<TrendData>(`/api/dashboard/trends?days=${days || 30}&bucket=day`),
     agentStats: (days?: number) => apiFetch<AgentStat[]>(`/api/dashboard/agent-stats?days=${days || 30}`),
-    activities: (params?: { event_type?: string; project_id?: number; limit?: number; offset?: number }) => {
+    activities: (params?: { event_type?: string; project_id?: number; limit?: number; cursor?: string; include_total?: boolean }) => {
       const searchParams = new URLSearchParams();
       if (params?.event_type) searchParams.set("event_type", params.event_type);
       if (params?.project_id) searchParams.set("project_id", String(params.project_id));
       if (params?.limit) searchParams.set("limit", String(params.limit));
-      if (params?.offset) searchParams.set("offset", String(params.offset));
+      if (params?.cursor) searchParams.set("cursor", params.cursor);
+      if (params?.include_total) searchParams.set("include_total", "true");
       const query = searchParams.toString();
       return apiFetch<ActivityListResponse>(`/api/dashboard/activities${query ? `?${query}` : ""}`);
     },